@@ -0,0 +1,50 @@
+import argparse
+import json
+from typing import Any, Dict, List, Tuple
+
+def load_results(path: str) -> Dict[Tuple[str, int], Dict[str, Any]]:
+    """
+    Load a benchmark results file, keyed by (benchmark, rows).
+    :param path: Path of a JSON file written by benchmarks.run.
+    :return: Dictionary mapping (benchmark, rows) to result records.
+    """
+    with open(path) as f:
+        return {(record["benchmark"], record["rows"]): record for record in json.load(f)["results"]}
+
+def compare(baseline_path: str, candidate_path: str) -> List[Dict[str, Any]]:
+    """
+    Compare two benchmark runs on the benchmarks they have in common.
+    :param baseline_path: Results of the reference run.
+    :param candidate_path: Results of the run to compare.
+    :return: List of records with time and peak memory ratios (candidate / baseline).
+    """
+    baseline, candidate = load_results(baseline_path), load_results(candidate_path)
+    rows = []
+    for key in sorted(baseline.keys() & candidate.keys()):
+        before, after = baseline[key], candidate[key]
+        if "error" in before or "error" in after:
+            rows.append({"benchmark": key[0], "rows": key[1], "error": after.get("error") or before.get("error")})
+            continue
+        rows.append({
+            "benchmark": key[0],
+            "rows": key[1],
+            "time_ratio": after["seconds"] / before["seconds"] if before["seconds"] else float("nan"),
+            "memory_ratio": after["peak_bytes"] / before["peak_bytes"] if before["peak_bytes"] else float("nan"),
+        })
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline", type=str, help="Results of the reference run")
+    parser.add_argument("candidate", type=str, help="Results of the run to compare")
+    args = parser.parse_args()
+
+    for row in compare(args.baseline, args.candidate):
+        if "error" in row:
+            print(f"{row['benchmark']:<36} rows={row['rows']:<12} failed: {row['error']}")
+            continue
+        print(f"{row['benchmark']:<36} rows={row['rows']:<12} time x{row['time_ratio']:.2f} "
+              f"memory x{row['memory_ratio']:.2f}")
+
+if __name__ == "__main__":
+    main()
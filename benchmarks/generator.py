@@ -0,0 +1,64 @@
+import os
+import numpy as np
+import pandas as pd
+from typing import Iterator, Optional
+
+def generate_transactions(rows: int, n_categories: int = 20, n_customers: int = 10_000, seed: int = 0,
+                          start_date: str = "2023-01-01", days: int = 365, offset: int = 0,
+                          total_rows: Optional[int] = None) -> pd.DataFrame:
+    """
+    Generate a deterministic synthetic transaction table with the columns DataLoader expects.
+    Dates increase with the row number (like an append-only export), category popularity is
+    Zipf-skewed and amounts are log-normal.
+    :param rows: Number of rows to generate.
+    :param n_categories: Number of distinct categories.
+    :param n_customers: Number of distinct customers.
+    :param seed: Random seed; the same arguments always give the same rows.
+    :param start_date: First transaction date.
+    :param days: Number of days covered by the whole table.
+    :param offset: Index of the first row within the whole table, for generating it in parts.
+    :param total_rows: Number of rows of the whole table (default: rows).
+    :return: DataFrame with 'date', 'category', 'amount' and 'customer_id' columns.
+    """
+    total_rows = total_rows or rows
+    rng = np.random.default_rng([seed, offset])
+    weights = 1.0 / np.arange(1, n_categories + 1)
+    categories = np.array([f"category_{i:04d}" for i in range(n_categories)])
+    row_numbers = np.arange(offset, offset + rows, dtype=np.int64)
+    day_offsets = row_numbers * days // max(total_rows, 1)
+
+    return pd.DataFrame({
+        "date": pd.Timestamp(start_date) + pd.to_timedelta(day_offsets, unit="D"),
+        "category": categories[rng.choice(n_categories, size=rows, p=weights / weights.sum())],
+        "amount": rng.lognormal(mean=3.5, sigma=1.0, size=rows).round(2),
+        "customer_id": np.char.add("C", rng.integers(0, n_customers, size=rows).astype(str)),
+    })
+
+def iter_transactions(rows: int, chunk_rows: int = 1_000_000, **kwargs) -> Iterator[pd.DataFrame]:
+    """
+    Generate a synthetic transaction table in parts of at most chunk_rows rows.
+    :param rows: Total number of rows.
+    :param chunk_rows: Maximum number of rows per part.
+    :param kwargs: Other arguments of generate_transactions.
+    :return: Iterator over DataFrame parts.
+    """
+    for offset in range(0, rows, chunk_rows):
+        yield generate_transactions(min(chunk_rows, rows - offset), offset=offset, total_rows=rows, **kwargs)
+
+def write_csv(path: str, rows: int, chunk_rows: int = 1_000_000, **kwargs) -> str:
+    """
+    Write a synthetic transaction CSV without holding the whole table in memory.
+    An existing file is overwritten.
+    :param path: Destination path.
+    :param rows: Total number of rows.
+    :param chunk_rows: Maximum number of rows generated at a time.
+    :param kwargs: Other arguments of generate_transactions.
+    :return: The destination path.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", newline="") as f:
+        for index, chunk in enumerate(iter_transactions(rows, chunk_rows, **kwargs)):
+            chunk.to_csv(f, index=False, header=index == 0, date_format="%Y-%m-%d")
+    return path
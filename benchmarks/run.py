@@ -0,0 +1,183 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.generator import write_csv
+from src.analyzer import ApproximateAnalyzer, DataAnalyzer
+from src.data_loader import DataLoader
+
+REQUIRED_COLUMNS = ["date", "category", "amount", "customer_id"]
+
+def measure(func: Callable[[], Any], repeat: int = 3) -> Dict[str, float]:
+    """
+    Time a callable and track its peak Python memory allocations.
+    Timings are taken without tracemalloc, whose overhead would skew them; one extra run measures memory.
+    :param func: Callable to benchmark.
+    :param repeat: Number of timed runs.
+    :return: Dictionary with 'seconds' (best run), 'median_seconds' and 'peak_bytes'.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": min(timings), "median_seconds": statistics.median(timings), "peak_bytes": peak}
+
+def dataset_path(data_dir: str, rows: int, n_categories: int, n_customers: int, seed: int) -> str:
+    """
+    Path of a generated dataset, reused across runs with the same parameters.
+    :param data_dir: Directory holding the generated datasets.
+    :param rows: Number of rows.
+    :param n_categories: Number of distinct categories.
+    :param n_customers: Number of distinct customers.
+    :param seed: Random seed.
+    :return: Path of the CSV file, generated if it does not exist yet.
+    """
+    path = os.path.join(data_dir, f"transactions_{rows}_{n_categories}_{n_customers}_{seed}.csv")
+    if not os.path.exists(path):
+        write_csv(path, rows, n_categories=n_categories, n_customers=n_customers, seed=seed)
+    return path
+
+def run_benchmarks(rows: int, n_categories: int, n_customers: int, data_dir: str, seed: int = 0, repeat: int = 3,
+                   plot_max_rows: Optional[int] = 10_000) -> List[Dict[str, Any]]:
+    """
+    Benchmark loading, every DataAnalyzer method and every DataVisualizer chart on one generated dataset.
+    :param rows: Number of rows.
+    :param n_categories: Number of distinct categories.
+    :param n_customers: Number of distinct customers.
+    :param data_dir: Directory holding the generated datasets.
+    :param seed: Random seed of the generated data.
+    :param repeat: Number of timed runs per benchmark.
+    :param plot_max_rows: Skip chart benchmarks above this many rows; None always runs them.
+    :return: List of result records.
+    """
+    path = dataset_path(data_dir, rows, n_categories, n_customers, seed)
+    loader = DataLoader(required_columns=REQUIRED_COLUMNS)
+    data = loader.clean_data(loader.validate_data(loader.load_csv(path)))
+    params = {"rows": rows, "categories": n_categories, "customers": n_customers}
+
+    cases: Dict[str, Callable[[], Any]] = {
+        "loader.load_csv+clean_data": lambda: loader.clean_data(loader.validate_data(loader.load_csv(path))),
+        "analyzer.summary_statistics": lambda: DataAnalyzer(data).summary_statistics("category", "amount"),
+        "analyzer.time_series_analysis": lambda: DataAnalyzer(data).time_series_analysis("date", "amount"),
+        "analyzer.time_series_analysis[week,by]": lambda: DataAnalyzer(data).time_series_analysis(
+            "date", "amount", freq="week", window=4, by="category"),
+        "loader.filter_by_date_range": lambda: loader.filter_by_date_range(data, "2023-03-01", "2023-03-31"),
+        "analyzer.spending_distribution": lambda: DataAnalyzer(data).spending_distribution("amount"),
+        "analyzer.top_spending_categories": lambda: DataAnalyzer(data).top_spending_categories("category", "amount"),
+        "analyzer.customer_segmentation": lambda: DataAnalyzer(data).customer_segmentation("customer_id", "amount"),
+        "analyzer.rfm_segmentation": lambda: DataAnalyzer(data).rfm_segmentation("customer_id", "amount", "date"),
+        "analyzer.rfm_segmentation[clusters]": lambda: DataAnalyzer(data).rfm_segmentation(
+            "customer_id", "amount", "date", clusters=4),
+        "approximate.update": lambda: ApproximateAnalyzer(error=0.01).update(data),
+        "analyzer.aggregate_cube": lambda: DataAnalyzer(data).aggregate_cube(),
+    }
+    # Rollups reuse one cube, so they time the drill-down queries rather than the build.
+    cube_analyzer = DataAnalyzer(data)
+    cube_analyzer.aggregate_cube()
+    cases.update({
+        "analyzer.drill_down[category]": lambda: cube_analyzer.drill_down(["category"]),
+        "analyzer.drill_down[month,category]": lambda: cube_analyzer.drill_down(["date", "category"], freq="month"),
+    })
+    if plot_max_rows is None or rows <= plot_max_rows:
+        cases.update(chart_cases(data))
+
+    results = []
+    for name, func in cases.items():
+        try:
+            results.append({"benchmark": name, **params, **measure(func, repeat)})
+        except Exception as e:
+            # Record the failure so that a broken stage shows up in the comparison instead of aborting the run.
+            results.append({"benchmark": name, **params, "error": f"{type(e).__name__}: {e}"})
+            print(f"{name:<36} rows={rows:<12} failed: {results[-1]['error']}")
+            continue
+        print(f"{name:<36} rows={rows:<12} {results[-1]['seconds']:>10.4f}s "
+              f"{results[-1]['peak_bytes'] / 2 ** 20:>10.1f} MiB")
+    return results
+
+def chart_cases(data: pd.DataFrame) -> Dict[str, Callable[[], Any]]:
+    """
+    Benchmark cases for the DataVisualizer charts. Figures are closed after each run.
+    :param data: Cleaned DataFrame to plot.
+    :return: Dictionary mapping benchmark names to callables.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from src.visualizer import DataVisualizer
+
+    visualizer = DataVisualizer()
+    totals = data.groupby("category", observed=True)["amount"].sum().reset_index()
+
+    def closing(render: Callable[[], Any]) -> Callable[[], None]:
+        return lambda: plt.close(render())
+
+    return {
+        "visualizer.bar_chart": closing(lambda: visualizer.bar_chart(data, "category", "amount")),
+        "visualizer.line_chart": closing(lambda: visualizer.line_chart(data, "date", "amount")),
+        "visualizer.pie_chart": closing(lambda: visualizer.pie_chart(totals, "amount", "category")),
+        "visualizer.heatmap": closing(lambda: visualizer.heatmap(data)),
+    }
+
+def environment() -> Dict[str, Any]:
+    """
+    Describe the code version and environment the benchmarks ran in.
+    :return: Dictionary of metadata.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Data Analyzer benchmarks")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000],
+                        help="Dataset sizes to benchmark (default: 10000 100000)")
+    parser.add_argument("--categories", type=int, default=20, help="Number of distinct categories (default: 20)")
+    parser.add_argument("--customers", type=int, default=10_000, help="Number of distinct customers (default: 10000)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the generated data (default: 0)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark (default: 3)")
+    parser.add_argument("--plot_max_rows", type=int, default=10_000,
+                        help="Skip chart benchmarks above this many rows (default: 10000)")
+    parser.add_argument("--data_dir", type=str, default=os.path.join("benchmarks", "data"),
+                        help="Directory for generated datasets (default: benchmarks/data)")
+    parser.add_argument("--output", type=str, default="benchmark_results.json",
+                        help="Path of the JSON results (default: benchmark_results.json)")
+    args = parser.parse_args()
+
+    results = []
+    for rows in args.rows:
+        results.extend(run_benchmarks(rows, args.categories, args.customers, args.data_dir, args.seed, args.repeat,
+                                      args.plot_max_rows))
+    with open(args.output, "w") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2)
+    print(f"Benchmark results saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PLOTTING_MODULES = ("matplotlib", "seaborn")
+
+def parse_importtime(stderr: str) -> Dict[str, Dict[str, int]]:
+    """
+    Parse the report printed by `python -X importtime`.
+    :param stderr: Standard error of the process.
+    :return: Dictionary mapping each imported module to its 'self_us' and 'cumulative_us' import times
+             and its nesting 'depth' (0 for modules imported directly by the script).
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules[name.strip()] = {"self_us": int(self_us), "cumulative_us": int(cumulative_us), "depth": depth}
+    return modules
+
+def profile_startup(args: List[str], repeat: int = 3) -> Dict[str, Any]:
+    """
+    Run main.py with import timing and measure its wall time.
+    :param args: Command-line arguments of main.py.
+    :param repeat: Number of timed runs; the import report comes from the last one.
+    :return: Dictionary with 'seconds' (best run), 'import_seconds' (total import time of the last run)
+             and 'modules' (per-module import times).
+    """
+    command = [sys.executable, "-X", "importtime", os.path.join(REPO_ROOT, "main.py"), *args]
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        process = subprocess.run(command, capture_output=True, text=True, cwd=REPO_ROOT)
+        timings.append(time.perf_counter() - start)
+        if process.returncode != 0:
+            raise RuntimeError(f"main.py failed: {process.stderr[-2000:]}")
+    modules = parse_importtime(process.stderr)
+    import_us = sum(times["cumulative_us"] for times in modules.values() if times["depth"] == 0)
+    return {"seconds": min(timings), "import_seconds": import_us / 1e6, "modules": modules}
+
+def forbidden_imports(modules: Dict[str, Any], forbidden: Optional[List[str]] = None) -> List[str]:
+    """
+    List the imported modules that belong to forbidden packages.
+    :param modules: Imported modules, as returned by parse_importtime.
+    :param forbidden: Top-level package names (default: the plotting libraries).
+    :return: Sorted list of offending module names.
+    """
+    forbidden = list(PLOTTING_MODULES if forbidden is None else forbidden)
+    return sorted(name for name in modules if name.split(".")[0] in forbidden)
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the startup time of the analysis-only CLI path")
+    parser.add_argument("--csv", type=str, help="CSV file to analyze (default: a small generated dataset)")
+    parser.add_argument("--analysis", type=str, nargs="+", default=["summary"],
+                        help="Analyses to run (default: summary)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs (default: 3)")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to list (default: 15)")
+    parser.add_argument("--output", type=str, help="Path to save the measurements as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = args.csv
+        if path is None:
+            sys.path.insert(0, REPO_ROOT)
+            from benchmarks.generator import write_csv
+            path = write_csv(os.path.join(tmp_dir, "startup.csv"), 1_000, n_categories=5, n_customers=100)
+        result = profile_startup([path, "--analysis", *args.analysis, "--no-cache"], args.repeat)
+
+    print(f"Wall time: {result['seconds']:.3f}s, imports: {result['import_seconds']:.3f}s")
+    slowest = sorted(result["modules"].items(), key=lambda item: item[1]["self_us"], reverse=True)[:args.top]
+    for name, times in slowest:
+        print(f"{times['self_us'] / 1e3:>9.1f} ms  {name}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+    offending = forbidden_imports(result["modules"])
+    if offending:
+        print(f"The analysis-only path imports plotting libraries: {', '.join(offending[:10])}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,74 +1,440 @@
 import argparse
+import os
+import sys
 import pandas as pd
-from src.data_loader import DataLoader
-from src.analyzer import DataAnalyzer
-from src.visualizer import DataVisualizer
+from typing import Dict, List, Optional
+from src.cache import ColumnarCache, ResultCache, file_fingerprint
+from src.data_loader import CsvSchema, DataLoader
+from src.incremental import update_incremental
+from src.parallel import analyze_partitions, resolve_input_paths
+from src.profiling import Profiler
+from src.validation import ValidationRules
+from src.writers import write_result
+from src.analyzer import ApproximateAnalyzer, DataAnalyzer
+
+DEFAULT_CHUNKSIZE = 1_000_000
 
 def main():
+    if sys.argv[1:2] == ["serve"]:
+        serve(sys.argv[2:])
+        return
+
     # Set up argument parser
     parser = argparse.ArgumentParser(description="Data Analyzer CLI")
-    parser.add_argument("file_path", type=str, help="Path to the CSV file")
-    parser.add_argument("--analysis", type=str, choices=["summary", "time-series", "category", "segmentation"], 
-                        help="Type of analysis to perform")
+    parser.add_argument("file_path", type=str, help="Path to the CSV file, a directory of CSV files, or a glob pattern")
+    parser.add_argument("--analysis", type=str, nargs="+", choices=list(DataAnalyzer.ANALYSES) + ["all"],
+                        help="Types of analysis to perform; several can be given, or 'all'")
     parser.add_argument("--plot", type=str, choices=["bar", "line", "pie", "heatmap"], 
                         help="Type of plot to generate")
-    parser.add_argument("--output", type=str, help="Path to save the analysis or plot result")
-    parser.add_argument("--start_date", type=str, help="Start date for time-series analysis (YYYY-MM-DD)")
-    parser.add_argument("--end_date", type=str, help="End date for time-series analysis (YYYY-MM-DD)")
+    parser.add_argument("--output", type=str,
+                        help="Path to save the analysis result, or the plot when no analysis is requested "
+                             "(prefer --result-output and --plot-output)")
+    parser.add_argument("--result-output", dest="result_output", type=str,
+                        help="Path to save the analysis result; the extension selects the format: "
+                             ".parquet, .feather, .jsonl, or CSV for any other")
+    parser.add_argument("--plot-output", dest="plot_output", type=str,
+                        help="Path to save the plot; the extension selects the image format")
+    parser.add_argument("--start_date", type=str, help="Only analyze rows on or after this date (YYYY-MM-DD)")
+    parser.add_argument("--end_date", type=str, help="Only analyze rows on or before this date (YYYY-MM-DD)")
+    parser.add_argument("--categories", type=str, nargs="+",
+                        help="Only analyze rows whose category column holds one of these values")
+    parser.add_argument("--customers", type=str, nargs="+", help="Only analyze rows of these customer IDs")
+    parser.add_argument("--freq", type=str, choices=list(DataAnalyzer.FREQUENCIES),
+                        help="Resample the time-series analysis per day, week or month (default: per timestamp)")
+    parser.add_argument("--window", type=int,
+                        help="Add a rolling mean over this many periods to the time-series analysis")
+    parser.add_argument("--by_category", action="store_true",
+                        help="Break the time-series analysis down by the category column")
+    parser.add_argument("--clusters", type=int,
+                        help="Group customers of the RFM analysis into this many k-means clusters "
+                             "(default: rule-based segments)")
+    parser.add_argument("--drill_down", type=str, nargs="*",
+                        help="Aggregate the value column over these of the category column, customer_id and date "
+                             "(none for grand totals), with dates per --freq; category totals and time series "
+                             "at a --freq then reuse the same aggregates")
+    parser.add_argument("--sorted_by_date", action="store_true",
+                        help="The CSV rows are in ascending date order, so date-range reads stop at --end_date")
     parser.add_argument("--category_column", type=str, default="category", 
                         help="Column name for category-based analysis (default: 'category')")
     parser.add_argument("--value_column", type=str, default="amount", 
                         help="Column name for value-based analysis (default: 'amount')")
     parser.add_argument("--top_n", type=int, default=5, help="Number of top categories to display (default: 5)")
+    parser.add_argument("--chunksize", type=int,
+                        help="Stream the CSV in chunks of this many rows (summary, category and segmentation only)")
+    parser.add_argument("--median", type=str, choices=["approx", "exact"], default="approx",
+                        help="Median mode for --chunksize and multi-file runs: sketched in one pass, or exact with "
+                             "a second pass (default: 'approx')")
+    parser.add_argument("--approx", action="store_true",
+                        help="Answer from sketches in one streaming pass: sketched medians of the heaviest "
+                             "categories, estimated distinct customers and heavy-hitter top categories and customers; "
+                             "nothing is kept per customer, but exact means are kept per category")
+    parser.add_argument("--error", type=float, default=0.01,
+                        help="Target error of the --approx sketches as a fraction (default: 0.01)")
+    parser.add_argument("--no-cache", dest="no_cache", action="store_true",
+                        help="Parse the CSV without reading or writing the columnar cache")
+    parser.add_argument("--rebuild-cache", dest="rebuild_cache", action="store_true",
+                        help="Ignore the cached copy of the CSV and the cached analysis results, and rebuild them")
+    parser.add_argument("--cache_dir", type=str,
+                        help="Directory for the columnar cache (default: .data_analyzer_cache next to the CSV)")
+    parser.add_argument("--cache_max_bytes", type=int, default=1 << 30,
+                        help="Size budget of the columnar cache in bytes (default: 1 GiB)")
+    parser.add_argument("--result_cache_max_bytes", type=int, default=64 << 20,
+                        help="Size budget of the cached analysis results in bytes (default: 64 MiB)")
+    parser.add_argument("--date_format", type=str,
+                        help="strftime format of the date column, e.g. '%%Y-%%m-%%d' (default: inferred)")
+    parser.add_argument("--engine", type=str, choices=["c", "pyarrow"],
+                        help="CSV parser engine (default: pandas' C parser)")
+    parser.add_argument("--infer_types", action="store_true",
+                        help="Read every column and infer types instead of applying the declared schema")
+    parser.add_argument("--state", type=str,
+                        help="Persist aggregates of an append-only CSV in this file and only read rows appended "
+                             "since the last run (summary, category and segmentation only)")
+    parser.add_argument("--workers", type=int,
+                        help="Worker processes for directory or glob inputs (default: number of CPUs)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Print wall time, CPU time, memory and row counts for every stage")
+    parser.add_argument("--profile_output", type=str, help="Path to save the per-stage profile as JSON")
+    add_validation_arguments(parser)
     args = parser.parse_args()
 
+    profiler = Profiler() if args.profile or args.profile_output else None
+    try:
+        run(args, profiler)
+    finally:
+        if profiler is not None:
+            profiler.close()
+            print(profiler.report())
+            if args.profile_output:
+                profiler.to_json(args.profile_output)
+                print(f"Profile saved to {args.profile_output}")
+
+def run(args: argparse.Namespace, profiler: Optional[Profiler] = None):
+    """
+    Load the data, then run the requested analyses and plot.
+    :param args: Parsed command-line arguments.
+    :param profiler: Optional profiler recording every stage.
+    """
+    try:
+        paths = resolve_input_paths(args.file_path)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+
+    cache_dir = None
+    if not args.no_cache and not args.chunksize:
+        cache_dir = args.cache_dir or os.path.join(os.path.dirname(os.path.abspath(paths[0])), ".data_analyzer_cache")
+    loader = build_loader(args, cache_dir, profiler)
+    if args.chunksize or args.state or args.approx or len(paths) > 1:
+        run_streaming(loader, paths, args, profiler)
+        return
+
     # Load and validate data
-    loader = DataLoader(required_columns=["date", "category", "amount", "customer_id"])
     try:
-        data = loader.load_csv(args.file_path)
-        data = loader.validate_data(data)
-        data = loader.clean_data(data)
+        data = loader.load_clean(paths[0], rebuild_cache=args.rebuild_cache, start_date=args.start_date,
+                                 end_date=args.end_date, filters=row_filters(args))
     except Exception as e:
         print(f"Error: {e}")
         return
+    report_rejections(loader)
 
-    # Perform analysis
-    analyzer = DataAnalyzer(data)
-    analysis_result = None
-    if args.analysis == "summary":
-        analysis_result = analyzer.summary_statistics(args.category_column, args.value_column)
-    elif args.analysis == "time-series":
-        if not args.start_date or not args.end_date:
-            print("Error: --start_date and --end_date are required for time-series analysis.")
-            return
-        analysis_result = analyzer.time_series_analysis("date", args.value_column)
-    elif args.analysis == "category":
-        analysis_result = analyzer.top_spending_categories(args.category_column, args.value_column, args.top_n)
-    elif args.analysis == "segmentation":
-        analysis_result = analyzer.customer_segmentation("customer_id", args.value_column)
-
-    # Save analysis result if specified
-    if analysis_result is not None:
-        print("Analysis Result:")
-        print(analysis_result)
-        if args.output:
-            analysis_result.to_csv(args.output, index=False)
-            print(f"Analysis result saved to {args.output}")
+    # Perform analysis; with the cache enabled, results of unchanged files and arguments are reused.
+    result_cache = build_result_cache(args, os.path.join(cache_dir, "results")) if cache_dir else None
+    fingerprint = None
+    if result_cache is not None:
+        fingerprint = file_fingerprint(paths[0], loader.fingerprint(paths[0]), args.start_date,
+                                       args.end_date, row_filters(args))
+    analyzer = DataAnalyzer(data, profiler=profiler, result_cache=result_cache, fingerprint=fingerprint)
+    analyses = requested_analyses(args)
+    try:
+        drill_down = None
+        if args.drill_down is not None:
+            # Run first: the analyses below read category totals and periodic series from its cube.
+            drill_down = analyzer.drill_down(args.drill_down, args.freq, args.category_column, "customer_id", "date",
+                                             args.value_column)
+        results = analyzer.run_analyses(analyses, args.category_column, args.value_column, "date", "customer_id",
+                                        args.top_n, args.freq, args.window, args.by_category, args.clusters)
+        if drill_down is not None:
+            results["drill-down"] = drill_down
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+
+    # Save analysis results if specified
+    result_output = args.result_output or args.output
+    save_results(results, result_output)
+
+    if not args.plot:
+        return
+    plot_output = args.plot_output
+    if plot_output is None and args.output:
+        # --output is kept for the result when both are written, so the plot no longer overwrites it.
+        if results and result_output == args.output:
+            print(f"Note: the analysis result was saved to {args.output}; use --plot-output to save the plot.")
+        else:
+            plot_output = args.output
 
-    # Generate visualization
-    visualizer = DataVisualizer()
+    # Generate visualization; matplotlib and seaborn are only imported when a plot is requested.
+    from src.visualizer import DataVisualizer
+    visualizer = DataVisualizer(profiler=profiler, reuse_figure=True)
     if args.plot == "bar":
-        fig = visualizer.bar_chart(data, args.category_column, args.value_column, title="Bar Chart", save_path=args.output)
+        fig = visualizer.bar_chart(data, args.category_column, args.value_column, title="Bar Chart", save_path=plot_output)
     elif args.plot == "line":
-        fig = visualizer.line_chart(data, "date", args.value_column, title="Line Chart", save_path=args.output)
+        fig = visualizer.line_chart(data, "date", args.value_column, title="Line Chart", save_path=plot_output)
     elif args.plot == "pie":
-        fig = visualizer.pie_chart(data, args.value_column, args.category_column, title="Pie Chart", save_path=args.output)
+        fig = visualizer.pie_chart(data, args.value_column, args.category_column, title="Pie Chart", save_path=plot_output)
     elif args.plot == "heatmap":
-        fig = visualizer.heatmap(data, title="Heatmap", save_path=args.output)
+        fig = visualizer.heatmap(data, title="Heatmap", save_path=plot_output)
 
     print("Visualization generated successfully.")
-    if args.output:
-        print(f"Visualization saved to {args.output}")
+    if plot_output:
+        print(f"Visualization saved to {plot_output}")
+
+def run_streaming(loader: DataLoader, paths: List[str], args: argparse.Namespace,
+                  profiler: Optional[Profiler] = None):
+    """
+    Run analyses by folding partial aggregates: over chunks of each file, so that peak memory is
+    bounded by the chunk size rather than the file size, over several files in a process pool, or
+    over the rows appended to a file since the aggregates were last saved. With --approx, customers
+    are only sketched and medians are kept for the heaviest categories only.
+    :param loader: DataLoader used to read, validate and clean each file or chunk.
+    :param paths: Paths to the CSV files.
+    :param args: Parsed command-line arguments.
+    :param profiler: Optional profiler recording every stage.
+    """
+    supported = ["summary", "category", "segmentation"]
+    analyses = supported if args.analysis and "all" in args.analysis else requested_analyses(args)
+    if args.plot or args.drill_down is not None or not analyses or not set(analyses) <= set(supported):
+        print("Error: --chunksize, --state, --approx and multi-file inputs support only the summary, category and "
+              "segmentation analyses, without plots or drill-downs.")
+        return
+    if args.state and (len(paths) > 1 or args.median == "exact" or args.approx):
+        print("Error: --state works on a single file and with approximate medians only, without --approx.")
+        return
+    if args.approx and args.median == "exact":
+        print("Error: --approx cannot compute exact medians.")
+        return
+    filters = row_filters(args)
+    if args.state and (args.start_date or args.end_date or filters):
+        print("Error: --state aggregates whole files and cannot be combined with date ranges or filters.")
+        return
+
+    def all_chunks():
+        for path in paths:
+            yield from loader.load_clean_chunks(path, args.chunksize or DEFAULT_CHUNKSIZE, start_date=args.start_date,
+                                                end_date=args.end_date, filters=filters)
+
+    try:
+        analyzer_kwargs = dict(category_column=args.category_column, value_column=args.value_column,
+                               customer_column="customer_id", profiler=profiler)
+        if args.state:
+            state = update_incremental(args.state, paths[0], loader, args.chunksize or DEFAULT_CHUNKSIZE,
+                                       **analyzer_kwargs)
+            analyzer = state.analyzer
+            if state.pending_bytes:
+                print(f"Note: the last line of {paths[0]} is incomplete; its {state.pending_bytes} bytes are left "
+                      f"for the next run.")
+        elif args.approx:
+            # Sketches only bound memory if the files are streamed too.
+            analyzer = analyze_partitions(paths, loader, workers=args.workers,
+                                          chunksize=args.chunksize or DEFAULT_CHUNKSIZE, start_date=args.start_date,
+                                          end_date=args.end_date, filters=filters, analyzer_class=ApproximateAnalyzer,
+                                          error=args.error, **analyzer_kwargs)
+        else:
+            analyzer = analyze_partitions(paths, loader, workers=args.workers, chunksize=args.chunksize,
+                                          start_date=args.start_date, end_date=args.end_date, filters=filters,
+                                          **analyzer_kwargs)
+        if "summary" in analyses and args.median == "exact":
+            analyzer.compute_exact_medians(all_chunks)
+    except Exception as e:
+        print(f"Error: {e}")
+        return
+
+    results = {}
+    for name in analyses:
+        if name == "summary":
+            results[name] = analyzer.summary_statistics()
+        elif name == "category":
+            results[name] = analyzer.top_spending_categories(args.top_n)
+        else:
+            results[name] = analyzer.customer_segmentation()
+    report_rejections(loader)
+    save_results(results, args.result_output or args.output)
+    if args.approx and "segmentation" in analyses:
+        print(f"Distinct customers (approx.): {analyzer.distinct_customers():.0f}")
+
+def serve(argv: List[str]):
+    """
+    Run the analysis server: datasets stay loaded in memory between requests, so repeated
+    analyses and charts skip parsing and cleaning.
+    :param argv: Command-line arguments following 'serve'.
+    """
+    parser = argparse.ArgumentParser(prog="main.py serve", description="Data Analyzer server")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Interface to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port to listen on (default: 8765)")
+    parser.add_argument("--socket", type=str, help="Listen on this Unix socket instead of a TCP port")
+    parser.add_argument("--max_datasets", type=int, default=8,
+                        help="Number of loaded datasets kept in memory (default: 8)")
+    parser.add_argument("--workers", type=int, help="Worker threads for loading and analysis (default: automatic)")
+    parser.add_argument("--category_column", type=str, default="category",
+                        help="Column name for category-based analysis (default: 'category')")
+    parser.add_argument("--value_column", type=str, default="amount",
+                        help="Column name for value-based analysis (default: 'amount')")
+    parser.add_argument("--sorted_by_date", action="store_true",
+                        help="The CSV rows are in ascending date order")
+    parser.add_argument("--cache_dir", type=str,
+                        help="Directory for the columnar cache, so restarts load warm (default: no cache)")
+    parser.add_argument("--cache_max_bytes", type=int, default=1 << 30,
+                        help="Size budget of the columnar cache in bytes (default: 1 GiB)")
+    parser.add_argument("--result_cache_max_bytes", type=int, default=64 << 20,
+                        help="Size budget of the cached analysis results in bytes (default: 64 MiB)")
+    parser.add_argument("--date_format", type=str,
+                        help="strftime format of the date column, e.g. '%%Y-%%m-%%d' (default: inferred)")
+    parser.add_argument("--engine", type=str, choices=["c", "pyarrow"],
+                        help="CSV parser engine (default: pandas' C parser)")
+    parser.add_argument("--infer_types", action="store_true",
+                        help="Read every column and infer types instead of applying the declared schema")
+    add_validation_arguments(parser)
+    args = parser.parse_args(argv)
+
+    from src.server import AnalysisServer
+    result_cache = build_result_cache(args, os.path.join(args.cache_dir, "results") if args.cache_dir else None)
+    server = AnalysisServer(build_loader(args, args.cache_dir), max_datasets=args.max_datasets,
+                            workers=args.workers, result_cache=result_cache)
+    address = args.socket or f"http://{args.host}:{args.port}"
+    try:
+        server.serve_forever(args.host, args.port, args.socket,
+                             ready=lambda _: print(f"Serving on {address} (Ctrl+C to stop)", flush=True))
+    except KeyboardInterrupt:
+        print("Server stopped.")
+
+def build_loader(args: argparse.Namespace, cache_dir: Optional[str] = None,
+                 profiler: Optional[Profiler] = None) -> DataLoader:
+    """
+    Build the DataLoader described by the command-line arguments.
+    :param args: Parsed command-line arguments.
+    :param cache_dir: Directory of the columnar cache, or None to parse the CSV every time.
+    :param profiler: Optional profiler recording every stage.
+    :return: DataLoader.
+    """
+    cache = None
+    if cache_dir:
+        try:
+            cache = ColumnarCache(cache_dir, max_bytes=args.cache_max_bytes)
+        except ImportError as e:
+            print(f"Warning: {e}; continuing without the columnar cache.")
+    required_columns = list(dict.fromkeys(["date", "category", "amount", "customer_id",
+                                           args.category_column, args.value_column]))
+    schema = None
+    if not args.infer_types:
+        schema = CsvSchema(dtypes={args.value_column: "float64"}, date_columns=["date"], date_format=args.date_format,
+                           categorical_columns=[column for column in ("category", "customer_id", args.category_column)
+                                                if column != args.value_column],
+                           engine=args.engine)
+    return DataLoader(required_columns=required_columns, cache=cache, schema=schema, profiler=profiler,
+                      sorted_by_date=args.sorted_by_date, rules=build_rules(args))
+
+def add_validation_arguments(parser: argparse.ArgumentParser):
+    """
+    Add the row validation options to a command-line parser.
+    :param parser: Parser to extend.
+    """
+    parser.add_argument("--nullable", type=str, nargs="+", default=[],
+                        help="Required columns that may be empty (by default, rows missing any required value are "
+                             "rejected)")
+    parser.add_argument("--min_value", type=float, help="Reject rows whose value column is below this number")
+    parser.add_argument("--max_value", type=float, help="Reject rows whose value column is above this number")
+    parser.add_argument("--min_date", type=str, help="Reject rows dated before this date (YYYY-MM-DD)")
+    parser.add_argument("--max_date", type=str, help="Reject rows dated after this date (YYYY-MM-DD)")
+    parser.add_argument("--customer_pattern", type=str,
+                        help="Regular expression customer IDs must fully match, e.g. 'C\\d+'")
+    parser.add_argument("--quarantine", type=str, help="CSV file to append rejected rows to, with the rule they failed")
+
+def build_rules(args: argparse.Namespace) -> Optional[ValidationRules]:
+    """
+    Build the validation rules described by the command-line arguments.
+    :param args: Parsed command-line arguments.
+    :return: ValidationRules, or None if no rule was given.
+    """
+    ranges = {}
+    if args.min_value is not None or args.max_value is not None:
+        ranges[args.value_column] = (args.min_value, args.max_value)
+    date_bounds = {}
+    if args.min_date or args.max_date:
+        date_bounds["date"] = (args.min_date, args.max_date)
+    patterns = {"customer_id": args.customer_pattern} if args.customer_pattern else {}
+    if not (args.nullable or ranges or date_bounds or patterns or args.quarantine):
+        return None
+    return ValidationRules(nullable=args.nullable, ranges=ranges, date_bounds=date_bounds, patterns=patterns,
+                           quarantine_path=args.quarantine)
+
+def report_rejections(loader: DataLoader):
+    """
+    Print how many rows the loader rejected, per rule, if any.
+    :param loader: DataLoader used for the run.
+    """
+    if loader.report.rows_rejected:
+        print(loader.report.summary())
+        if loader.rules is not None and loader.rules.quarantine_path:
+            print(f"Rejected rows appended to {loader.rules.quarantine_path}")
+
+def build_result_cache(args: argparse.Namespace, cache_dir: Optional[str] = None) -> ResultCache:
+    """
+    Build the analysis result cache described by the command-line arguments.
+    :param args: Parsed command-line arguments.
+    :param cache_dir: Directory of the on-disk result store, or None to keep results in memory only.
+    :return: ResultCache.
+    """
+    # A rebuilt dataset keeps its fingerprint, so its stored results must be recomputed rather than served.
+    refresh = getattr(args, 'rebuild_cache', False)
+    try:
+        return ResultCache(max_bytes=args.result_cache_max_bytes, cache_dir=cache_dir, refresh=refresh)
+    except ImportError as e:
+        print(f"Warning: {e}; keeping analysis results in memory only.")
+        return ResultCache(max_bytes=args.result_cache_max_bytes, refresh=refresh)
+
+def requested_analyses(args: argparse.Namespace) -> List[str]:
+    """
+    Expand the --analysis arguments into a de-duplicated list of analysis names.
+    :param args: Parsed command-line arguments.
+    :return: List of analysis names, empty if no analysis was requested.
+    """
+    if not args.analysis:
+        return []
+    if "all" in args.analysis:
+        return list(DataAnalyzer.ANALYSES)
+    return list(dict.fromkeys(args.analysis))
+
+def row_filters(args: argparse.Namespace) -> Optional[Dict[str, List[str]]]:
+    """
+    Collect the --categories and --customers arguments into loader filters.
+    :param args: Parsed command-line arguments.
+    :return: Mapping of columns to the values to keep, or None if no filter was given.
+    """
+    filters = {}
+    if args.categories:
+        filters[args.category_column] = args.categories
+    if args.customers:
+        filters["customer_id"] = args.customers
+    return filters or None
+
+def save_results(results: Dict[str, pd.DataFrame], output: Optional[str]):
+    """
+    Print analysis results and save each one to its own file if an output path is given, in the
+    format selected by its extension (see `write_result`).
+    With several results, the analysis name is appended to the output file name.
+    :param results: Dictionary mapping analysis names to results.
+    :param output: Output path, or None to only print the results.
+    """
+    for name, analysis_result in results.items():
+        print("Analysis Result:" if len(results) == 1 else f"Analysis Result ({name}):")
+        print(analysis_result)
+        if output:
+            path = output
+            if len(results) > 1:
+                root, ext = os.path.splitext(output)
+                path = f"{root}_{name}{ext}"
+            write_result(analysis_result, path)
+            print(f"Analysis result saved to {path}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,272 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional
+
+class GroupedMoments:
+    COLUMNS = ['count', 'sum', 'mean', 'm2']
+
+    def __init__(self, frame: Optional[pd.DataFrame] = None):
+        """
+        Initialize mergeable per-key aggregates (count, sum, mean and sum of squared deviations).
+
+        Two GroupedMoments built from disjoint parts of a dataset merge into exactly the aggregates
+        of the whole dataset, which is what lets chunked and partitioned runs fold partial results.
+        :param frame: DataFrame indexed by key with columns 'count', 'sum', 'mean' and 'm2'.
+        """
+        if frame is None:
+            frame = pd.DataFrame({column: pd.Series(dtype=float) for column in self.COLUMNS})
+        self.frame = frame
+
+    @classmethod
+    def from_frame(cls, data: pd.DataFrame, key_column: str, value_column: str) -> "GroupedMoments":
+        """
+        Compute the aggregates of one DataFrame.
+        :param data: DataFrame to aggregate.
+        :param key_column: Column to group by.
+        :param value_column: Column to aggregate.
+        :return: GroupedMoments for the DataFrame.
+        """
+        grouped = data.groupby(key_column, observed=True, sort=False)[value_column]
+        frame = grouped.agg(['count', 'sum', 'mean', 'var'])
+        frame['m2'] = (frame.pop('var') * (frame['count'] - 1)).fillna(0.0)
+        frame['mean'] = frame['mean'].fillna(0.0)
+        frame = frame.astype(float)
+        if isinstance(frame.index, pd.CategoricalIndex):
+            frame.index = pd.Index(np.asarray(frame.index), name=frame.index.name)
+        return cls(frame[cls.COLUMNS])
+
+    def merge(self, other: "GroupedMoments") -> "GroupedMoments":
+        """
+        Combine two sets of aggregates (Chan et al. parallel variance update).
+        :param other: Aggregates over a disjoint part of the data.
+        :return: New GroupedMoments covering both parts.
+        """
+        if self.frame.empty:
+            return GroupedMoments(other.frame.copy())
+        if other.frame.empty:
+            return GroupedMoments(self.frame.copy())
+
+        left, right = self.frame.align(other.frame, join='outer', fill_value=0.0)
+        count = left['count'] + right['count']
+        delta = right['mean'] - left['mean']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            share = (right['count'] / count).fillna(0.0)
+            merged = pd.DataFrame({
+                'count': count,
+                'sum': left['sum'] + right['sum'],
+                'mean': left['mean'] + delta * share,
+                'm2': left['m2'] + right['m2'] + delta ** 2 * left['count'] * share,
+            })
+        return GroupedMoments(merged)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Export the aggregates as a JSON-serializable dictionary.
+        :return: Dictionary with the keys and one list per aggregate column.
+        """
+        state = {'name': self.frame.index.name, 'keys': self.frame.index.tolist()}
+        state.update({column: self.frame[column].tolist() for column in self.COLUMNS})
+        return state
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "GroupedMoments":
+        """
+        Rebuild aggregates exported with to_dict.
+        :param state: Dictionary produced by to_dict.
+        :return: GroupedMoments.
+        """
+        index = pd.Index(state['keys'], name=state['name'])
+        return cls(pd.DataFrame({column: state[column] for column in cls.COLUMNS}, index=index, dtype=float))
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Finalize the aggregates.
+        :return: DataFrame sorted by key with columns 'count', 'sum', 'mean' and 'std' (sample, ddof=1).
+        """
+        frame = self.frame.sort_index()
+        count = frame['count']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = (frame['sum'] / count).where(count > 0)
+            std = np.sqrt(frame['m2'] / (count - 1)).where(count > 1)
+        return pd.DataFrame({'count': count.astype('int64'), 'sum': frame['sum'], 'mean': mean, 'std': std})
+
+class AggregateCube:
+    # Period aliases accepted by rollup to coarsen the day dimension.
+    PERIODS = ('D', 'W', 'M', 'Q', 'Y')
+
+    def __init__(self, labels: Dict[str, pd.Index], codes: Dict[str, np.ndarray], count: np.ndarray,
+                 total: np.ndarray, sumsq: np.ndarray, shift: float, date_column: Optional[str] = None,
+                 skipped: int = 0):
+        """
+        Initialize a cube of additive aggregates (count, sum, sum of squares) per combination of
+        dimension values, e.g. per (category, customer, day).
+
+        Each dimension keeps its distinct values once, in `labels`, and every non-empty cell refers
+        to them by integer code, so the cube holds one small row per cell instead of per transaction.
+        Coarser totals (per category, per month, per category and month...) add up cells rather than
+        rescanning rows. Squares are taken around `shift` (the overall mean) so that standard deviations
+        of rollups do not lose precision to cancellation.
+        :param labels: Mapping of each dimension to its sorted distinct values.
+        :param codes: Mapping of each dimension to the code of each cell's value.
+        :param count: Number of rows of each cell.
+        :param total: Sum of the values of each cell.
+        :param sumsq: Sum of the squared differences between the values of each cell and `shift`.
+        :param shift: Center of the squares.
+        :param date_column: Dimension holding days, which rollup can coarsen to longer periods.
+        :param skipped: Number of rows with a value that were left out because a dimension was missing.
+        """
+        self.labels = labels
+        self.codes = codes
+        self.count = count
+        self.total = total
+        self.sumsq = sumsq
+        self.shift = shift
+        self.date_column = date_column
+        self.skipped = skipped
+
+    @classmethod
+    def build(cls, data: pd.DataFrame, dimensions: List[str], value_column: str,
+              date_column: Optional[str] = None) -> "AggregateCube":
+        """
+        Aggregate a DataFrame at the grain of the given dimensions, in one pass.
+        Rows missing a dimension or the value are left out; those with a value are counted in `skipped`.
+        :param data: DataFrame to aggregate.
+        :param dimensions: Columns to aggregate by.
+        :param value_column: Column to aggregate.
+        :param date_column: One of the dimensions holding dates, which are truncated to days.
+        :return: AggregateCube.
+        """
+        missing_columns = [col for col in [*dimensions, value_column] if col not in data.columns]
+        if missing_columns:
+            raise ValueError(f"Columns {missing_columns} not found in the DataFrame.")
+        if date_column is not None and date_column not in dimensions:
+            raise ValueError(f"The date column '{date_column}' must be one of the dimensions.")
+
+        values = pd.to_numeric(data[value_column], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        valid = ~np.isnan(values)
+        n_values = int(valid.sum())
+        labels, row_codes = {}, []
+        for column in dimensions:
+            keys = data[column]
+            if column == date_column:
+                keys = pd.to_datetime(keys, errors='coerce').dt.floor('D')
+            codes, uniques = pd.factorize(keys, sort=True)
+            labels[column] = pd.Index(uniques, name=column)
+            row_codes.append(codes)
+            valid &= codes >= 0
+
+        cells, cell_codes = _combine([codes[valid] for codes in row_codes], [len(labels[col]) for col in dimensions])
+        values = values[valid]
+        shift = float(values.mean()) if len(values) else 0.0
+        n_cells = len(cell_codes[0]) if dimensions else int(len(values) > 0)
+        count = np.bincount(cells, minlength=n_cells)
+        total = np.bincount(cells, weights=values, minlength=n_cells)
+        sumsq = np.bincount(cells, weights=(values - shift) ** 2, minlength=n_cells)
+        codes = {column: _compact(cell_codes[i], len(labels[column])) for i, column in enumerate(dimensions)}
+        return cls(labels, codes, count, total, sumsq, shift, date_column, n_values - len(values))
+
+    @property
+    def dimensions(self) -> List[str]:
+        """
+        Dimensions of the cube, in build order.
+        """
+        return list(self.labels)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory held by the cell arrays, in bytes (labels excluded).
+        """
+        return int(sum(codes.nbytes for codes in self.codes.values())
+                   + self.count.nbytes + self.total.nbytes + self.sumsq.nbytes)
+
+    def __len__(self) -> int:
+        return len(self.count)
+
+    def rollup(self, dimensions: Optional[List[str]] = None, freq: Optional[str] = None) -> pd.DataFrame:
+        """
+        Aggregate the cells over a subset of the dimensions.
+        :param dimensions: Dimensions to keep (default: none, for grand totals).
+        :param freq: Optional period alias ('D', 'W', 'M', 'Q' or 'Y') the date dimension is coarsened to;
+                     periods are labeled by their start.
+        :return: DataFrame sorted by the kept dimensions, with columns 'count', 'sum', 'mean' and 'std'
+                 (sample, ddof=1).
+        """
+        dimensions = list(dimensions or [])
+        unknown = [col for col in dimensions if col not in self.labels]
+        if unknown:
+            raise ValueError(f"Columns {unknown} are not dimensions of the cube; expected some of {self.dimensions}.")
+        if freq is not None and freq not in self.PERIODS:
+            raise ValueError(f"Unknown period '{freq}'; expected one of {list(self.PERIODS)}.")
+
+        labels, codes = [], []
+        for column in dimensions:
+            column_labels, column_codes = self.labels[column], self.codes[column]
+            if column == self.date_column and freq is not None:
+                # Map each day to its period once, then the cells through their day codes.
+                period_codes, periods = pd.factorize(column_labels.to_period(freq), sort=True)
+                column_labels = pd.Index(periods.start_time, name=column)
+                column_codes = period_codes[column_codes]
+            labels.append(column_labels)
+            codes.append(column_codes)
+
+        groups, group_codes = _combine(codes, [len(index) for index in labels], len(self))
+        n_groups = len(group_codes[0]) if dimensions else int(len(self) > 0)
+        count = np.bincount(groups, weights=self.count, minlength=n_groups)
+        total = np.bincount(groups, weights=self.total, minlength=n_groups)
+        sumsq = np.bincount(groups, weights=self.sumsq, minlength=n_groups)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = total / count
+            m2 = np.maximum(sumsq - (total - count * self.shift) ** 2 / count, 0.0)
+            std = np.where(count > 1, np.sqrt(m2 / (count - 1)), np.nan)
+        frame = pd.DataFrame({column: index.take(group_codes[i]) for i, (column, index)
+                              in enumerate(zip(dimensions, labels))})
+        frame['count'] = count.astype('int64')
+        frame['sum'] = total
+        frame['mean'] = mean
+        frame['std'] = std
+        return frame
+
+    def top(self, dimension: str, n: int = 5, by: str = 'sum') -> pd.DataFrame:
+        """
+        Find the values of a dimension with the largest totals.
+        :param dimension: Dimension to rank.
+        :param n: Number of values to return.
+        :param by: Aggregate to rank by: 'sum', 'count' or 'mean'.
+        :return: The top rows of rollup([dimension]), largest first.
+        """
+        if by not in ('sum', 'count', 'mean'):
+            raise ValueError(f"Unknown aggregate '{by}'; expected 'sum', 'count' or 'mean'.")
+        return self.rollup([dimension]).nlargest(n, by).reset_index(drop=True)
+
+def _combine(codes: List[np.ndarray], sizes: List[int], n_rows: Optional[int] = None):
+    """
+    Number the distinct combinations of several code arrays in sorted order.
+    :return: Tuple of the combination number of each row and, per array, the code of each combination.
+    """
+    if not codes:
+        return np.zeros(n_rows or 0, dtype=np.int64), []
+    if np.prod([float(size) for size in sizes]) >= 2 ** 63:
+        raise ValueError("Too many dimension values to combine into 64-bit cell keys.")
+    keys = np.zeros(len(codes[0]), dtype=np.int64)
+    for column_codes, size in zip(codes, sizes):
+        keys = keys * size + column_codes
+    n_keys = int(np.prod(sizes))
+    if n_keys <= max(len(keys), 1 << 16):
+        # Few possible combinations (e.g. category by month): number them by counting, without hashing.
+        present = np.bincount(keys, minlength=n_keys) > 0
+        uniques = np.flatnonzero(present)
+        inverse = (np.cumsum(present) - 1)[keys]
+    else:
+        inverse, uniques = pd.factorize(keys, sort=True)
+    combination_codes = []
+    for size in reversed(sizes):
+        uniques, remainder = np.divmod(uniques, size)
+        combination_codes.append(remainder)
+    return inverse, combination_codes[::-1]
+
+def _compact(codes: np.ndarray, size: int) -> np.ndarray:
+    for dtype in (np.int8, np.int16, np.int32):
+        if size <= np.iinfo(dtype).max:
+            return codes.astype(dtype)
+    return codes.astype(np.int64)
@@ -1,14 +1,181 @@
+import copy
+import numpy as np
 import pandas as pd
-from typing import List, Dict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from src.aggregates import AggregateCube, GroupedMoments
+from src.clustering import minibatch_kmeans, nearest_centers
+from src.cache import ResultCache, cached_result, frame_fingerprint
+from src.profiling import Profiler, profiled
+from src.sketches import HyperLogLog, KLLSketch, SpaceSaving
 
 class DataAnalyzer:
-    def __init__(self, data: pd.DataFrame):
+    ANALYSES = ("summary", "time-series", "category", "segmentation", "rfm")
+    # Resample frequencies of time_series_analysis and the pandas period they map to.
+    FREQUENCIES = {"day": "D", "week": "W", "month": "M"}
+    # RFM segments from recency and frequency scores scaled to (0, 1]: the first rule that matches wins.
+    RFM_SEGMENTS = (
+        ("Champions", lambda r, f: (r > 0.6) & (f > 0.6)),
+        ("Recent", lambda r, f: r > 0.6),
+        ("Loyal", lambda r, f: (r > 0.2) & (f > 0.6)),
+        ("At Risk", lambda r, f: f > 0.6),
+        ("Needs Attention", lambda r, f: r > 0.2),
+        ("Hibernating", lambda r, f: r <= 0.2),
+    )
+
+    def __init__(self, data: pd.DataFrame, profiler: Optional[Profiler] = None,
+                 result_cache: Optional[ResultCache] = None, fingerprint: Optional[str] = None):
         """
-        Initialize the DataAnalyzer with a DataFrame.
+        Initialize the DataAnalyzer with a DataFrame. The analyses only read from it, so results do
+        not depend on the order in which they are run.
         :param data: DataFrame to analyze.
+        :param profiler: Optional profiler recording each analysis.
+        :param result_cache: Optional cache serving repeated analyses with the same arguments.
+        :param fingerprint: Key of the data in the result cache, e.g. a file_fingerprint of its source
+                            and of the filters applied when loading it. Defaults to a hash of the contents.
         """
         self.data = data
+        self.profiler = profiler
+        self.result_cache = result_cache
+        self._fingerprint = fingerprint
+
+    @property
+    def data(self) -> pd.DataFrame:
+        return self._data
+
+    @data.setter
+    def data(self, data: pd.DataFrame):
+        self._data = data
+        self._fingerprint = None
+        self._category_aggregates: Dict[Tuple[str, str], pd.DataFrame] = {}
+        self._cubes: Dict[Tuple[str, ...], AggregateCube] = {}
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        Key of the data in the result cache, computed from its contents unless given.
+        """
+        if self._fingerprint is None:
+            self._fingerprint = frame_fingerprint(self.data)
+        return self._fingerprint
+
+    def category_aggregates(self, category_column: str, value_column: str) -> pd.DataFrame:
+        """
+        Compute sum, mean, median and std dev per category in a single groupby.
+        The result is memoized, so every analysis grouping by the same columns shares one pass.
+        :param category_column: Column to group by.
+        :param value_column: Column to aggregate.
+        :return: DataFrame indexed by category with columns 'sum', 'mean', 'median' and 'std'.
+        """
+        key = (category_column, value_column)
+        if key not in self._category_aggregates:
+            grouped = self.data.groupby(category_column, observed=True)[value_column]
+            self._category_aggregates[key] = grouped.agg(['sum', 'mean', 'median', 'std'])
+        return self._category_aggregates[key]
+
+    @profiled("analyzer.aggregate_cube")
+    def aggregate_cube(self, category_column: str = "category", customer_column: str = "customer_id",
+                       date_column: str = "date", value_column: str = "amount") -> AggregateCube:
+        """
+        Build the (category, customer, day) cube of count, sum and sum of squares of the values.
+        The cube is memoized, so drill-down queries after the first add up its cells instead of
+        regrouping the rows, and so do category totals and time series at a frequency once it is built.
+        :param category_column: Column with the categories.
+        :param customer_column: Column with the customer IDs.
+        :param date_column: Column with the dates, truncated to days.
+        :param value_column: Column to aggregate.
+        :return: AggregateCube.
+        """
+        key = (category_column, customer_column, date_column, value_column)
+        if key not in self._cubes:
+            self._cubes[key] = AggregateCube.build(self.data, [category_column, customer_column, date_column],
+                                                   value_column, date_column=date_column)
+        return self._cubes[key]
+
+    @profiled("analyzer.drill_down")
+    def drill_down(self, dimensions: Optional[List[str]] = None, freq: Optional[str] = None,
+                   category_column: str = "category", customer_column: str = "customer_id",
+                   date_column: str = "date", value_column: str = "amount") -> pd.DataFrame:
+        """
+        Aggregate the values over any subset of the category, customer and date columns, e.g.
+        category totals, monthly series per category, or one customer's daily spending.
+        :param dimensions: Columns to keep (default: none, for grand totals).
+        :param freq: Optional frequency ('day', 'week' or 'month') the dates are coarsened to.
+        :param category_column: Column with the categories.
+        :param customer_column: Column with the customer IDs.
+        :param date_column: Column with the dates.
+        :param value_column: Column to aggregate.
+        :return: DataFrame with the kept columns and columns 'count', 'sum', 'mean' and 'std'.
+        """
+        if freq is not None and freq not in self.FREQUENCIES:
+            raise ValueError(f"Unknown frequency '{freq}'; expected one of {list(self.FREQUENCIES)}.")
+        cube = self.aggregate_cube(category_column, customer_column, date_column, value_column)
+        return cube.rollup(dimensions, self.FREQUENCIES[freq] if freq is not None else None)
 
+    def built_cube(self, columns: List[str], value_column: str,
+                   date_column: Optional[str] = None) -> Optional[AggregateCube]:
+        """
+        Find an already built cube that can replace a groupby of the rows, without building one.
+        :param columns: Columns to group by, other than the date column.
+        :param value_column: Column to aggregate.
+        :param date_column: Optional date column to group by, at a frequency of a day or longer.
+        :return: A memoized cube with these dimensions that left out no row with a value, or None.
+        """
+        for cube_value_column, cube in ((key[-1], cube) for key, cube in self._cubes.items()):
+            dimensions = set(cube.dimensions) - {cube.date_column}
+            if (cube_value_column == value_column and cube.skipped == 0 and set(columns) <= dimensions
+                    and (date_column is None or date_column == cube.date_column)):
+                return cube
+        return None
+
+    @profiled("analyzer.run_analyses")
+    def run_analyses(self, analyses: List[str], category_column: str = "category", value_column: str = "amount",
+                     date_column: str = "date", customer_column: str = "customer_id",
+                     top_n: int = 5, freq: Optional[str] = None, window: Optional[int] = None,
+                     by_category: bool = False, clusters: Optional[int] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Run several analyses, sharing groupby work between those that group by the same keys.
+        :param analyses: Names of the analyses to run, from DataAnalyzer.ANALYSES, or ["all"].
+        :param category_column: Column containing categories.
+        :param value_column: Column containing spending values.
+        :param date_column: Column containing date values.
+        :param customer_column: Column containing customer identifiers.
+        :param top_n: Number of top categories for the category analysis.
+        :param freq: Resample frequency of the time-series analysis ('day', 'week' or 'month').
+        :param window: Rolling window of the time-series analysis, in periods.
+        :param by_category: Break the time-series analysis down by category.
+        :param clusters: Number of k-means clusters of the RFM analysis (default: rule-based segments only).
+        :return: Dictionary mapping each analysis name to its result, in request order.
+        """
+        if "all" in analyses:
+            analyses = list(self.ANALYSES)
+        unknown = [name for name in analyses if name not in self.ANALYSES]
+        if unknown:
+            raise ValueError(f"Unknown analyses: {unknown}")
+
+        if self.result_cache is None and "summary" in analyses and "category" in analyses:
+            # Both read from the same per-category aggregates, so compute them once up front
+            # (with a result cache, they are computed on the first miss instead). Alone, the
+            # category analysis only needs sums, which are cheaper than the full aggregates.
+            if category_column in self.data.columns and value_column in self.data.columns:
+                self.category_aggregates(category_column, value_column)
+
+        results = {}
+        for name in dict.fromkeys(analyses):
+            if name == "summary":
+                results[name] = self.summary_statistics(category_column, value_column)
+            elif name == "time-series":
+                results[name] = self.time_series_analysis(date_column, value_column, freq, window,
+                                                          category_column if by_category else None)
+            elif name == "category":
+                results[name] = self.top_spending_categories(category_column, value_column, top_n)
+            elif name == "segmentation":
+                results[name] = self.customer_segmentation(customer_column, value_column)
+            elif name == "rfm":
+                results[name] = self.rfm_segmentation(customer_column, value_column, date_column, clusters=clusters)
+        return results
+
+    @profiled("analyzer.summary_statistics")
+    @cached_result
     def summary_statistics(self, category_column: str, value_column: str) -> pd.DataFrame:
         """
         Calculate summary statistics (mean, median, std dev) grouped by a category.
@@ -19,21 +186,69 @@ class DataAnalyzer:
         if category_column not in self.data.columns or value_column not in self.data.columns:
             raise ValueError(f"Columns '{category_column}' or '{value_column}' not found in the DataFrame.")
         
-        return self.data.groupby(category_column)[value_column].agg(['mean', 'median', 'std']).reset_index()
+        return self.category_aggregates(category_column, value_column)[['mean', 'median', 'std']].reset_index()
 
-    def time_series_analysis(self, date_column: str, value_column: str) -> pd.DataFrame:
+    @profiled("analyzer.time_series_analysis")
+    @cached_result
+    def time_series_analysis(self, date_column: str, value_column: str, freq: Optional[str] = None,
+                             window: Optional[int] = None, by: Optional[str] = None) -> pd.DataFrame:
         """
         Analyze spending trends over time.
+
+        Without a frequency, values are summed per distinct timestamp. With one, they are summed per
+        day, week (starting on Monday) or month, and periods without any rows are reported as 0 so that
+        rolling windows span a fixed length of time.
         :param date_column: Column containing date values.
         :param value_column: Column to analyze over time.
-        :return: DataFrame with spending trends over time.
+        :param freq: Optional resample frequency: 'day', 'week' or 'month'.
+        :param window: Optional number of periods of a trailing rolling mean, added as '<value_column>_rolling_mean'.
+        :param by: Optional column to break the series down by (e.g., the category column).
+        :return: DataFrame with spending trends over time, one row per period (and group).
         """
         if date_column not in self.data.columns or value_column not in self.data.columns:
             raise ValueError(f"Columns '{date_column}' or '{value_column}' not found in the DataFrame.")
-        
-        self.data[date_column] = pd.to_datetime(self.data[date_column], errors='coerce')
-        return self.data.groupby(date_column)[value_column].sum().reset_index()
+        if by is not None and by not in self.data.columns:
+            raise ValueError(f"Column '{by}' not found in the DataFrame.")
+        if freq is not None and freq not in self.FREQUENCIES:
+            raise ValueError(f"Unknown frequency '{freq}'; expected one of {list(self.FREQUENCIES)}.")
+        if window is not None and window < 1:
+            raise ValueError("window must be a positive integer.")
+
+        # Periods of a day or longer add up the cells of an aggregate cube when one is built.
+        cube = self.built_cube([by] if by else [], value_column, date_column) if freq is not None else None
+        if cube is not None:
+            totals = cube.rollup([date_column] + ([by] if by else []), self.FREQUENCIES[freq])
+            totals[date_column] = totals[date_column].dt.to_period(self.FREQUENCIES[freq])
+            totals = totals.set_index([date_column] + ([by] if by else []))['sum'].rename(value_column)
+        else:
+            # Group by a local series rather than writing parsed dates back into the shared frame.
+            dates = self.data[date_column]
+            if not pd.api.types.is_datetime64_any_dtype(dates):
+                dates = pd.to_datetime(dates, errors='coerce')
+            if freq is not None:
+                dates = dates.dt.to_period(self.FREQUENCIES[freq])
+            keys = [dates.rename(date_column)] + ([self.data[by]] if by else [])
+            totals = self.data[value_column].groupby(keys, observed=True).sum()
+
+        # Rolling windows and filled periods need one column per group on a shared time axis.
+        wide = by is not None and (freq is not None or window is not None)
+        if wide:
+            totals = totals.unstack(by, fill_value=0)
+        if freq is not None:
+            if len(totals):
+                periods = pd.period_range(totals.index.min(), totals.index.max(), freq=self.FREQUENCIES[freq])
+                totals = totals.reindex(periods, fill_value=0)
+            totals.index = totals.index.start_time.rename(date_column)
 
+        result = {value_column: totals}
+        if window is not None:
+            result[f"{value_column}_rolling_mean"] = totals.rolling(window, min_periods=1).mean()
+        if wide:
+            result = {name: series.stack() for name, series in result.items()}
+        return pd.DataFrame(result).reset_index()
+
+    @profiled("analyzer.spending_distribution")
+    @cached_result
     def spending_distribution(self, value_column: str, bins: int = 10) -> pd.DataFrame:
         """
         Analyze spending distribution by dividing values into bins.
@@ -44,9 +259,11 @@ class DataAnalyzer:
         if value_column not in self.data.columns:
             raise ValueError(f"Column '{value_column}' not found in the DataFrame.")
         
-        self.data['spending_bin'] = pd.cut(self.data[value_column], bins=bins)
-        return self.data['spending_bin'].value_counts().reset_index().rename(columns={'index': 'Range', 'spending_bin': 'Count'})
+        spending_bins = pd.cut(self.data[value_column], bins=bins)
+        return spending_bins.value_counts().rename_axis('Range').reset_index(name='Count')
 
+    @profiled("analyzer.top_spending_categories")
+    @cached_result
     def top_spending_categories(self, category_column: str, value_column: str, top_n: int = 5) -> pd.DataFrame:
         """
         Identify the top spending categories.
@@ -58,8 +275,18 @@ class DataAnalyzer:
         if category_column not in self.data.columns or value_column not in self.data.columns:
             raise ValueError(f"Columns '{category_column}' or '{value_column}' not found in the DataFrame.")
         
-        return self.data.groupby(category_column)[value_column].sum().nlargest(top_n).reset_index()
+        aggregates = self._category_aggregates.get((category_column, value_column))
+        cube = self.built_cube([category_column], value_column)
+        if aggregates is not None:
+            totals = aggregates['sum'].rename(value_column)
+        elif cube is not None:
+            totals = cube.rollup([category_column]).set_index(category_column)['sum'].rename(value_column)
+        else:
+            totals = self.data.groupby(category_column, observed=True)[value_column].sum()
+        return totals.nlargest(top_n).reset_index()
 
+    @profiled("analyzer.customer_segmentation")
+    @cached_result
     def customer_segmentation(self, customer_column: str, value_column: str) -> pd.DataFrame:
         """
         Segment customers by their spending patterns.
@@ -70,6 +297,482 @@ class DataAnalyzer:
         if customer_column not in self.data.columns or value_column not in self.data.columns:
             raise ValueError(f"Columns '{customer_column}' or '{value_column}' not found in the DataFrame.")
         
-        return self.data.groupby(customer_column)[value_column].agg(['sum', 'mean', 'count']).reset_index().rename(
+        return self.data.groupby(customer_column, observed=True)[value_column].agg(['sum', 'mean', 'count']).reset_index().rename(
             columns={'sum': 'Total Spending', 'mean': 'Average Spending', 'count': 'Transaction Count'}
-        )
\ No newline at end of file
+        )
+
+    @profiled("analyzer.rfm_segmentation")
+    @cached_result
+    def rfm_segmentation(self, customer_column: str, value_column: str, date_column: str, quantiles: int = 5,
+                         clusters: Optional[int] = None, as_of: Optional[str] = None,
+                         random_state: int = 0) -> pd.DataFrame:
+        """
+        Segment customers by recency, frequency and monetary value (RFM).
+
+        Last purchase date, transaction count and total spending come from one grouped pass. Each is
+        scored from 1 to `quantiles` by its rank among customers (recency reversed, so recent customers
+        score high), and customers are labeled with the first matching rule of RFM_SEGMENTS. With
+        `clusters`, customers are instead grouped by mini-batch k-means on their standardized log RFM
+        values, and each cluster is labeled by the rules applied to its mean scores. Per-customer
+        columns use compact dtypes and clustering works in fixed-size batches, so memory grows only
+        with the number of customers.
+        :param customer_column: Column containing customer identifiers.
+        :param value_column: Column containing spending values.
+        :param date_column: Column containing transaction dates.
+        :param quantiles: Number of score levels.
+        :param clusters: Optional number of k-means clusters.
+        :param as_of: Date recency is measured from (default: the last date in the data).
+        :param random_state: Seed of the clustering.
+        :return: DataFrame with one row per customer: 'Recency' (days), 'Frequency', 'Monetary', the scores
+                 'R', 'F' and 'M', 'RFM Score' (their sum), 'Segment', and 'Cluster' when clustering.
+        """
+        missing_columns = [col for col in (customer_column, value_column, date_column) if col not in self.data.columns]
+        if missing_columns:
+            raise ValueError(f"Columns {missing_columns} not found in the DataFrame.")
+        if quantiles < 2:
+            raise ValueError("quantiles must be at least 2.")
+
+        dates = self.data[date_column]
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates, errors='coerce')
+        grouped = pd.DataFrame({'last': dates, 'value': self.data[value_column]}).groupby(
+            self.data[customer_column].rename(customer_column), observed=True)
+        rfm = grouped.agg(last=('last', 'max'), Frequency=('value', 'size'), Monetary=('value', 'sum'))
+        as_of = pd.Timestamp(as_of) if as_of is not None else dates.max()
+        rfm.insert(0, 'Recency', ((as_of - rfm.pop('last')) / pd.Timedelta(days=1)).astype(np.float32))
+        rfm['Frequency'] = rfm['Frequency'].astype(np.int32 if rfm['Frequency'].max() < 2 ** 31 else np.int64)
+
+        scores = {}
+        for column, score in (('Recency', 'R'), ('Frequency', 'F'), ('Monetary', 'M')):
+            ranks = rfm[column].rank(method='average', pct=True, ascending=column != 'Recency').to_numpy()
+            scores[score] = np.clip(np.ceil(ranks * quantiles), 1, quantiles).astype(np.int8)
+        for score, values in scores.items():
+            rfm[score] = values
+        rfm['RFM Score'] = (rfm['R'] + rfm['F'] + rfm['M']).astype(np.int16)
+
+        if clusters is None:
+            rfm['Segment'] = self._rfm_segments(rfm['R'].to_numpy() / quantiles, rfm['F'].to_numpy() / quantiles)
+        else:
+            features = np.log1p(rfm[['Recency', 'Frequency', 'Monetary']].clip(lower=0).to_numpy(dtype=np.float32))
+            spread = features.std(axis=0)
+            features = (features - features.mean(axis=0)) / np.where(spread > 0, spread, 1)
+            centers = minibatch_kmeans(features, clusters, random_state=random_state)
+            labels, _ = nearest_centers(features, centers)
+            means = rfm[['R', 'F']].groupby(labels).mean().reindex(range(clusters))
+            names = self._rfm_segments(means['R'].to_numpy() / quantiles, means['F'].to_numpy() / quantiles)
+            rfm['Cluster'] = labels
+            rfm['Segment'] = pd.Categorical.from_codes(labels, [f"{name} ({i})" for i, name in enumerate(names)])
+        return rfm.reset_index()
+
+    def _rfm_segments(self, recency: np.ndarray, frequency: np.ndarray) -> pd.Categorical:
+        names = [name for name, _ in self.RFM_SEGMENTS]
+        codes = np.select([rule(recency, frequency) for _, rule in self.RFM_SEGMENTS], range(len(names)), -1)
+        return pd.Categorical.from_codes(codes, names)
+
+class StreamingAnalyzer:
+    def __init__(self, category_column: str = "category", value_column: str = "amount",
+                 customer_column: Optional[str] = "customer_id", sketch_k: int = 200,
+                 profiler: Optional[Profiler] = None, medians: bool = True):
+        """
+        Initialize an analyzer that folds partial aggregates over a stream of DataFrame chunks.
+
+        Counts, sums, means and standard deviations merge exactly. Medians come from one KLL
+        sketch per category: they are exact for categories with fewer than `sketch_k` rows and
+        approximate beyond that (normalized rank error of roughly 2.3 / sketch_k), unless
+        `compute_exact_medians` is run as a second pass over the data.
+        Memory is bounded by the chunk size plus the number of distinct categories and customers.
+        :param category_column: Column to group by for summary and category analyses.
+        :param value_column: Column containing spending values.
+        :param customer_column: Column containing customer identifiers, or None to skip segmentation.
+        :param sketch_k: Accuracy parameter of the per-category median sketches.
+        :param profiler: Optional profiler recording each folded chunk.
+        :param medians: Keep the per-category median sketches; without them, chunks are folded without
+                        a Python loop over categories and summary medians are NaN.
+        """
+        self.category_column = category_column
+        self.value_column = value_column
+        self.customer_column = customer_column
+        self.sketch_k = sketch_k
+        self.profiler = profiler
+        self.medians = medians
+        self.rows = 0
+        self.category_moments = GroupedMoments()
+        self.customer_moments = GroupedMoments()
+        self.category_sketches: Dict[Any, KLLSketch] = {}
+        self._exact_medians: Optional[Dict[Any, float]] = None
+
+    @profiled("streaming.update")
+    def update(self, chunk: pd.DataFrame) -> "StreamingAnalyzer":
+        """
+        Fold one chunk into the running aggregates.
+        :param chunk: Validated and cleaned DataFrame chunk.
+        :return: This analyzer.
+        """
+        columns = [self.category_column, self.value_column]
+        if self.customer_column:
+            columns.append(self.customer_column)
+        missing_columns = [col for col in columns if col not in chunk.columns]
+        if missing_columns:
+            raise ValueError(f"Columns {missing_columns} not found in the DataFrame.")
+
+        self.rows += len(chunk)
+        self.category_moments = self.category_moments.merge(
+            GroupedMoments.from_frame(chunk, self.category_column, self.value_column))
+        if self.customer_column:
+            self.customer_moments = self.customer_moments.merge(
+                GroupedMoments.from_frame(chunk, self.customer_column, self.value_column))
+        if self.medians:
+            for key, values in chunk.groupby(self.category_column, observed=True, sort=False)[self.value_column]:
+                if key not in self.category_sketches:
+                    self.category_sketches[key] = KLLSketch(self.sketch_k)
+                self.category_sketches[key].update(values.to_numpy())
+        self._exact_medians = None
+        return self
+
+    @profiled("streaming.merge")
+    def merge(self, other: "StreamingAnalyzer") -> "StreamingAnalyzer":
+        """
+        Fold the aggregates of another analyzer, built over a disjoint part of the data, into this one.
+        :param other: Analyzer configured with the same columns and sketch size.
+        :return: This analyzer.
+        """
+        if (other.category_column, other.value_column, other.customer_column, other.medians) != \
+                (self.category_column, self.value_column, self.customer_column, self.medians):
+            raise ValueError("Cannot merge analyzers configured with different columns or median settings.")
+        self.rows += other.rows
+        self.category_moments = self.category_moments.merge(other.category_moments)
+        self.customer_moments = self.customer_moments.merge(other.customer_moments)
+        for key, sketch in other.category_sketches.items():
+            if key in self.category_sketches:
+                self.category_sketches[key].merge(sketch)
+            else:
+                self.category_sketches[key] = copy.deepcopy(sketch)
+        self._exact_medians = None
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Export the running aggregates as a JSON-serializable dictionary.
+        :return: Dictionary with the configuration, aggregates and median sketches.
+        """
+        return {
+            'category_column': self.category_column,
+            'value_column': self.value_column,
+            'customer_column': self.customer_column,
+            'sketch_k': self.sketch_k,
+            'medians': self.medians,
+            'rows': self.rows,
+            'category_moments': self.category_moments.to_dict(),
+            'customer_moments': self.customer_moments.to_dict(),
+            'category_sketches': [[key, sketch.to_dict()] for key, sketch in self.category_sketches.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any], profiler: Optional[Profiler] = None) -> "StreamingAnalyzer":
+        """
+        Rebuild an analyzer exported with to_dict, ready to fold more chunks.
+        :param state: Dictionary produced by to_dict.
+        :param profiler: Optional profiler recording each folded chunk.
+        :return: StreamingAnalyzer.
+        """
+        analyzer = cls(state['category_column'], state['value_column'], state['customer_column'],
+                       state['sketch_k'], profiler, state.get('medians', True))
+        analyzer.rows = state['rows']
+        analyzer.category_moments = GroupedMoments.from_dict(state['category_moments'])
+        analyzer.customer_moments = GroupedMoments.from_dict(state['customer_moments'])
+        analyzer.category_sketches = {key: KLLSketch.from_dict(sketch) for key, sketch in state['category_sketches']}
+        return analyzer
+
+    def consume(self, chunks: Iterable[pd.DataFrame]) -> "StreamingAnalyzer":
+        """
+        Fold every chunk of an iterable into the running aggregates.
+        :param chunks: Iterable of validated and cleaned DataFrame chunks.
+        :return: This analyzer.
+        """
+        for chunk in chunks:
+            self.update(chunk)
+        return self
+
+    @profiled("streaming.compute_exact_medians")
+    def compute_exact_medians(self, chunk_source: Callable[[], Iterable[pd.DataFrame]]) -> Dict[Any, float]:
+        """
+        Replace the sketched medians by exact ones using a second pass over the data.
+
+        The sketches bracket each median by a narrow value window; the second pass counts the
+        values below the window and keeps only the values inside it, so memory stays a small
+        fraction of the data. If a window misses the median (a rare sketch error), it is widened
+        and another pass is made.
+        :param chunk_source: Callable returning a fresh iterable over the same chunks on each call.
+        :return: Dictionary mapping each category to its exact median.
+        """
+        counts = self.category_moments.frame['count']
+        medians = {key: sketch.median() for key, sketch in self.category_sketches.items() if sketch.is_exact}
+        pending = {key: sketch for key, sketch in self.category_sketches.items() if not sketch.is_exact}
+        spread = 2.0
+
+        while pending:
+            bounds = {}
+            for key, sketch in pending.items():
+                margin = spread * sketch.rank_error
+                low = sketch.quantile(max(0.0, 0.5 - margin)) if margin < 0.5 else -np.inf
+                high = sketch.quantile(min(1.0, 0.5 + margin)) if margin < 0.5 else np.inf
+                bounds[key] = (low, high)
+            below = dict.fromkeys(pending, 0)
+            window: Dict[Any, List[np.ndarray]] = {key: [] for key in pending}
+
+            for chunk in chunk_source():
+                grouped = chunk.groupby(self.category_column, observed=True, sort=False)[self.value_column]
+                for key, values in grouped:
+                    if key not in pending:
+                        continue
+                    low, high = bounds[key]
+                    values = values.dropna().to_numpy(dtype=float)
+                    below[key] += int(np.count_nonzero(values < low))
+                    window[key].append(values[(values >= low) & (values <= high)])
+
+            for key in list(pending):
+                n = int(counts[key])
+                values = np.sort(np.concatenate(window[key])) if window[key] else np.empty(0)
+                lower, upper = (n - 1) // 2 - below[key], n // 2 - below[key]
+                if 0 <= lower and upper < values.size:
+                    medians[key] = float((values[lower] + values[upper]) / 2)
+                    del pending[key]
+            spread *= 4
+
+        self._exact_medians = medians
+        return medians
+
+    def summary_statistics(self) -> pd.DataFrame:
+        """
+        Summary statistics (mean, median, std dev) per category, as in DataAnalyzer.summary_statistics.
+        :return: DataFrame with summary statistics.
+        """
+        moments = self.category_moments.to_frame()
+        medians = self._exact_medians
+        if medians is None:
+            medians = {key: sketch.median() for key, sketch in self.category_sketches.items()}
+        result = pd.DataFrame({
+            'mean': moments['mean'],
+            'median': [medians.get(key, np.nan) for key in moments.index],
+            'std': moments['std'],
+        }, index=moments.index)
+        return result.rename_axis(self.category_column).reset_index()
+
+    def top_spending_categories(self, top_n: int = 5) -> pd.DataFrame:
+        """
+        Identify the top spending categories, as in DataAnalyzer.top_spending_categories.
+        :param top_n: Number of top categories to return.
+        :return: DataFrame with top spending categories.
+        """
+        totals = self.category_moments.to_frame()['sum'].rename(self.value_column)
+        return totals.nlargest(top_n).rename_axis(self.category_column).reset_index()
+
+    def customer_segmentation(self) -> pd.DataFrame:
+        """
+        Segment customers by their spending patterns, as in DataAnalyzer.customer_segmentation.
+        :return: DataFrame with customer segmentation.
+        """
+        if not self.customer_column:
+            raise ValueError("Customer segmentation requires a customer column.")
+        moments = self.customer_moments.to_frame()
+        return pd.DataFrame({
+            'Total Spending': moments['sum'],
+            'Average Spending': moments['mean'],
+            'Transaction Count': moments['count'],
+        }, index=moments.index).rename_axis(self.customer_column).reset_index()
+
+class ApproximateAnalyzer:
+    def __init__(self, category_column: str = "category", value_column: str = "amount",
+                 customer_column: Optional[str] = "customer_id", error: float = 0.01,
+                 profiler: Optional[Profiler] = None):
+        """
+        Initialize an analyzer that answers from sketches in one streaming pass.
+
+        Unlike StreamingAnalyzer, nothing is kept per customer: distinct customers are counted with a
+        HyperLogLog sketch, and the top customers and categories by spending come from Space-Saving
+        heavy-hitter sketches. Per-category means and standard deviations stay exact, and medians come
+        from KLL sketches kept for the categories the heavy-hitter sketch tracks, at most 1 / `error`
+        of them: with fewer categories every one has a median, with more the others report NaN, and a
+        category that becomes a heavy hitter late is sketched from that point on. `error` bounds every
+        sketch: the median rank error, the relative error of the distinct count, and the overcount of
+        a heavy hitter as a fraction of total spending.
+        Memory does not depend on the number of rows or customers, but it is not constant: the exact
+        moments take a few numbers per category, so they grow with the number of categories.
+        :param category_column: Column to group by for summary and category analyses.
+        :param value_column: Column containing spending values.
+        :param customer_column: Column containing customer identifiers, or None to skip segmentation.
+        :param error: Target error of the sketches as a fraction (e.g., 0.01 for 1%).
+        :param profiler: Optional profiler recording each folded chunk.
+        """
+        self.error = error
+        self.profiler = profiler
+        self.categories = StreamingAnalyzer(category_column, value_column, None, medians=False)
+        self.customer_column = customer_column
+        self.median_sketches: Dict[Any, KLLSketch] = {}
+        self.values = KLLSketch.from_error(error)
+        self.category_totals = SpaceSaving.from_error(error)
+        self.customer_totals = SpaceSaving.from_error(error)
+        self.distinct_customer_sketch = HyperLogLog.from_error(error)
+
+    @property
+    def category_column(self) -> str:
+        return self.categories.category_column
+
+    @property
+    def value_column(self) -> str:
+        return self.categories.value_column
+
+    @property
+    def rows(self) -> int:
+        return self.categories.rows
+
+    @profiled("approximate.update")
+    def update(self, chunk: pd.DataFrame) -> "ApproximateAnalyzer":
+        """
+        Fold one chunk into the sketches.
+        :param chunk: Validated and cleaned DataFrame chunk.
+        :return: This analyzer.
+        """
+        if self.customer_column and self.customer_column not in chunk.columns:
+            raise ValueError(f"Columns {[self.customer_column]} not found in the DataFrame.")
+        self.categories.update(chunk)
+        values = chunk[self.value_column]
+        self.values.update(values.to_numpy(dtype=float))
+        self.category_totals.update(chunk[self.category_column], values)
+        tracked = self._track_median_sketches()
+        keys = chunk[self.category_column]
+        # Only rows of tracked categories reach the per-category loop, so its length is bounded by 1 / error.
+        grouped = values[keys.isin(tracked).to_numpy()].groupby(keys, observed=True, sort=False)
+        for key, group in grouped:
+            if key not in self.median_sketches:
+                self.median_sketches[key] = KLLSketch.from_error(self.error)
+            self.median_sketches[key].update(group.to_numpy(dtype=float))
+        if self.customer_column:
+            self.customer_totals.update(chunk[self.customer_column], values)
+            self.distinct_customer_sketch.update(chunk[self.customer_column])
+        return self
+
+    @profiled("approximate.merge")
+    def merge(self, other: "ApproximateAnalyzer") -> "ApproximateAnalyzer":
+        """
+        Fold the sketches of another analyzer, built over a disjoint part of the data, into this one.
+        :param other: Analyzer configured with the same columns and error.
+        :return: This analyzer.
+        """
+        if other.customer_column != self.customer_column or other.error != self.error:
+            raise ValueError("Cannot merge analyzers configured with different columns or errors.")
+        self.categories.merge(other.categories)
+        self.values.merge(other.values)
+        self.category_totals.merge(other.category_totals)
+        for key, sketch in other.median_sketches.items():
+            if key in self.median_sketches:
+                self.median_sketches[key].merge(sketch)
+            else:
+                self.median_sketches[key] = copy.deepcopy(sketch)
+        self._track_median_sketches()
+        self.customer_totals.merge(other.customer_totals)
+        self.distinct_customer_sketch.merge(other.distinct_customer_sketch)
+        return self
+
+    def _track_median_sketches(self) -> pd.Index:
+        # Categories evicted from the heavy hitters lose their median sketch, which bounds their number.
+        tracked = self.category_totals.counts.index
+        for key in [key for key in self.median_sketches if key not in tracked]:
+            del self.median_sketches[key]
+        return tracked
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Export the sketches as a JSON-serializable dictionary.
+        :return: Dictionary with the configuration and sketches.
+        """
+        return {
+            'error': self.error,
+            'customer_column': self.customer_column,
+            'categories': self.categories.to_dict(),
+            'values': self.values.to_dict(),
+            'category_totals': self.category_totals.to_dict(),
+            'median_sketches': [[key, sketch.to_dict()] for key, sketch in self.median_sketches.items()],
+            'customer_totals': self.customer_totals.to_dict(),
+            'distinct_customers': self.distinct_customer_sketch.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any], profiler: Optional[Profiler] = None) -> "ApproximateAnalyzer":
+        """
+        Rebuild an analyzer exported with to_dict, ready to fold more chunks.
+        :param state: Dictionary produced by to_dict.
+        :param profiler: Optional profiler recording each folded chunk.
+        :return: ApproximateAnalyzer.
+        """
+        categories = StreamingAnalyzer.from_dict(state['categories'])
+        analyzer = cls(categories.category_column, categories.value_column, state['customer_column'],
+                       state['error'], profiler)
+        analyzer.categories = categories
+        analyzer.values = KLLSketch.from_dict(state['values'])
+        analyzer.category_totals = SpaceSaving.from_dict(state['category_totals'])
+        analyzer.median_sketches = {key: KLLSketch.from_dict(sketch) for key, sketch in state['median_sketches']}
+        analyzer.customer_totals = SpaceSaving.from_dict(state['customer_totals'])
+        analyzer.distinct_customer_sketch = HyperLogLog.from_dict(state['distinct_customers'])
+        return analyzer
+
+    def consume(self, chunks: Iterable[pd.DataFrame]) -> "ApproximateAnalyzer":
+        """
+        Fold every chunk of an iterable into the sketches.
+        :param chunks: Iterable of validated and cleaned DataFrame chunks.
+        :return: This analyzer.
+        """
+        for chunk in chunks:
+            self.update(chunk)
+        return self
+
+    def summary_statistics(self) -> pd.DataFrame:
+        """
+        Summary statistics (mean, median, std dev) per category, with sketched medians; categories
+        outside the heavy hitters have a NaN median.
+        :return: DataFrame with summary statistics.
+        """
+        result = self.categories.summary_statistics()
+        result['median'] = [self.median_sketches[key].median() if key in self.median_sketches else np.nan
+                            for key in result[self.category_column]]
+        return result
+
+    def quantiles(self, qs: Iterable[float] = (0.25, 0.5, 0.75, 0.9, 0.99)) -> pd.DataFrame:
+        """
+        Estimate quantiles of the spending values over all rows.
+        :param qs: Quantiles between 0 and 1.
+        :return: DataFrame with 'quantile' and value columns.
+        """
+        qs = list(qs)
+        return pd.DataFrame({'quantile': qs, self.value_column: [self.values.quantile(q) for q in qs]})
+
+    def distinct_customers(self) -> float:
+        """
+        Estimate the number of distinct customers.
+        :return: Estimated distinct count.
+        """
+        if not self.customer_column:
+            raise ValueError("Counting customers requires a customer column.")
+        return self.distinct_customer_sketch.estimate()
+
+    def top_spending_categories(self, top_n: int = 5) -> pd.DataFrame:
+        """
+        Identify the top spending categories from the heavy-hitter sketch.
+        :param top_n: Number of top categories to return.
+        :return: DataFrame with the estimated total spending of each category and its maximum overcount.
+        """
+        top = self.category_totals.top(top_n)
+        result = pd.DataFrame({self.value_column: top['estimate'], 'Max Error': top['error']})
+        return result.rename_axis(self.category_column).reset_index()
+
+    def customer_segmentation(self, top_n: int = 100) -> pd.DataFrame:
+        """
+        Report the top customers by spending from the heavy-hitter sketch, instead of one row per customer.
+        :param top_n: Number of customers to return.
+        :return: DataFrame with the estimated total spending of each customer and its maximum overcount.
+        """
+        if not self.customer_column:
+            raise ValueError("Customer segmentation requires a customer column.")
+        top = self.customer_totals.top(top_n)
+        result = pd.DataFrame({'Total Spending': top['estimate'], 'Max Error': top['error']})
+        return result.rename_axis(self.customer_column).reset_index()
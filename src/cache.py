@@ -0,0 +1,292 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+import threading
+from collections import OrderedDict
+import pandas as pd
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+def file_fingerprint(file_path: str, *extra: Any) -> str:
+    """
+    Compute a cache key for a source file from its path, size and modification time.
+    :param file_path: Path to the source file.
+    :param extra: Additional values that change what is derived from the file (e.g., required columns).
+    :return: Hexadecimal fingerprint.
+    """
+    stat = os.stat(file_path)
+    payload = json.dumps([os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns, list(extra)], default=repr)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+def frame_fingerprint(data: pd.DataFrame) -> str:
+    """
+    Compute a cache key for a DataFrame from its contents, for data that does not come from a file.
+    :param data: DataFrame to fingerprint.
+    :return: Hexadecimal fingerprint.
+    """
+    digest = hashlib.sha256(json.dumps([list(map(str, data.columns)), list(map(str, data.dtypes))]).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    return digest.hexdigest()[:32]
+
+class ColumnarCache:
+    EXTENSION = ".feather"
+
+    def __init__(self, cache_dir: str, max_bytes: Optional[int] = 1 << 30):
+        """
+        Initialize an on-disk cache of cleaned DataFrames stored as uncompressed Feather files,
+        which are memory-mapped on read instead of being parsed.
+        :param cache_dir: Directory holding the cache files (created on first write).
+        :param max_bytes: Total size budget; least recently used files are evicted beyond it. None disables eviction.
+        """
+        try:
+            import pyarrow.feather  # noqa: F401
+        except ImportError as e:
+            raise ImportError(f"The columnar cache requires pyarrow: {e}")
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def path_for(self, key: str) -> str:
+        """
+        Path of the cache file for a key.
+        :param key: Cache key, usually from file_fingerprint.
+        :return: Path of the cache file.
+        """
+        return os.path.join(self.cache_dir, key + self.EXTENSION)
+
+    def sidecar_path(self, key: str, suffix: str) -> str:
+        """
+        Path of a file derived from a cache entry (e.g., its row index). Sidecars are evicted
+        and cleared together with their entry.
+        :param key: Cache key.
+        :param suffix: File name suffix, e.g. 'index.npz'.
+        :return: Path of the sidecar file.
+        """
+        return os.path.join(self.cache_dir, f"{key}.{suffix}")
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """
+        Load a cached DataFrame.
+        :param key: Cache key.
+        :return: Cached DataFrame, or None on a miss or unreadable entry.
+        """
+        from pyarrow import feather
+
+        path = self.path_for(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            table = feather.read_table(path, memory_map=True)
+            data = table.to_pandas(split_blocks=True)
+        except Exception:
+            self._remove(path)
+            return None
+        os.utime(path)
+        return data
+
+    def put(self, key: str, data: pd.DataFrame) -> str:
+        """
+        Store a DataFrame in the cache and evict old entries beyond the size budget.
+        :param key: Cache key.
+        :param data: DataFrame to store.
+        :return: Path of the cache file.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path_for(key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            data.reset_index(drop=True).to_feather(temp_path, compression="uncompressed")
+            # Sidecars were derived from the replaced data.
+            for sidecar in self._sidecars(path):
+                self._remove(sidecar)
+            os.replace(temp_path, path)
+        finally:
+            self._remove(temp_path)
+        self.evict(keep=[path])
+        return path
+
+    def evict(self, keep: Optional[List[str]] = None) -> List[str]:
+        """
+        Remove least recently used cache files until the cache fits in max_bytes.
+        :param keep: Paths that must not be evicted.
+        :return: Paths of the removed files.
+        """
+        if self.max_bytes is None or not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith(self.EXTENSION) and os.path.isfile(path):
+                stat = os.stat(path)
+                size = stat.st_size + sum(os.path.getsize(sidecar) for sidecar in self._sidecars(path))
+                entries.append((stat.st_mtime, size, path))
+
+        total = sum(size for _, size, _ in entries)
+        removed = []
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if keep and path in keep:
+                continue
+            for sidecar in self._sidecars(path):
+                self._remove(sidecar)
+            self._remove(path)
+            total -= size
+            removed.append(path)
+        return removed
+
+    def clear(self) -> None:
+        """
+        Remove every cache file.
+        """
+        if os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(self.EXTENSION):
+                    path = os.path.join(self.cache_dir, name)
+                    for sidecar in self._sidecars(path):
+                        self._remove(sidecar)
+                    self._remove(path)
+
+    def _sidecars(self, path: str) -> List[str]:
+        prefix = os.path.basename(path)[:-len(self.EXTENSION)] + "."
+        return [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                if name.startswith(prefix) and not name.endswith(self.EXTENSION) and not name.endswith(".tmp")]
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+class ResultCache:
+    def __init__(self, max_bytes: int = 64 << 20, cache_dir: Optional[str] = None, refresh: bool = False):
+        """
+        Initialize a cache of analysis results keyed by (dataset fingerprint, method, arguments).
+
+        Results are kept in an in-process LRU and, if a directory is given, in a ColumnarCache on disk
+        so that they survive the process. A changed source file has a new fingerprint, so its stale
+        results are never returned; they age out of both stores.
+        :param max_bytes: Size budget of each store; least recently used results are evicted beyond it.
+        :param cache_dir: Optional directory of the on-disk store (requires pyarrow).
+        :param refresh: Never serve stored results, but store new ones over them, e.g. to rebuild
+                        results computed before a cache rebuild.
+        """
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+        self.disk = ColumnarCache(cache_dir, max_bytes=max_bytes) if cache_dir else None
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.bytes = 0
+        self._entries: "OrderedDict[str, Tuple[pd.DataFrame, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(fingerprint: str, method: str, arguments: Dict[str, Any]) -> str:
+        """
+        Compute the key of a result.
+        :param fingerprint: Fingerprint of the analyzed data.
+        :param method: Name of the analysis method.
+        :param arguments: Arguments of the call, by name.
+        :return: Hexadecimal key.
+        """
+        payload = json.dumps([fingerprint, method, sorted(arguments.items())], default=repr)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """
+        Look up a result in memory, then on disk.
+        :param key: Result key.
+        :return: Copy of the cached result, or None on a miss.
+        """
+        if self.refresh:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0].copy()
+        result = self.disk.get(key) if self.disk is not None else None
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+        self._remember(key, result)
+        return result.copy()
+
+    def put(self, key: str, result: pd.DataFrame) -> None:
+        """
+        Store a result in memory and on disk.
+        :param key: Result key.
+        :param result: Result to store; a copy is kept, so later changes to it are not cached.
+        """
+        self._remember(key, result.copy())
+        if self.disk is not None:
+            try:
+                self.disk.put(key, result)
+            except Exception:
+                # Results Feather cannot store (e.g., interval columns) are only kept in memory.
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Report the cache counters.
+        :return: Dictionary with the 'hits' (of which 'disk_hits'), 'misses', and the 'entries' and
+                 'bytes' held in memory.
+        """
+        with self._lock:
+            return {'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses,
+                    'entries': len(self._entries), 'bytes': self.bytes}
+
+    def clear(self) -> None:
+        """
+        Remove every result from memory and disk.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+        if self.disk is not None:
+            self.disk.clear()
+
+    def _remember(self, key: str, result: pd.DataFrame) -> None:
+        size = int(result.memory_usage(index=True, deep=True).sum())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (result, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                self.bytes -= self._entries.popitem(last=False)[1][1]
+
+def cached_result(method: Callable) -> Callable:
+    """
+    Decorate an analysis method of a class with `result_cache` and `fingerprint` attributes so that
+    its results are served from the cache for repeated calls with the same arguments on the same data.
+    Calls are not cached when `result_cache` is None.
+    :param method: Method returning a DataFrame.
+    :return: Method wrapper.
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        result_cache = getattr(self, 'result_cache', None)
+        if result_cache is None:
+            return method(self, *args, **kwargs)
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(list(bound.arguments.items())[1:])
+        key = result_cache.key(self.fingerprint, method.__name__, arguments)
+        result = result_cache.get(key)
+        if result is None:
+            result = method(self, *args, **kwargs)
+            result_cache.put(key, result)
+        return result
+    return wrapper
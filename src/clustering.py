@@ -0,0 +1,69 @@
+import numpy as np
+from typing import Tuple
+
+def minibatch_kmeans(features: np.ndarray, k: int, batch_size: int = 4096, iterations: int = 100,
+                     random_state: int = 0) -> np.ndarray:
+    """
+    Find k cluster centers with mini-batch k-means (Sculley, 2010).
+
+    Centers are seeded with k-means++ on a sample, then each iteration assigns one random batch to
+    its nearest centers and moves every center to the running mean of the points assigned to it so
+    far. Work and memory per iteration depend on the batch size, not on the number of points.
+    :param features: Array of shape (n_points, n_features).
+    :param k: Number of clusters.
+    :param batch_size: Points drawn per iteration.
+    :param iterations: Number of iterations.
+    :param random_state: Seed of the sampling.
+    :return: Array of shape (k, n_features) of cluster centers.
+    """
+    features = np.asarray(features)
+    n = len(features)
+    if k < 1:
+        raise ValueError("k must be a positive integer.")
+    if n < k:
+        raise ValueError(f"Cannot form {k} clusters from {n} points.")
+    rng = np.random.default_rng(random_state)
+    sample = features[rng.choice(n, size=min(n, max(batch_size, 10 * k)), replace=False)]
+    centers = _kmeans_plus_plus(sample, k, rng)
+    counts = np.zeros(k)
+    for _ in range(iterations):
+        batch = features[rng.integers(0, n, size=min(batch_size, n))]
+        labels, _ = nearest_centers(batch, centers)
+        batch_counts = np.bincount(labels, minlength=k)
+        sums = np.stack([np.bincount(labels, weights=batch[:, j], minlength=k) for j in range(batch.shape[1])],
+                        axis=1)
+        counts += batch_counts
+        updated = batch_counts > 0
+        # Running mean: each center moves toward its new points with a step of 1 / (points seen so far).
+        centers[updated] += (sums[updated] - batch_counts[updated, None] * centers[updated]) / counts[updated, None]
+    return centers
+
+def nearest_centers(features: np.ndarray, centers: np.ndarray,
+                    chunk_rows: int = 65_536) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Assign points to their nearest center, a chunk of rows at a time to bound temporary memory.
+    :param features: Array of shape (n_points, n_features).
+    :param centers: Array of shape (k, n_features).
+    :param chunk_rows: Rows per chunk.
+    :return: Tuple of the label of each point and its squared distance to that center.
+    """
+    labels = np.empty(len(features), dtype=np.int32)
+    distances = np.empty(len(features))
+    center_norms = (centers * centers).sum(axis=1)
+    for start in range(0, len(features), chunk_rows):
+        chunk = np.asarray(features[start:start + chunk_rows], dtype=float)
+        squared = (chunk * chunk).sum(axis=1)[:, None] - 2 * chunk @ centers.T + center_norms
+        labels[start:start + len(chunk)] = np.argmin(squared, axis=1)
+        distances[start:start + len(chunk)] = np.maximum(squared.min(axis=1), 0.0)
+    return labels, distances
+
+def _kmeans_plus_plus(points: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    centers = np.empty((k, points.shape[1]))
+    centers[0] = points[rng.integers(len(points))]
+    _, distances = nearest_centers(points, centers[:1])
+    for i in range(1, k):
+        total = distances.sum()
+        index = rng.choice(len(points), p=distances / total) if total > 0 else rng.integers(len(points))
+        centers[i] = points[index]
+        distances = np.minimum(distances, ((points - centers[i]) ** 2).sum(axis=1))
+    return centers
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+from typing import List, Optional
+
+def numeric_columns(data: pd.DataFrame) -> List[str]:
+    """
+    List the numeric and boolean columns of a DataFrame, the columns a correlation is defined on.
+    :param data: DataFrame.
+    :return: Column names, in frame order.
+    """
+    return list(data.select_dtypes(include=['number', 'bool']).columns)
+
+def correlation_matrix(data: pd.DataFrame, columns: Optional[List[str]] = None, sample_rows: Optional[int] = None,
+                       random_state: int = 0) -> pd.DataFrame:
+    """
+    Compute Pearson correlations between numeric columns with matrix products instead of a loop over
+    column pairs, matching `DataFrame.corr()`.
+
+    Without missing values, this is one product of the centered values with themselves. With missing
+    values, each pair uses the rows where both columns are present, which takes three more products
+    of the same size against the presence mask.
+    :param data: DataFrame containing the data.
+    :param columns: Columns to correlate (default: every numeric column).
+    :param sample_rows: Optional number of rows to sample uniformly without replacement first.
+    :param random_state: Seed of the row sample.
+    :return: Square DataFrame of correlations, NaN for pairs without variance.
+    """
+    columns = numeric_columns(data) if columns is None else list(columns)
+    if not columns:
+        raise ValueError("No numeric columns to correlate.")
+    if sample_rows is not None and sample_rows < len(data):
+        data = data.sample(n=sample_rows, random_state=random_state)
+    values = data[columns].to_numpy(dtype=float, na_value=np.nan)
+
+    present = ~np.isnan(values)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Centering first does not change the correlations but keeps the products well conditioned.
+        values = np.where(present, values - np.nanmean(values, axis=0), 0.0)
+        if present.all():
+            covariance = values.T @ values
+            variance = np.diag(covariance)
+            correlation = covariance / np.sqrt(np.outer(variance, variance))
+        else:
+            mask = present.astype(float)
+            counts = mask.T @ mask
+            # sums[i, j]: sum of column i over the rows where column j is present.
+            sums = values.T @ mask
+            squares = (values * values).T @ mask
+            covariance = values.T @ values - sums * sums.T / counts
+            variance = squares - sums * sums / counts
+            correlation = covariance / np.sqrt(variance * variance.T)
+            correlation[counts < 2] = np.nan
+    correlation = np.clip(correlation, -1.0, 1.0)
+    return pd.DataFrame(correlation, index=columns, columns=columns)
+
+def cluster_order(correlation: pd.DataFrame) -> List[str]:
+    """
+    Order columns so that strongly correlated ones sit next to each other (spectral seriation).
+
+    Columns are sorted by the Fiedler vector of the graph whose edge weights are absolute
+    correlations, which places each column near those it correlates with, in one eigendecomposition.
+    :param correlation: Square correlation matrix.
+    :return: Column names in clustered order.
+    """
+    columns = list(correlation.columns)
+    if len(columns) < 3:
+        return columns
+    affinity = np.nan_to_num(np.abs(correlation.to_numpy(dtype=float)))
+    np.fill_diagonal(affinity, 0.0)
+    laplacian = np.diag(affinity.sum(axis=1)) - affinity
+    _, vectors = np.linalg.eigh(laplacian)
+    order = np.argsort(vectors[:, 1], kind='stable')
+    return [columns[i] for i in order]
@@ -1,14 +1,86 @@
+import functools
+import io
+import os
+import warnings
+import numpy as np
 import pandas as pd
-from typing import List, Optional
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from src.cache import ColumnarCache, file_fingerprint
+from src.indexing import DatasetIndex
+from src.profiling import Profiler, profiled, profiled_iteration
+from src.validation import ValidationReport, ValidationRules, reject
+
+@dataclass
+class CsvSchema:
+    """
+    Column types declared up front and applied while the CSV is parsed, instead of being inferred
+    and converted afterwards.
+    :param dtypes: Mapping of column names to dtypes (e.g., {"amount": "float64"}); numeric dtypes are
+                   applied by DataLoader.clean_data, so that values that are not numbers reject their row.
+    :param date_columns: Columns to parse as dates.
+    :param date_format: strftime format of the date columns; None lets pandas infer it.
+    :param categorical_columns: Columns to load with the 'category' dtype (e.g., grouping keys).
+    :param engine: read_csv parser engine, e.g. 'pyarrow'; None uses the default C parser.
+    """
+    dtypes: Dict[str, str] = field(default_factory=dict)
+    date_columns: List[str] = field(default_factory=list)
+    date_format: Optional[str] = None
+    categorical_columns: List[str] = field(default_factory=list)
+    engine: Optional[str] = None
+
+    @property
+    def declared_columns(self) -> List[str]:
+        """
+        Columns whose type is fixed by the schema.
+        """
+        return list(dict.fromkeys([*self.dtypes, *self.date_columns, *self.categorical_columns]))
 
 class DataLoader:
-    def __init__(self, required_columns: Optional[List[str]] = None):
+    # Rows read at a time when a date range or filter is streamed out of a file that is not cached.
+    DATE_RANGE_CHUNKSIZE = 250_000
+    # Suffix of the row index stored next to each columnar cache entry.
+    INDEX_SUFFIX = "index.npz"
+    # Leading values of a text column tried as numbers before the whole column is converted.
+    NUMERIC_PROBE_ROWS = 1_000
+
+    def __init__(self, required_columns: Optional[List[str]] = None, cache: Optional[ColumnarCache] = None,
+                 schema: Optional[CsvSchema] = None, profiler: Optional[Profiler] = None,
+                 sorted_by_date: bool = False, rules: Optional[ValidationRules] = None):
         """
         Initialize the DataLoader with optional required columns.
         :param required_columns: List of column names that must be present in the data.
+        :param cache: Optional columnar cache used by load_clean to skip parsing unchanged files.
+        :param schema: Optional declared schema; when given, only the required columns are read.
+        :param profiler: Optional profiler recording each loading stage.
+        :param sorted_by_date: The files list rows in ascending date order, so streamed date-range
+                               reads can stop at the first row past the end date.
+        :param rules: Optional row rules checked after cleaning (see apply_rules).
         """
         self.required_columns = required_columns
+        self.cache = cache
+        self.schema = schema
+        self.profiler = profiler
+        self.sorted_by_date = sorted_by_date
+        self.rules = rules
+        # Rows checked and rejected by this loader. Files read from the cache were checked when
+        # they were first parsed; analyze_partitions adds the counts of its worker processes.
+        self.report = ValidationReport()
+
+    def fingerprint(self, file_path: str) -> str:
+        """
+        Cache key of the cleaned contents of a file: it covers the file and everything that changes
+        what is loaded from it (required columns, schema and validation rules).
+        :param file_path: Path to the CSV file.
+        :return: Hexadecimal fingerprint.
+        """
+        if self.rules is None:
+            return file_fingerprint(file_path, self.required_columns, self.schema)
+        # Where rejected rows are quarantined does not change the loaded rows.
+        return file_fingerprint(file_path, self.required_columns, self.schema,
+                                replace(self.rules, quarantine_path=None))
 
+    @profiled("loader.load_csv")
     def load_csv(self, file_path: str) -> pd.DataFrame:
         """
         Load a CSV file into a pandas DataFrame.
@@ -16,14 +88,195 @@ class DataLoader:
         :return: Loaded DataFrame.
         """
         try:
-            data = pd.read_csv(file_path)
+            data = pd.read_csv(file_path, **self._read_csv_kwargs(file_path))
             return data
         except Exception as e:
             raise ValueError(f"Error loading CSV file: {e}")
 
+    def _read_csv_kwargs(self, file_path: Any = None, streaming: bool = False) -> Dict[str, Any]:
+        if self.schema is None:
+            return {}
+        kwargs: Dict[str, Any] = {}
+        # Numeric columns are parsed as found and converted by clean_data, so that a value that is not
+        # a number rejects its row instead of failing the whole file.
+        dtypes = {column: dtype for column, dtype in self.schema.dtypes.items() if not _is_numeric(dtype)}
+        dtypes.update({column: 'category' for column in self.schema.categorical_columns})
+        if dtypes:
+            kwargs['dtype'] = dtypes
+        if self.schema.date_columns:
+            kwargs['parse_dates'] = self.schema.date_columns
+            if self.schema.date_format:
+                kwargs['date_format'] = self.schema.date_format
+        # The pyarrow engine cannot stream in chunks, so chunked reads keep the default parser.
+        use_pyarrow = self.schema.engine == 'pyarrow' and not streaming
+        if self.schema.engine and not streaming:
+            kwargs['engine'] = self.schema.engine
+        if self.required_columns:
+            required = set(self.required_columns)
+            if use_pyarrow:
+                # The pyarrow engine only accepts a list and fails on absent columns, so keep the ones in
+                # the header and leave missing columns to validate_data, which reports them by name.
+                position = file_path.tell() if hasattr(file_path, 'seek') else None
+                header = pd.read_csv(file_path, nrows=0).columns
+                if position is not None:
+                    file_path.seek(position)
+                kwargs['usecols'] = [column for column in self.required_columns if column in header]
+            else:
+                kwargs['usecols'] = lambda column: column in required
+        return kwargs
+
+    @profiled("loader.load_clean")
+    def load_clean(self, file_path: str, rebuild_cache: bool = False, start_date: Optional[str] = None,
+                   end_date: Optional[str] = None, filters: Optional[Dict[str, List[Any]]] = None) -> pd.DataFrame:
+        """
+        Load, validate and clean a CSV file, going through the columnar cache when one is configured.
+        The cache key covers the file path, size and modification time, the required columns and the schema.
+
+        A date range and column filters are pushed down into the load: the cached copy of the whole file
+        is narrowed through its persisted row index (see load_index), and without a cache the file is
+        streamed so that only matching rows are kept in memory.
+        :param file_path: Path to the CSV file.
+        :param rebuild_cache: Ignore any cached copy and overwrite it with a fresh one.
+        :param start_date: Optional start date (inclusive) in 'YYYY-MM-DD' format.
+        :param end_date: Optional end date (inclusive) in 'YYYY-MM-DD' format.
+        :param filters: Optional mapping of columns to the values to keep, e.g. {"category": ["Food"]}.
+        :return: Validated and cleaned DataFrame.
+        """
+        has_range = start_date is not None or end_date is not None
+        if (has_range or filters) and self.cache is None:
+            chunks = list(self.load_clean_chunks(file_path, self.DATE_RANGE_CHUNKSIZE, start_date=start_date,
+                                                 end_date=end_date, filters=filters))
+            if not chunks:
+                # Nothing matches: parse the header alone for the columns of the empty result.
+                header = pd.read_csv(file_path, nrows=0, **self._read_csv_kwargs(file_path, streaming=True))
+                return self.apply_rules(self.clean_data(self.validate_data(header)))
+            return _concat_chunks(chunks)
+
+        key = None
+        data = None
+        if self.cache is not None:
+            key = self.fingerprint(file_path)
+            if not rebuild_cache:
+                data = self.cache.get(key)
+
+        if data is None:
+            data = self.apply_rules(self.clean_data(self.validate_data(self.load_csv(file_path))))
+            if key is not None:
+                try:
+                    self.cache.put(key, data)
+                except Exception as e:
+                    warnings.warn(f"Could not write columnar cache for '{file_path}': {e}")
+        if has_range or filters:
+            columns = list(filters or {}) + (['date'] if has_range else [])
+            index = self.load_index(file_path, data, columns) if key is not None else None
+            if index is not None:
+                data = index.filter(data, filters, 'date', start_date, end_date)
+            else:
+                for column, values in (filters or {}).items():
+                    data = self.filter_by_categories(data, column, values)
+                if has_range:
+                    data = self.filter_by_date_range(data, start_date, end_date)
+        return data
+
+    @profiled("loader.load_index")
+    def load_index(self, file_path: str, data: pd.DataFrame, columns: List[str]) -> DatasetIndex:
+        """
+        Get the row index of a loaded file, built once and stored next to its columnar cache entry.
+        Columns not indexed yet are added to the stored index; without a cache the index is built in memory.
+        :param file_path: Path to the CSV file the data was loaded from.
+        :param data: The DataFrame returned by load_clean for the whole file.
+        :param columns: Columns that must be indexed.
+        :return: DatasetIndex covering at least the given columns.
+        """
+        if self.cache is None:
+            return DatasetIndex.build(data, columns)
+
+        path = self.cache.sidecar_path(self.fingerprint(file_path), self.INDEX_SUFFIX)
+        index = None
+        if os.path.exists(path):
+            try:
+                index = DatasetIndex.load(path)
+            except Exception:
+                index = None
+        if index is None or index.n_rows != len(data):
+            index = DatasetIndex(len(data))
+        if index.extend(data, columns):
+            try:
+                index.save(path)
+            except OSError as e:
+                warnings.warn(f"Could not write row index for '{file_path}': {e}")
+        return index
+
+    def load_csv_chunks(self, file_path: str, chunksize: int,
+                        byte_range: Optional[Tuple[int, int]] = None) -> Iterator[pd.DataFrame]:
+        """
+        Stream a CSV file as DataFrames of at most `chunksize` rows, so memory stays bounded
+        by the chunk size rather than the file size. Reading each chunk is profiled as a
+        'loader.load_csv_chunks' stage.
+        :param file_path: Path to the CSV file.
+        :param chunksize: Maximum number of rows per chunk.
+        :param byte_range: Optional (start, end) byte offsets of whole data lines to read instead of the
+                           whole file; column names still come from the header line.
+        :return: Iterator over raw DataFrame chunks.
+        """
+        if chunksize < 1:
+            raise ValueError("chunksize must be a positive integer.")
+        kwargs = self._read_csv_kwargs(file_path, streaming=True)
+        try:
+            if byte_range is None:
+                with pd.read_csv(file_path, chunksize=chunksize, **kwargs) as reader:
+                    yield from profiled_iteration(self.profiler, "loader.load_csv_chunks", reader)
+                return
+
+            columns = pd.read_csv(file_path, nrows=0).columns
+            with open(file_path, 'rb') as f:
+                f.seek(byte_range[0])
+                source = io.BufferedReader(_ByteRangeReader(f, byte_range[1]))
+                with pd.read_csv(source, header=None, names=columns, chunksize=chunksize, **kwargs) as reader:
+                    yield from profiled_iteration(self.profiler, "loader.load_csv_chunks", reader)
+        except pd.errors.EmptyDataError:
+            return
+        except Exception as e:
+            raise ValueError(f"Error loading CSV file: {e}")
+
+    def load_clean_chunks(self, file_path: str, chunksize: int, byte_range: Optional[Tuple[int, int]] = None,
+                          start_date: Optional[str] = None, end_date: Optional[str] = None,
+                          filters: Optional[Dict[str, List[Any]]] = None) -> Iterator[pd.DataFrame]:
+        """
+        Stream a CSV file, validating and cleaning each chunk independently.
+        With a date range or filters, other rows are dropped chunk by chunk and chunks left empty are skipped;
+        if the loader was told the file is sorted by date, reading stops at the first row past the end date.
+        :param file_path: Path to the CSV file.
+        :param chunksize: Maximum number of rows per chunk.
+        :param byte_range: Optional (start, end) byte offsets of whole data lines to read instead of the whole file.
+        :param start_date: Optional start date (inclusive) in 'YYYY-MM-DD' format.
+        :param end_date: Optional end date (inclusive) in 'YYYY-MM-DD' format.
+        :param filters: Optional mapping of columns to the values to keep.
+        :return: Iterator over validated and cleaned DataFrame chunks.
+        """
+        has_range = start_date is not None or end_date is not None
+        end = pd.to_datetime(end_date) if end_date is not None else None
+        for chunk in self.load_csv_chunks(file_path, chunksize, byte_range):
+            chunk = self.apply_rules(self.clean_data(self.validate_data(chunk)))
+            if not has_range and not filters:
+                yield chunk
+                continue
+            past_end = self.sorted_by_date and end is not None and len(chunk) > 0 and chunk['date'].iloc[-1] > end
+            for column, values in (filters or {}).items():
+                chunk = self.filter_by_categories(chunk, column, values)
+            if has_range:
+                chunk = self.filter_by_date_range(chunk, start_date, end_date)
+            if len(chunk):
+                yield chunk
+            if past_end:
+                return
+
+    @profiled("loader.validate_data")
     def validate_data(self, data: pd.DataFrame) -> pd.DataFrame:
         """
         Validate the DataFrame by checking for required columns and handling missing values.
+        Rows missing a value in a required column (any column if none are required) are rejected,
+        unless the rules declare the column nullable; other columns may hold missing values.
         :param data: DataFrame to validate.
         :return: Validated DataFrame.
         """
@@ -32,54 +285,190 @@ class DataLoader:
             if missing_columns:
                 raise ValueError(f"Missing required columns: {missing_columns}")
 
-        # Handle missing values (example: drop rows with missing values)
-        data = data.dropna()
-        return data
+        self.report.rows_checked += len(data)
+        nullable = set(self.rules.nullable) if self.rules else set()
+        columns = [col for col in (self.required_columns or data.columns) if col not in nullable]
+        missing = data[columns].isna().to_numpy()
+        if not missing.any():
+            return data
+        return reject(data, {f"missing:{col}": missing[:, i] for i, col in enumerate(columns)}, self.report,
+                      self._quarantine_path())
 
+    @profiled("loader.clean_data")
     def clean_data(self, data: pd.DataFrame) -> pd.DataFrame:
         """
         Perform basic data cleaning such as date parsing and type conversion.
+        Text columns outside the schema become numeric when every value is a number; a sample of
+        leading values is tried first, so text columns are rejected without converting them whole.
+        Numeric columns of the schema are converted to their declared dtype; rows whose value is not a
+        number are rejected as 'invalid_number:<column>', like rows whose date cannot be parsed.
+        The input DataFrame is not modified; unchanged columns are shared with the result rather than copied.
         :param data: DataFrame to clean.
         :return: Cleaned DataFrame.
         """
+        date_format = self.schema.date_format if self.schema else None
+        declared = set(self.schema.declared_columns) if self.schema else set()
+        converted = {}
+        failures = {}
+
         # Example: Convert 'date' column to datetime if it exists
-        if 'date' in data.columns:
-            data['date'] = pd.to_datetime(data['date'], errors='coerce')
-            data = data.dropna(subset=['date'])  # Drop rows where 'date' could not be parsed
+        if 'date' in data.columns and not pd.api.types.is_datetime64_any_dtype(data['date']):
+            converted['date'] = pd.to_datetime(data['date'], errors='coerce', format=date_format)
+
+        # Declared numeric columns hold text when a value is not a number (see _read_csv_kwargs).
+        for col, dtype in (self.schema.dtypes.items() if self.schema else []):
+            if col not in data.columns or not _is_numeric(dtype) or data[col].dtype == dtype:
+                continue
+            numbers = pd.to_numeric(data[col], errors='coerce')
+            invalid = (numbers.isna() & data[col].notna()).to_numpy()
+            if invalid.any():
+                failures[f"invalid_number:{col}"] = invalid
+            converted[col] = numbers
 
         # Example: Convert numeric columns to appropriate types
-        for col in data.select_dtypes(include=['object']).columns:
-            try:
-                data[col] = pd.to_numeric(data[col], errors='ignore')
-            except Exception:
-                pass
+        for col, dtype in data.dtypes.items():
+            if col in declared or col in converted or isinstance(dtype, pd.CategoricalDtype) \
+                    or not pd.api.types.is_string_dtype(dtype):
+                continue
+            numbers = self._to_numeric(data[col])
+            if numbers is not None:
+                converted[col] = numbers
+
+        cleaned = data
+        if converted:
+            # A shallow copy takes new columns without writing into the caller's frame.
+            cleaned = data.copy(deep=False)
+            for col, values in converted.items():
+                cleaned[col] = values
+
+        # Drop rows where 'date' could not be parsed
+        if 'date' in cleaned.columns:
+            parsed = cleaned['date'].notna().to_numpy()
+            if not parsed.all():
+                failures = {"invalid_date:date": ~parsed, **failures}
+        if failures:
+            # Quarantine the rows as they were read, with the unparsed text.
+            reject(data, failures, self.report, self._quarantine_path())
+            cleaned = cleaned.loc[~np.logical_or.reduce(list(failures.values()))]
+        for col, dtype in (self.schema.dtypes.items() if self.schema else []):
+            if col in converted and _is_numeric(dtype):
+                cleaned[col] = cleaned[col].astype(dtype)
+        return cleaned
 
+    @profiled("loader.apply_rules")
+    def apply_rules(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Reject the rows failing the loader's validation rules, evaluated together as boolean masks.
+        :param data: Cleaned DataFrame.
+        :return: DataFrame of the rows passing every rule.
+        """
+        if self.rules is None:
+            return data
+        data = reject(data, self.rules.failures(data), self.report, self._quarantine_path())
+        # Text columns with bounds only hold numbers once the rows that are not have been rejected.
+        text_ranges = [col for col in self.rules.ranges if not pd.api.types.is_numeric_dtype(data[col])]
+        if text_ranges:
+            data = data.assign(**{col: pd.to_numeric(data[col]) for col in text_ranges})
         return data
 
-    def filter_by_date_range(self, data: pd.DataFrame, start_date: str, end_date: str) -> pd.DataFrame:
+    def _quarantine_path(self) -> Optional[str]:
+        return self.rules.quarantine_path if self.rules else None
+
+    def _to_numeric(self, values: pd.Series) -> Optional[pd.Series]:
+        sample = values.iloc[:self.NUMERIC_PROBE_ROWS]
+        sample = sample[sample.notna()]
+        if pd.to_numeric(sample, errors='coerce').isna().any():
+            return None
+        numbers = pd.to_numeric(values, errors='coerce')
+        if (numbers.isna() & values.notna()).any():
+            return None
+        return numbers
+
+    @profiled("loader.filter_by_date_range")
+    def filter_by_date_range(self, data: pd.DataFrame, start_date: Optional[str] = None,
+                             end_date: Optional[str] = None, index: Optional[DatasetIndex] = None) -> pd.DataFrame:
         """
         Filter the DataFrame by a date range.
+        When the dates are sorted or indexed, the bounds are found by binary search instead of
+        comparing every row.
         :param data: DataFrame to filter.
-        :param start_date: Start date (inclusive) in 'YYYY-MM-DD' format.
-        :param end_date: End date (inclusive) in 'YYYY-MM-DD' format.
+        :param start_date: Start date (inclusive) in 'YYYY-MM-DD' format; None leaves the range open.
+        :param end_date: End date (inclusive) in 'YYYY-MM-DD' format; None leaves the range open.
+        :param index: Optional row index of `data` covering the 'date' column (see load_index).
         :return: Filtered DataFrame.
         """
         if 'date' not in data.columns:
             raise ValueError("The DataFrame does not contain a 'date' column.")
+        if index is not None and 'date' in index.columns:
+            return index.filter(data, start_date=start_date, end_date=end_date)
 
-        mask = (data['date'] >= pd.to_datetime(start_date)) & (data['date'] <= pd.to_datetime(end_date))
+        dates = data['date']
+        start = pd.to_datetime(start_date) if start_date is not None else None
+        end = pd.to_datetime(end_date) if end_date is not None else None
+        if dates.is_monotonic_increasing:
+            first = dates.searchsorted(start, side='left') if start is not None else 0
+            last = dates.searchsorted(end, side='right') if end is not None else len(dates)
+            return data.iloc[first:last]
+
+        mask = pd.Series(True, index=data.index)
+        if start is not None:
+            mask &= dates >= start
+        if end is not None:
+            mask &= dates <= end
         return data.loc[mask]
 
-    def filter_by_categories(self, data: pd.DataFrame, column: str, categories: List[str]) -> pd.DataFrame:
+    @profiled("loader.filter_by_categories")
+    def filter_by_categories(self, data: pd.DataFrame, column: str, categories: List[str],
+                             index: Optional[DatasetIndex] = None) -> pd.DataFrame:
         """
         Filter the DataFrame by specific categories in a column.
         :param data: DataFrame to filter.
         :param column: Column name to filter by.
         :param categories: List of categories to include.
+        :param index: Optional row index of `data`; when it covers the column, the matching rows are
+                      looked up instead of scanned for.
         :return: Filtered DataFrame.
         """
         if column not in data.columns:
             raise ValueError(f"The DataFrame does not contain the column '{column}'.")
+        if index is not None and column in index.columns:
+            return index.filter(data, {column: categories})
 
         return data[data[column].isin(categories)]
 
+def _concat_chunks(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+    if len(chunks) == 1:
+        return chunks[0]
+    # Chunks parse their own categories, and concatenating different ones would fall back to object columns.
+    categorical = [col for col, dtype in chunks[0].dtypes.items() if isinstance(dtype, pd.CategoricalDtype)]
+    if categorical:
+        dtypes = {col: pd.CategoricalDtype(functools.reduce(pd.Index.union, [chunk[col].cat.categories
+                                                                              for chunk in chunks]))
+                  for col in categorical}
+        chunks = [chunk.astype(dtypes) for chunk in chunks]
+    return pd.concat(chunks)
+
+def _is_numeric(dtype: Any) -> bool:
+    try:
+        return pd.api.types.is_numeric_dtype(pd.api.types.pandas_dtype(dtype))
+    except TypeError:
+        return False
+
+class _ByteRangeReader(io.RawIOBase):
+    """
+    Raw reader exposing a binary file from its current position up to an end offset.
+    """
+    def __init__(self, f: io.BufferedIOBase, end: int):
+        self._file = f
+        self._end = end
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self._end - self._file.tell())
+        if size <= 0:
+            return 0
+        data = self._file.read(size)
+        buffer[:len(data)] = data
+        return len(data)
@@ -0,0 +1,66 @@
+import numpy as np
+from typing import Any
+
+def lttb(x: Any, y: Any, n_out: int) -> np.ndarray:
+    """
+    Select the points of a series that best preserve its shape (Largest-Triangle-Three-Buckets).
+
+    The first and last points are kept; the points in between are split into n_out - 2 buckets, and
+    from each bucket the point forming the largest triangle with the point kept from the previous
+    bucket and the average of the next bucket is kept.
+    :param x: Sorted x values (numbers or datetimes).
+    :param y: y values.
+    :param n_out: Number of points to keep.
+    :return: Sorted positions of the kept points.
+    """
+    x, y = _as_float(x), np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n <= 2:
+        return np.arange(n)
+    if n_out < 3:
+        raise ValueError("n_out must be at least 3.")
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_stop = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x, next_y = x[stop:next_stop].mean(), y[stop:next_stop].mean()
+        # Twice the triangle areas; the factor does not change which point is largest.
+        areas = np.abs((x[previous] - next_x) * (y[start:stop] - y[previous])
+                       - (x[previous] - x[start:stop]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        kept[bucket + 1] = previous
+    return kept
+
+def min_max(x: Any, y: Any, n_out: int) -> np.ndarray:
+    """
+    Keep the lowest and highest point of each of n_out // 2 equal-count buckets (min-max decimation),
+    so that spikes survive downsampling.
+    :param x: Sorted x values (numbers or datetimes); only their count is used.
+    :param y: y values.
+    :param n_out: Maximum number of points to keep.
+    :return: Sorted positions of the kept points.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 2:
+        raise ValueError("n_out must be at least 2.")
+
+    n_buckets = n_out // 2
+    buckets = np.arange(n) * n_buckets // n
+    # Sort by bucket, then by value: each bucket's minimum and maximum end up at its two ends.
+    order = np.lexsort((y, buckets))
+    starts = np.searchsorted(buckets, np.arange(n_buckets))
+    ends = np.append(starts[1:], n) - 1
+    return np.unique(np.concatenate([order[starts], order[ends]]))
+
+def _as_float(values: Any) -> np.ndarray:
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64) or np.issubdtype(values.dtype, np.timedelta64):
+        return values.astype(np.int64).astype(float)
+    return values.astype(float)
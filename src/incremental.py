@@ -0,0 +1,177 @@
+import csv
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional, Tuple
+from src.analyzer import StreamingAnalyzer
+from src.data_loader import DataLoader
+
+class IncrementalState:
+    VERSION = 1
+    DIGEST_BYTES = 4096
+
+    def __init__(self, source_path: str, analyzer: StreamingAnalyzer, offset: int = 0,
+                 head_digest: Optional[str] = None, tail_digest: Optional[str] = None, unterminated: bool = False):
+        """
+        Initialize persisted aggregates of an append-only CSV file.
+
+        The state remembers the byte offset up to which the file was consumed, together with digests of
+        the first and last bytes before that offset. As long as the file only grows, a refresh reads
+        just the appended lines; if the consumed part changed, the state is rebuilt from scratch.
+        :param source_path: Path to the CSV file.
+        :param analyzer: Aggregates (per-key count, sum, sum of squares and median sketches) of the consumed rows.
+        :param offset: Byte offset of the first line not consumed yet (0 for a new state).
+        :param head_digest: Digest of the first bytes of the file when the state was saved.
+        :param tail_digest: Digest of the last bytes before the offset when the state was saved.
+        :param unterminated: The last consumed line had no newline yet, so appended bytes must start a new line.
+        """
+        self.source_path = source_path
+        self.analyzer = analyzer
+        self.offset = offset
+        self.head_digest = head_digest
+        self.tail_digest = tail_digest
+        self.unterminated = unterminated
+        # Bytes after the offset left for a later update, as of the last update.
+        self.pending_bytes = 0
+
+    @classmethod
+    def load(cls, state_path: str) -> "IncrementalState":
+        """
+        Load a state saved with save.
+        :param state_path: Path to the state file.
+        :return: IncrementalState.
+        """
+        with open(state_path) as f:
+            state = json.load(f)
+        if state.get('version') != cls.VERSION:
+            raise ValueError(f"Unsupported incremental state version in '{state_path}'.")
+        return cls(state['source_path'], StreamingAnalyzer.from_dict(state['analyzer']), state['offset'],
+                   state['head_digest'], state['tail_digest'], state.get('unterminated', False))
+
+    def save(self, state_path: str) -> None:
+        """
+        Save the state atomically as JSON.
+        :param state_path: Path to the state file.
+        """
+        state: Dict[str, Any] = {
+            'version': self.VERSION,
+            'source_path': self.source_path,
+            'offset': self.offset,
+            'head_digest': self.head_digest,
+            'tail_digest': self.tail_digest,
+            'unterminated': self.unterminated,
+            'analyzer': self.analyzer.to_dict(),
+        }
+        temp_path = f"{state_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(temp_path, state_path)
+
+    def is_prefix_of(self, source_path: str) -> bool:
+        """
+        Check that the consumed part of the file is unchanged, i.e. that the file was only appended to.
+        :param source_path: Path to the CSV file.
+        :return: True if the state can be updated from the file's new tail.
+        """
+        if self.offset == 0:
+            return True
+        size = os.path.getsize(source_path)
+        if size < self.offset:
+            return False
+        if self.unterminated and size > self.offset:
+            # The consumed last line was complete only if what follows it starts a new line.
+            with open(source_path, 'rb') as f:
+                f.seek(self.offset)
+                if f.read(1) not in (b'\n', b'\r'):
+                    return False
+        return _digests(source_path, self.offset) == (self.head_digest, self.tail_digest)
+
+    def update(self, loader: DataLoader, chunksize: int = 1_000_000) -> int:
+        """
+        Fold the lines appended since the last update into the aggregates.
+        A trailing line without a newline may still be being written: it is consumed if it already has every
+        field of the header (should the line then grow, is_prefix_of fails and the state is rebuilt), and
+        otherwise left for the next update and counted in pending_bytes.
+        :param loader: DataLoader used to read, validate and clean the new rows.
+        :param chunksize: Maximum number of rows read at a time.
+        :return: Number of bytes consumed.
+        """
+        start = self.offset or _header_end(self.source_path)
+        end = _last_line_end(self.source_path)
+        size = os.path.getsize(self.source_path)
+        unterminated = start > 0 and size > max(end, start) and _is_complete_row(self.source_path, max(end, start))
+        if unterminated:
+            end = size
+        if end > start:
+            self.analyzer.consume(loader.load_clean_chunks(self.source_path, chunksize, byte_range=(start, end)))
+            self.unterminated = unterminated
+        self.offset = max(end, start)
+        self.pending_bytes = size - self.offset
+        self.head_digest, self.tail_digest = _digests(self.source_path, self.offset)
+        return max(end - start, 0)
+
+def update_incremental(state_path: str, source_path: str, loader: DataLoader, chunksize: int = 1_000_000,
+                       **analyzer_kwargs: Any) -> IncrementalState:
+    """
+    Load the state of a CSV file, fold in the rows appended since the last run and save it back.
+    A missing state, a state for another file or analyzer configuration, or a rewritten file
+    starts over from the beginning of the file.
+    :param state_path: Path to the state file.
+    :param source_path: Path to the CSV file.
+    :param loader: DataLoader used to read, validate and clean the rows.
+    :param chunksize: Maximum number of rows read at a time.
+    :param analyzer_kwargs: Arguments of StreamingAnalyzer.
+    :return: Updated IncrementalState.
+    """
+    fresh = StreamingAnalyzer(**analyzer_kwargs)
+    state = None
+    if os.path.exists(state_path):
+        state = IncrementalState.load(state_path)
+        configuration = (fresh.category_column, fresh.value_column, fresh.customer_column, fresh.sketch_k)
+        stored = (state.analyzer.category_column, state.analyzer.value_column, state.analyzer.customer_column,
+                  state.analyzer.sketch_k)
+        if (os.path.abspath(state.source_path) != os.path.abspath(source_path) or stored != configuration
+                or not state.is_prefix_of(source_path)):
+            state = None
+        else:
+            state.analyzer.profiler = fresh.profiler
+    if state is None:
+        state = IncrementalState(source_path, fresh)
+
+    state.update(loader, chunksize)
+    state.save(state_path)
+    return state
+
+def _header_end(path: str) -> int:
+    with open(path, 'rb') as f:
+        header = f.readline()
+    return len(header) if header.endswith(b'\n') else 0
+
+def _last_line_end(path: str, block_size: int = 1 << 16) -> int:
+    with open(path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        while position > 0:
+            size = min(block_size, position)
+            position -= size
+            f.seek(position)
+            newline = f.read(size).rfind(b'\n')
+            if newline >= 0:
+                return position + newline + 1
+    return 0
+
+def _is_complete_row(path: str, line_start: int) -> bool:
+    with open(path, 'rb') as f:
+        header = f.readline()
+        f.seek(line_start)
+        line = f.read()
+    header_fields, line_fields = (next(csv.reader([text.decode('utf-8', errors='replace').strip('\r\n')]), [])
+                                  for text in (header, line))
+    return len(line_fields) == len(header_fields)
+
+def _digests(path: str, offset: int) -> Tuple[str, str]:
+    size = IncrementalState.DIGEST_BYTES
+    with open(path, 'rb') as f:
+        head = f.read(min(size, offset))
+        f.seek(max(offset - size, 0))
+        tail = f.read(min(size, offset))
+    return hashlib.sha256(head).hexdigest(), hashlib.sha256(tail).hexdigest()
@@ -0,0 +1,236 @@
+import os
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+# Row selections are positional: a slice when the selected rows are contiguous, a sorted array otherwise.
+RowSelection = Union[slice, np.ndarray]
+
+class ColumnIndex:
+    def __init__(self, keys: np.ndarray, offsets: np.ndarray, order: Optional[np.ndarray] = None):
+        """
+        Initialize a sorted-key index of one column, stored like a CSR matrix.
+
+        `keys` holds the distinct values in ascending order. The rows holding keys[i] are
+        order[offsets[i]:offsets[i + 1]], so a set of keys, or a range of keys such as dates, resolves
+        to slices of `order` instead of a scan over every row. When the column is already sorted,
+        `order` is None and every lookup of a key range is a contiguous range of rows.
+        :param keys: Distinct non-missing values, sorted.
+        :param offsets: Start of each key's rows in `order`, followed by the end of the last key's rows.
+        :param order: Row positions sorted by key (rows with missing values excluded), or None if the
+                      column is sorted and has no missing values.
+        """
+        self.keys = keys
+        self.offsets = offsets
+        self.order = order
+
+    @classmethod
+    def build(cls, values: pd.Series) -> "ColumnIndex":
+        """
+        Index the values of a column.
+        :param values: Column to index.
+        :return: ColumnIndex.
+        """
+        codes, uniques = pd.factorize(values, sort=True)
+        # Missing values get code -1; counting them first puts their rows ahead of every key.
+        counts = np.bincount(codes + 1, minlength=len(uniques) + 1)
+        offsets = np.cumsum(counts)
+        position_dtype = np.int32 if len(codes) < 2 ** 31 else np.int64
+        if counts[0] == 0 and bool(np.all(codes[1:] >= codes[:-1])):
+            order = None
+        else:
+            order = np.argsort(codes, kind='stable').astype(position_dtype)
+        keys = np.asarray(uniques)
+        if keys.dtype == object:
+            # Fixed-width strings save without pickling; lookups convert their keys the same way.
+            keys = keys.astype(str)
+        return cls(keys, offsets.astype(np.int64), order)
+
+    def lookup(self, keys: Iterable[Any]) -> RowSelection:
+        """
+        Find the rows holding any of the given keys.
+        :param keys: Keys to look up; keys absent from the column are ignored.
+        :return: Row positions in ascending order.
+        """
+        keys = pd.Index([str(key) for key in keys] if self.keys.dtype.kind == 'U' else list(keys)).unique()
+        positions = pd.Index(self.keys).get_indexer(keys)
+        positions = np.sort(positions[positions >= 0])
+        if len(positions) == 0:
+            return np.empty(0, dtype=np.int64)
+        if len(positions) == positions[-1] - positions[0] + 1:
+            return self._rows(positions[0], positions[-1] + 1)
+        rows = np.concatenate([self._positions(self._rows(i, i + 1)) for i in positions])
+        return np.sort(rows)
+
+    def range(self, start: Any = None, end: Any = None) -> RowSelection:
+        """
+        Find the rows whose key lies between two bounds, found by binary search over the sorted keys.
+        :param start: Inclusive lower bound, or None for no lower bound.
+        :param end: Inclusive upper bound, or None for no upper bound.
+        :return: Row positions in ascending order.
+        """
+        first, last = 0, len(self.keys)
+        if start is not None:
+            first = int(np.searchsorted(self.keys, np.asarray(start, dtype=self.keys.dtype), side='left'))
+        if end is not None:
+            last = int(np.searchsorted(self.keys, np.asarray(end, dtype=self.keys.dtype), side='right'))
+        return self._rows(first, max(first, last))
+
+    def to_arrays(self, prefix: str) -> Dict[str, np.ndarray]:
+        """
+        Export the index as named arrays.
+        :param prefix: Prefix of the array names.
+        :return: Dictionary of arrays.
+        """
+        arrays = {f"{prefix}keys": self.keys, f"{prefix}offsets": self.offsets}
+        if self.order is not None:
+            arrays[f"{prefix}order"] = self.order
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays: Any, prefix: str) -> "ColumnIndex":
+        """
+        Rebuild an index exported with to_arrays.
+        :param arrays: Mapping of array names to arrays, e.g. an opened .npz file.
+        :param prefix: Prefix of the array names.
+        :return: ColumnIndex.
+        """
+        order = arrays[f"{prefix}order"] if f"{prefix}order" in arrays else None
+        return cls(arrays[f"{prefix}keys"], arrays[f"{prefix}offsets"], order)
+
+    def _rows(self, first: int, last: int) -> RowSelection:
+        start, stop = int(self.offsets[first]), int(self.offsets[last])
+        if self.order is None:
+            return slice(start, stop)
+        return np.sort(self.order[start:stop])
+
+    @staticmethod
+    def _positions(rows: RowSelection) -> np.ndarray:
+        if isinstance(rows, slice):
+            return np.arange(rows.start, rows.stop)
+        return rows
+
+class DatasetIndex:
+    def __init__(self, n_rows: int, columns: Optional[Dict[str, ColumnIndex]] = None):
+        """
+        Initialize a set of column indexes over one DataFrame.
+
+        The indexes are built once per dataset (see `DataLoader.load_index`, which stores them next to
+        the columnar cache) and turn category, customer and date filters into row selections that are
+        intersected and taken from the DataFrame, instead of comparing every row on every filter.
+        :param n_rows: Number of rows of the indexed DataFrame.
+        :param columns: Mapping of column names to their ColumnIndex.
+        """
+        self.n_rows = n_rows
+        self.columns = columns or {}
+
+    @classmethod
+    def build(cls, data: pd.DataFrame, columns: List[str]) -> "DatasetIndex":
+        """
+        Index columns of a DataFrame.
+        :param data: DataFrame to index.
+        :param columns: Columns to index.
+        :return: DatasetIndex.
+        """
+        missing_columns = [col for col in columns if col not in data.columns]
+        if missing_columns:
+            raise ValueError(f"Columns {missing_columns} not found in the DataFrame.")
+        return cls(len(data), {column: ColumnIndex.build(data[column]) for column in columns})
+
+    def extend(self, data: pd.DataFrame, columns: List[str]) -> List[str]:
+        """
+        Index additional columns of the indexed DataFrame.
+        :param data: The DataFrame this index was built from.
+        :param columns: Columns that must be indexed.
+        :return: Columns that were not indexed yet.
+        """
+        self._check(data)
+        added = [column for column in columns if column not in self.columns]
+        self.columns.update(DatasetIndex.build(data, added).columns)
+        return added
+
+    def rows(self, filters: Optional[Dict[str, Iterable[Any]]] = None, date_column: str = 'date',
+             start_date: Optional[str] = None, end_date: Optional[str] = None) -> RowSelection:
+        """
+        Resolve filters to the rows matching all of them.
+        :param filters: Mapping of indexed columns to the values to keep.
+        :param date_column: Indexed column the date range applies to.
+        :param start_date: Optional start date (inclusive).
+        :param end_date: Optional end date (inclusive).
+        :return: Row positions in ascending order.
+        """
+        selections = []
+        for column, values in (filters or {}).items():
+            selections.append(self._column(column).lookup(values))
+        if start_date is not None or end_date is not None:
+            selections.append(self._column(date_column).range(
+                pd.to_datetime(start_date) if start_date is not None else None,
+                pd.to_datetime(end_date) if end_date is not None else None))
+
+        rows: RowSelection = slice(0, self.n_rows)
+        for selection in selections:
+            rows = _intersect(rows, selection)
+        return rows
+
+    def filter(self, data: pd.DataFrame, filters: Optional[Dict[str, Iterable[Any]]] = None,
+               date_column: str = 'date', start_date: Optional[str] = None,
+               end_date: Optional[str] = None) -> pd.DataFrame:
+        """
+        Filter the indexed DataFrame.
+        :param data: The DataFrame this index was built from.
+        :param filters: Mapping of indexed columns to the values to keep.
+        :param date_column: Indexed column the date range applies to.
+        :param start_date: Optional start date (inclusive).
+        :param end_date: Optional end date (inclusive).
+        :return: Filtered DataFrame, in the original row order.
+        """
+        self._check(data)
+        return data.iloc[self.rows(filters, date_column, start_date, end_date)]
+
+    def save(self, path: str) -> None:
+        """
+        Save the index atomically as an uncompressed .npz file.
+        :param path: Destination path.
+        """
+        arrays = {'n_rows': np.asarray(self.n_rows), 'columns': np.asarray(list(self.columns), dtype=str)}
+        for i, index in enumerate(self.columns.values()):
+            arrays.update(index.to_arrays(f"{i}."))
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    @classmethod
+    def load(cls, path: str) -> "DatasetIndex":
+        """
+        Load an index saved with save.
+        :param path: Path of the .npz file.
+        :return: DatasetIndex.
+        """
+        with np.load(path, allow_pickle=False) as arrays:
+            columns = {str(column): ColumnIndex.from_arrays(arrays, f"{i}.")
+                       for i, column in enumerate(arrays['columns'])}
+            return cls(int(arrays['n_rows']), columns)
+
+    def _column(self, column: str) -> ColumnIndex:
+        if column not in self.columns:
+            raise ValueError(f"Column '{column}' is not indexed.")
+        return self.columns[column]
+
+    def _check(self, data: pd.DataFrame) -> None:
+        if len(data) != self.n_rows:
+            raise ValueError(f"The index covers {self.n_rows} rows but the DataFrame has {len(data)}.")
+
+def _intersect(left: RowSelection, right: RowSelection) -> RowSelection:
+    if isinstance(left, slice) and isinstance(right, slice):
+        start = max(left.start, right.start)
+        return slice(start, max(start, min(left.stop, right.stop)))
+    if isinstance(left, slice):
+        left, right = right, left
+    if isinstance(right, slice):
+        return left[(left >= right.start) & (left < right.stop)]
+    return np.intersect1d(left, right, assume_unique=True)
@@ -0,0 +1,96 @@
+import copy
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Type, Union
+from src.analyzer import ApproximateAnalyzer, StreamingAnalyzer
+from src.data_loader import DataLoader
+from src.validation import ValidationReport
+
+def resolve_input_paths(path: str) -> List[str]:
+    """
+    Expand an input argument into the CSV files it designates.
+    :param path: Path to a CSV file, a directory of CSV files, or a glob pattern.
+    :return: Sorted list of file paths.
+    """
+    if os.path.isdir(path):
+        paths = glob.glob(os.path.join(path, "*.csv"))
+    elif any(char in path for char in "*?["):
+        paths = glob.glob(path)
+    else:
+        return [path]
+    if not paths:
+        raise ValueError(f"No CSV files found for '{path}'.")
+    return sorted(paths)
+
+def analyze_partition(loader: DataLoader, path: str, chunksize: Optional[int] = None,
+                      start_date: Optional[str] = None, end_date: Optional[str] = None,
+                      filters: Optional[Dict[str, List[Any]]] = None,
+                      analyzer_class: Type[Union[StreamingAnalyzer, ApproximateAnalyzer]] = StreamingAnalyzer,
+                      **analyzer_kwargs: Any) -> Union[StreamingAnalyzer, ApproximateAnalyzer]:
+    """
+    Load one partition and fold it into partial aggregates.
+    :param loader: DataLoader used to read, validate and clean the file.
+    :param path: Path to the CSV file.
+    :param chunksize: Stream the file in chunks of this many rows; None loads it at once (through the loader's cache).
+    :param start_date: Optional start date (inclusive) of the rows to aggregate.
+    :param end_date: Optional end date (inclusive) of the rows to aggregate.
+    :param filters: Optional mapping of columns to the values of the rows to aggregate.
+    :param analyzer_class: StreamingAnalyzer, or ApproximateAnalyzer for sketches only.
+    :param analyzer_kwargs: Arguments of the analyzer class.
+    :return: Analyzer holding the partition's aggregates.
+    """
+    analyzer = analyzer_class(**analyzer_kwargs)
+    if chunksize:
+        chunks = loader.load_clean_chunks(path, chunksize, start_date=start_date, end_date=end_date, filters=filters)
+    else:
+        chunks = [loader.load_clean(path, start_date=start_date, end_date=end_date, filters=filters)]
+    return analyzer.consume(chunks)
+
+def analyze_partitions(paths: List[str], loader: DataLoader, workers: Optional[int] = None,
+                       chunksize: Optional[int] = None, start_date: Optional[str] = None,
+                       end_date: Optional[str] = None, filters: Optional[Dict[str, List[Any]]] = None,
+                       analyzer_class: Type[Union[StreamingAnalyzer, ApproximateAnalyzer]] = StreamingAnalyzer,
+                       **analyzer_kwargs: Any) -> Union[StreamingAnalyzer, ApproximateAnalyzer]:
+    """
+    Pre-aggregate several partitions in a process pool and merge their partial aggregates.
+    Sums and counts add up, standard deviations combine through the parallel variance update and
+    median sketches merge, so top-N and summary results are computed over all partitions at once.
+    :param paths: Paths to the CSV files.
+    :param loader: DataLoader used to read, validate and clean each file.
+    :param workers: Number of worker processes (default: number of CPUs); 1 runs in this process.
+    :param chunksize: Stream each file in chunks of this many rows; None loads each file at once.
+    :param start_date: Optional start date (inclusive) of the rows to aggregate.
+    :param end_date: Optional end date (inclusive) of the rows to aggregate.
+    :param filters: Optional mapping of columns to the values of the rows to aggregate.
+    :param analyzer_class: StreamingAnalyzer, or ApproximateAnalyzer for sketches only.
+    :param analyzer_kwargs: Arguments of the analyzer class.
+    :return: Analyzer holding the merged aggregates.
+    """
+    if workers is not None and workers < 1:
+        raise ValueError("workers must be a positive integer.")
+
+    merged = analyzer_class(**analyzer_kwargs)
+    if workers == 1 or len(paths) == 1:
+        for path in paths:
+            merged.merge(analyze_partition(loader, path, chunksize, start_date, end_date, filters,
+                                           analyzer_class, **analyzer_kwargs))
+        return merged
+
+    # Profilers stay in this process: their records would not come back from the workers.
+    worker_kwargs = {key: value for key, value in analyzer_kwargs.items() if key != "profiler"}
+    worker_loader = copy.copy(loader)
+    worker_loader.profiler = None
+    worker_loader.report = ValidationReport()
+    with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(paths))) as pool:
+        futures = [pool.submit(_analyze_partition_in_worker, worker_loader, path, chunksize, start_date, end_date,
+                               filters, analyzer_class, **worker_kwargs) for path in paths]
+        for future in futures:
+            analyzer, report = future.result()
+            merged.merge(analyzer)
+            loader.report.merge(report)
+    return merged
+
+def _analyze_partition_in_worker(loader: DataLoader, *args: Any, **kwargs: Any):
+    # The loader is a copy in the worker, so its validation counts are sent back with the aggregates.
+    return analyze_partition(loader, *args, **kwargs), loader.report
@@ -0,0 +1,229 @@
+import functools
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+@dataclass
+class StageRecord:
+    """
+    Measurements of one profiled stage.
+    :param stage: Stage name, e.g. 'loader.load_csv'.
+    :param wall_seconds: Elapsed wall-clock time.
+    :param cpu_seconds: CPU time used by the process.
+    :param peak_rss_bytes: Peak resident set size of the process at the end of the stage, if available.
+    :param rss_growth_bytes: Growth of the peak resident set size during the stage, if available.
+    :param traced_peak_bytes: Peak Python allocations during the stage above its starting level, if traced.
+    :param traced_delta_bytes: Python allocations still held at the end of the stage, if traced.
+    :param rows_in: Number of input rows, if known.
+    :param rows_out: Number of output rows, if known.
+    """
+    stage: str
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    peak_rss_bytes: Optional[int] = None
+    rss_growth_bytes: Optional[int] = None
+    traced_peak_bytes: Optional[int] = None
+    traced_delta_bytes: Optional[int] = None
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+
+def peak_rss_bytes() -> Optional[int]:
+    """
+    Peak resident set size of the current process.
+    :return: Size in bytes, or None where the resource module is unavailable.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+class Profiler:
+    def __init__(self, trace_memory: bool = True, callback: Optional[Callable[[StageRecord], None]] = None):
+        """
+        Initialize a profiler that records wall time, CPU time, memory and row counts per stage.
+        Pass it to DataLoader, DataAnalyzer or DataVisualizer to profile their methods, or use
+        `stage` directly around any block of code.
+        :param trace_memory: Track Python allocations with tracemalloc (slows down the profiled code).
+        :param callback: Optional function called with each StageRecord when its stage ends.
+        """
+        self.trace_memory = trace_memory
+        self.callback = callback
+        self.records: List[StageRecord] = []
+        self._child_peaks: List[int] = []
+        self._started_tracing = False
+
+    @contextmanager
+    def stage(self, name: str, rows_in: Optional[int] = None) -> Iterator[StageRecord]:
+        """
+        Profile a block of code. Stages can be nested.
+        :param name: Stage name.
+        :param rows_in: Number of input rows, if known.
+        :return: Context manager yielding the StageRecord, whose rows_out can be set inside the block.
+        """
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+
+        record = StageRecord(stage=name, rows_in=rows_in)
+        rss_before = peak_rss_bytes()
+        traced_before = 0
+        if tracing:
+            traced_before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            self._child_peaks.append(traced_before)
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record.wall_seconds = time.perf_counter() - wall_start
+            record.cpu_seconds = time.process_time() - cpu_start
+            record.peak_rss_bytes = peak_rss_bytes()
+            if rss_before is not None and record.peak_rss_bytes is not None:
+                record.rss_growth_bytes = record.peak_rss_bytes - rss_before
+            if tracing and tracemalloc.is_tracing():
+                current, peak = tracemalloc.get_traced_memory()
+                # Nested stages reset the tracemalloc peak, so fold their peaks back in.
+                peak = max(peak, self._child_peaks.pop())
+                record.traced_peak_bytes = peak - traced_before
+                record.traced_delta_bytes = current - traced_before
+                if self._child_peaks:
+                    self._child_peaks[-1] = max(self._child_peaks[-1], peak)
+            self.records.append(record)
+            if self.callback is not None:
+                self.callback(record)
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Aggregate the records by stage, in order of first appearance.
+        :return: DataFrame with one row per stage: call count, total times, maximum memory figures and total rows.
+        """
+        columns = ['stage', 'calls', 'wall_seconds', 'cpu_seconds', 'peak_rss_bytes', 'traced_peak_bytes',
+                   'rows_in', 'rows_out']
+        if not self.records:
+            return pd.DataFrame(columns=columns)
+        frame = pd.DataFrame([asdict(record) for record in self.records])
+        summary = frame.groupby('stage', sort=False).agg(
+            calls=('stage', 'size'),
+            wall_seconds=('wall_seconds', 'sum'),
+            cpu_seconds=('cpu_seconds', 'sum'),
+            peak_rss_bytes=('peak_rss_bytes', 'max'),
+            traced_peak_bytes=('traced_peak_bytes', 'max'),
+            rows_in=('rows_in', lambda rows: rows.sum(min_count=1)),
+            rows_out=('rows_out', lambda rows: rows.sum(min_count=1)),
+        )
+        return summary.reset_index()[columns]
+
+    def report(self) -> str:
+        """
+        Format the per-stage summary as a text table.
+        :return: Table with times in seconds and memory in MiB.
+        """
+        summary = self.summary()
+        lines = [f"{'stage':<36} {'calls':>5} {'wall s':>9} {'cpu s':>9} {'peak RSS MiB':>13} "
+                 f"{'traced MiB':>11} {'rows in':>11} {'rows out':>11}"]
+        for row in summary.itertuples(index=False):
+            lines.append(f"{row.stage:<36} {row.calls:>5} {row.wall_seconds:>9.4f} {row.cpu_seconds:>9.4f} "
+                         f"{_mebibytes(row.peak_rss_bytes):>13} {_mebibytes(row.traced_peak_bytes):>11} "
+                         f"{_count(row.rows_in):>11} {_count(row.rows_out):>11}")
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Export the raw records and the per-stage summary.
+        :return: JSON-serializable dictionary.
+        """
+        summary = self.summary()
+        summary = summary.astype(object).where(summary.notna(), None)
+        return {
+            'records': [asdict(record) for record in self.records],
+            'summary': summary.to_dict(orient='records'),
+        }
+
+    def to_json(self, path: str) -> None:
+        """
+        Write the records and per-stage summary to a JSON file.
+        :param path: Destination path.
+        """
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2, default=_json_default)
+
+    def close(self) -> None:
+        """
+        Stop memory tracing if this profiler started it.
+        """
+        if self._started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started_tracing = False
+
+def profiled(stage: str) -> Callable:
+    """
+    Decorate a method of a class with a `profiler` attribute so that each call is recorded as a stage.
+    Calls are not wrapped when the attribute is None. Input rows are counted from the first DataFrame
+    argument (or `self.data`), output rows from a DataFrame result.
+    :param stage: Stage name.
+    :return: Method decorator.
+    """
+    def decorator(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            profiler = getattr(self, 'profiler', None)
+            if profiler is None:
+                return method(self, *args, **kwargs)
+            inputs = [value for value in (*args, *kwargs.values()) if isinstance(value, pd.DataFrame)]
+            if not inputs and isinstance(getattr(self, 'data', None), pd.DataFrame):
+                inputs = [self.data]
+            with profiler.stage(stage, rows_in=len(inputs[0]) if inputs else None) as record:
+                result = method(self, *args, **kwargs)
+                if isinstance(result, (pd.DataFrame, pd.Series)):
+                    record.rows_out = len(result)
+            return result
+        return wrapper
+    return decorator
+
+def profiled_iteration(profiler: Optional[Profiler], stage: str, items: Iterable[Any]) -> Iterator[Any]:
+    """
+    Record the production of each item of an iterable as a stage, e.g. the parsing of each chunk
+    of a streamed file; the work done by the consumer between items is not included.
+    The call that finds the iterable exhausted is recorded too, as it may still read the end of a file.
+    :param profiler: Profiler, or None to iterate without recording.
+    :param stage: Stage name.
+    :param items: Iterable to profile.
+    :return: Iterator over the same items.
+    """
+    if profiler is None:
+        yield from items
+        return
+    iterator = iter(items)
+    while True:
+        with profiler.stage(stage) as record:
+            try:
+                item = next(iterator)
+            except StopIteration:
+                record.rows_out = 0
+                return
+            if isinstance(item, (pd.DataFrame, pd.Series)):
+                record.rows_out = len(item)
+        yield item
+
+def _mebibytes(value: Optional[float]) -> str:
+    return "-" if value is None or pd.isna(value) else f"{value / 2 ** 20:.1f}"
+
+def _count(value: Optional[float]) -> str:
+    return "-" if value is None or pd.isna(value) else str(int(value))
+
+def _json_default(value: Any) -> Any:
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,88 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+import pandas as pd
+from src.profiling import Profiler
+
+CHART_KINDS = ("bar", "line", "pie", "heatmap")
+
+@dataclass
+class ChartSpec:
+    """
+    Description of one chart to render with render_charts.
+    :param kind: Chart type: 'bar', 'line', 'pie' or 'heatmap'.
+    :param data: DataFrame to plot.
+    :param save_path: Output path; its extension selects the format, e.g. '.png', '.jpg', or '.rgba'
+                      for raw pixels without any encoding (the fastest raster output).
+    :param options: Keyword arguments of the DataVisualizer method (e.g., column names and title).
+    :param dpi: Resolution of raster outputs; None uses matplotlib's default.
+    :param fast: Favor speed over file size: PNGs are written with the lowest zlib compression.
+    """
+    kind: str
+    data: pd.DataFrame
+    save_path: str
+    options: Dict[str, Any] = field(default_factory=dict)
+    dpi: Optional[float] = None
+    fast: bool = False
+
+def render_charts(specs: List[ChartSpec], workers: Optional[int] = None,
+                  profiler: Optional[Profiler] = None) -> List[str]:
+    """
+    Render many charts headlessly, reusing one figure per process and releasing it at the end, so
+    memory stays flat however many charts are drawn.
+    With several workers, the specs are split into contiguous batches rendered in a process pool;
+    each batch is pickled once, so specs sharing a DataFrame send it once per batch.
+    :param specs: Charts to render.
+    :param workers: Number of worker processes; None or 1 renders in this process.
+    :param profiler: Optional profiler recording each chart rendered in this process.
+    :return: Output paths, in the order of the specs.
+    """
+    for spec in specs:
+        if spec.kind not in CHART_KINDS:
+            raise ValueError(f"Unknown chart kind '{spec.kind}'; expected one of {list(CHART_KINDS)}.")
+    if workers is not None and workers < 1:
+        raise ValueError("workers must be a positive integer.")
+    if not workers or workers == 1 or len(specs) <= 1:
+        return _render_batch(specs, profiler)
+
+    workers = min(workers, len(specs))
+    bounds = [len(specs) * i // workers for i in range(workers + 1)]
+    batches = [specs[start:stop] for start, stop in zip(bounds, bounds[1:])]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_use_agg) as pool:
+        futures = [pool.submit(_render_batch, batch) for batch in batches]
+        return [path for future in futures for path in future.result()]
+
+def savefig_kwargs(spec: ChartSpec) -> Dict[str, Any]:
+    """
+    Keyword arguments of Figure.savefig for a spec.
+    :param spec: Chart specification.
+    :return: Dictionary of savefig arguments.
+    """
+    kwargs: Dict[str, Any] = {}
+    if spec.dpi is not None:
+        kwargs['dpi'] = spec.dpi
+    extension = os.path.splitext(spec.save_path)[1].lstrip('.').lower()
+    if spec.fast and extension == 'png':
+        kwargs['pil_kwargs'] = {'compress_level': 1}
+    return kwargs
+
+def _render_batch(specs: List[ChartSpec], profiler: Optional[Profiler] = None) -> List[str]:
+    from src.visualizer import DataVisualizer
+
+    visualizer = DataVisualizer(profiler=profiler, reuse_figure=True)
+    methods = {"bar": visualizer.bar_chart, "line": visualizer.line_chart, "pie": visualizer.pie_chart,
+               "heatmap": visualizer.heatmap}
+    paths = []
+    try:
+        for spec in specs:
+            fig = methods[spec.kind](spec.data, **spec.options)
+            fig.savefig(spec.save_path, **savefig_kwargs(spec))
+            paths.append(spec.save_path)
+    finally:
+        visualizer.close()
+    return paths
+
+def _use_agg() -> None:
+    import matplotlib
+    matplotlib.use("Agg", force=True)
@@ -0,0 +1,330 @@
+import asyncio
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import pandas as pd
+from src.analyzer import DataAnalyzer
+from src.cache import ResultCache
+from src.data_loader import DataLoader
+from src.indexing import DatasetIndex
+
+# (status, content type, body) of an HTTP response.
+Response = Tuple[int, str, bytes]
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+class DatasetCache:
+    # Columns indexed when a dataset is loaded, if present; other filter columns are indexed on first use.
+    INDEX_COLUMNS = ('date', 'category', 'customer_id')
+
+    def __init__(self, loader: DataLoader, max_datasets: int = 8, result_cache: Optional[ResultCache] = None):
+        """
+        Initialize an in-memory LRU of loaded, cleaned datasets keyed by file fingerprint.
+        Each entry is a DataAnalyzer, so memoized aggregates are shared by every request on the dataset,
+        and the row index of the dataset (see DataLoader.load_index), so filters look rows up instead of
+        scanning the frame.
+        A changed file gets a new fingerprint and is loaded again; its stale entry ages out.
+        :param loader: DataLoader used to load, validate and clean files.
+        :param max_datasets: Maximum number of datasets kept in memory.
+        :param result_cache: Optional cache of analysis results shared by every dataset.
+        """
+        if max_datasets < 1:
+            raise ValueError("max_datasets must be a positive integer.")
+        self.loader = loader
+        self.max_datasets = max_datasets
+        self.result_cache = result_cache
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[DataAnalyzer, DatasetIndex]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, file_path: str) -> DataAnalyzer:
+        """
+        Get the analyzer of a file, loading the file on a miss.
+        :param file_path: Path to the CSV file.
+        :return: DataAnalyzer over the whole cleaned file.
+        """
+        return self._entry(file_path)[0]
+
+    def filter(self, file_path: str, filters: Optional[Dict[str, List[Any]]] = None,
+               start_date: Optional[str] = None,
+               end_date: Optional[str] = None) -> Tuple[DataAnalyzer, pd.DataFrame]:
+        """
+        Select rows of a file through its row index, loading the file on a miss.
+        :param file_path: Path to the CSV file.
+        :param filters: Optional mapping of columns to the values to keep.
+        :param start_date: Optional start date (inclusive) in 'YYYY-MM-DD' format.
+        :param end_date: Optional end date (inclusive) in 'YYYY-MM-DD' format.
+        :return: Tuple of the analyzer over the whole file and the matching rows, in file order.
+        """
+        analyzer, index = self._entry(file_path)
+        columns = list(filters or {})
+        if start_date is not None or end_date is not None:
+            columns.append('date')
+        if any(column not in index.columns for column in columns):
+            with self._lock:
+                index.extend(analyzer.data, columns)
+        return analyzer, index.filter(analyzer.data, filters, 'date', start_date, end_date)
+
+    def _entry(self, file_path: str) -> Tuple[DataAnalyzer, DatasetIndex]:
+        key = self.loader.fingerprint(file_path)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        data = self.loader.load_clean(file_path)
+        index = self.loader.load_index(file_path, data, [col for col in self.INDEX_COLUMNS if col in data.columns])
+        entry = (DataAnalyzer(data, result_cache=self.result_cache, fingerprint=key), index)
+        with self._lock:
+            self._entries[key] = entry
+            while len(self._entries) > self.max_datasets:
+                self._entries.popitem(last=False)
+        return entry
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report the cache contents and counters.
+        :return: Dictionary with the number of datasets, their total size and the hit and miss counts.
+        """
+        with self._lock:
+            entries = [analyzer for analyzer, _ in self._entries.values()]
+        return {
+            'datasets': len(entries),
+            'bytes': int(sum(entry.data.memory_usage(deep=False).sum() for entry in entries)),
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+class AnalysisServer:
+    def __init__(self, loader: DataLoader, max_datasets: int = 8, workers: Optional[int] = None,
+                 result_cache: Optional[ResultCache] = None):
+        """
+        Initialize a long-running HTTP server answering analyses and charts from warm datasets.
+
+        Endpoints (JSON request bodies):
+        - GET /health, GET /stats
+        - POST /analyze: {"path", "analyses", and optionally "category_column", "value_column",
+          "date_column", "customer_column", "top_n", "freq", "window", "by_category", "clusters",
+          "start_date", "end_date", "filters"}; returns {analysis: [records]}.
+        - POST /drill_down: {"path", and optionally "dimensions", "freq", "category_column", "customer_column",
+          "date_column", "value_column", "start_date", "end_date", "filters"}; returns {"drill-down": [records]}.
+          The aggregate cube it builds stays with the warm dataset, so later category and periodic
+          time-series analyses of it add up cells instead of regrouping rows.
+        - POST /chart: {"path", "kind" ('bar', 'line', 'pie' or 'heatmap'), "options", "format"};
+          returns the image.
+
+        Loading and computing run in a thread pool so the event loop keeps accepting connections,
+        and concurrent identical requests share one computation.
+        :param loader: DataLoader used to load, validate and clean files.
+        :param max_datasets: Maximum number of datasets kept in memory.
+        :param workers: Number of worker threads (default: ThreadPoolExecutor's default).
+        :param result_cache: Cache of analysis results (default: an in-memory ResultCache).
+        """
+        self.datasets = DatasetCache(loader, max_datasets, result_cache or ResultCache())
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.coalesced = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._routes: Dict[Tuple[str, str], Callable[[Dict[str, Any]], Response]] = {
+            ('GET', '/health'): lambda request: _json_response({'status': 'ok'}),
+            ('GET', '/stats'): self.stats,
+            ('POST', '/analyze'): self.analyze,
+            ('POST', '/drill_down'): self.drill_down,
+            ('POST', '/chart'): self.chart,
+        }
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> Response:
+        """
+        Answer one request, sharing the result of an identical request already in progress.
+        :param method: HTTP method.
+        :param path: Request path.
+        :param body: Request body (JSON object, or empty).
+        :return: Response tuple.
+        """
+        route = self._routes.get((method, path))
+        if route is None:
+            allowed = any(route_path == path for _, route_path in self._routes)
+            return _error_response(405 if allowed else 404, f"No route for {method} {path}.")
+        try:
+            request = json.loads(body) if body.strip() else {}
+        except json.JSONDecodeError as e:
+            return _error_response(400, f"Invalid JSON body: {e}")
+        if not isinstance(request, dict):
+            return _error_response(400, "The request body must be a JSON object.")
+        if method == 'GET':
+            return route(request)
+
+        key = json.dumps([method, path, request], sort_keys=True, default=str)
+        if key in self._inflight:
+            self.coalesced += 1
+            return await asyncio.shield(self._inflight[key])
+        future = asyncio.get_running_loop().run_in_executor(self.executor, _guarded, route, request)
+        self._inflight[key] = future
+        try:
+            return await future
+        finally:
+            del self._inflight[key]
+
+    def stats(self, request: Dict[str, Any]) -> Response:
+        """
+        Report dataset cache, result cache and coalescing counters.
+        """
+        return _json_response({**self.datasets.stats(), 'coalesced': self.coalesced,
+                               'results': self.datasets.result_cache.stats()})
+
+    def analyze(self, request: Dict[str, Any]) -> Response:
+        """
+        Run analyses on a dataset, optionally narrowed by a date range and filters.
+        """
+        analyzer = self._analyzer(request)
+        analyses = request.get('analyses', ['summary'])
+        if isinstance(analyses, str):
+            analyses = [analyses]
+        results = analyzer.run_analyses(analyses, request.get('category_column', 'category'),
+                                        request.get('value_column', 'amount'), request.get('date_column', 'date'),
+                                        request.get('customer_column', 'customer_id'), int(request.get('top_n', 5)),
+                                        request.get('freq'), request.get('window'),
+                                        bool(request.get('by_category', False)), request.get('clusters'))
+        return _json_response({name: json.loads(result.to_json(orient='records', date_format='iso'))
+                               for name, result in results.items()})
+
+    def drill_down(self, request: Dict[str, Any]) -> Response:
+        """
+        Aggregate a dataset over some of its category, customer and date columns, optionally narrowed
+        by a date range and filters.
+        """
+        dimensions = request.get('dimensions', [])
+        if isinstance(dimensions, str):
+            dimensions = [dimensions]
+        result = self._analyzer(request).drill_down(dimensions, request.get('freq'),
+                                                    request.get('category_column', 'category'),
+                                                    request.get('customer_column', 'customer_id'),
+                                                    request.get('date_column', 'date'),
+                                                    request.get('value_column', 'amount'))
+        return _json_response({'drill-down': json.loads(result.to_json(orient='records', date_format='iso'))})
+
+    def chart(self, request: Dict[str, Any]) -> Response:
+        """
+        Render a chart of a dataset, optionally narrowed by a date range and filters.
+        """
+        from src.rendering import CHART_KINDS
+        from src.visualizer import DataVisualizer
+
+        kind = request.get('kind')
+        if kind not in CHART_KINDS:
+            raise ValueError(f"Unknown chart kind '{kind}'; expected one of {list(CHART_KINDS)}.")
+        image_format = request.get('format', 'png')
+        data = self._analyzer(request).data
+        visualizer = DataVisualizer(reuse_figure=True)
+        try:
+            methods = {'bar': visualizer.bar_chart, 'line': visualizer.line_chart, 'pie': visualizer.pie_chart,
+                       'heatmap': visualizer.heatmap}
+            fig = methods[kind](data, **request.get('options', {}))
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format=image_format)
+        finally:
+            visualizer.close()
+        content_type = {'png': 'image/png', 'svg': 'image/svg+xml', 'pdf': 'application/pdf',
+                        'jpg': 'image/jpeg', 'jpeg': 'image/jpeg'}.get(image_format, 'application/octet-stream')
+        return 200, content_type, buffer.getvalue()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Serve one HTTP/1.1 connection (one request per connection).
+        :param reader: Connection reader.
+        :param writer: Connection writer.
+        """
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode('latin-1').strip()
+                if not line:
+                    break
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+            if len(request_line) < 2:
+                status, content_type, body = _error_response(400, "Malformed request line.")
+            else:
+                length = int(headers.get('content-length', 0))
+                payload = await reader.readexactly(length) if length else b''
+                status, content_type, body = await self.dispatch(request_line[0].upper(),
+                                                                 request_line[1].split('?')[0], payload)
+            writer.write(f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\nContent-Type: {content_type}\r\n"
+                         f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode('latin-1') + body)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765,
+                    unix_socket: Optional[str] = None) -> asyncio.AbstractServer:
+        """
+        Start listening on a TCP port or a Unix socket.
+        :param host: Interface to bind.
+        :param port: TCP port; 0 picks a free one.
+        :param unix_socket: Path of a Unix socket to listen on instead of TCP.
+        :return: Running asyncio server.
+        """
+        if unix_socket:
+            return await asyncio.start_unix_server(self.handle, path=unix_socket)
+        return await asyncio.start_server(self.handle, host, port)
+
+    def serve_forever(self, host: str = "127.0.0.1", port: int = 8765, unix_socket: Optional[str] = None,
+                      ready: Optional[Callable[[asyncio.AbstractServer], Any]] = None) -> None:
+        """
+        Run the server until interrupted.
+        :param host: Interface to bind.
+        :param port: TCP port.
+        :param unix_socket: Path of a Unix socket to listen on instead of TCP.
+        :param ready: Optional callback called with the asyncio server once it listens.
+        """
+        async def main():
+            server = await self.start(host, port, unix_socket)
+            if ready is not None:
+                ready(server)
+            async with server:
+                await server.serve_forever()
+
+        try:
+            asyncio.run(main())
+        finally:
+            self.executor.shutdown(wait=False)
+            if unix_socket and os.path.exists(unix_socket):
+                os.remove(unix_socket)
+
+    def _analyzer(self, request: Dict[str, Any]) -> DataAnalyzer:
+        path = request.get('path')
+        if not path:
+            raise ValueError("The request must give the 'path' of a CSV file.")
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"File not found: '{path}'.")
+        start_date, end_date, filters = request.get('start_date'), request.get('end_date'), request.get('filters')
+        if start_date is None and end_date is None and not filters:
+            return self.datasets.get(path)
+        analyzer, data = self.datasets.filter(path, filters, start_date, end_date)
+        fingerprint = ResultCache.key(analyzer.fingerprint, 'filter', {'start_date': start_date, 'end_date': end_date,
+                                                                       'filters': filters})
+        return DataAnalyzer(data, result_cache=self.datasets.result_cache, fingerprint=fingerprint)
+
+def _guarded(route: Callable[[Dict[str, Any]], Response], request: Dict[str, Any]) -> Response:
+    try:
+        return route(request)
+    except FileNotFoundError as e:
+        return _error_response(404, str(e))
+    except (ValueError, KeyError, TypeError) as e:
+        return _error_response(400, str(e))
+    except Exception as e:
+        return _error_response(500, f"{type(e).__name__}: {e}")
+
+def _json_response(payload: Any, status: int = 200) -> Response:
+    return status, 'application/json', json.dumps(payload, default=str).encode('utf-8')
+
+def _error_response(status: int, message: str) -> Response:
+    return _json_response({'error': message}, status)
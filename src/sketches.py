@@ -0,0 +1,340 @@
+import math
+import random
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional
+
+class KLLSketch:
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        """
+        Initialize a KLL quantile sketch.
+
+        The sketch keeps at most O(k) values regardless of how many values it has seen, and can
+        be merged with other sketches built with the same k. Its normalized rank error is roughly
+        2.3 / k (see `rank_error`). While fewer than k values have been added, quantiles are exact.
+        :param k: Accuracy parameter; larger values use more memory and give smaller errors.
+        :param seed: Optional seed for the compaction coin flips, for reproducible results.
+        """
+        if k < 8:
+            raise ValueError("k must be at least 8.")
+        self.k = k
+        self.n = 0
+        self._levels: List[np.ndarray] = [np.empty(0)]
+        self._random = random.Random(seed)
+
+    @classmethod
+    def from_error(cls, error: float, seed: Optional[int] = None) -> "KLLSketch":
+        """
+        Create a sketch sized for a target normalized rank error.
+        :param error: Target rank error as a fraction (e.g., 0.01 for 1%).
+        :param seed: Optional seed for the compaction coin flips.
+        :return: Empty KLLSketch.
+        """
+        if not 0 < error < 1:
+            raise ValueError("error must be between 0 and 1.")
+        return cls(k=max(8, int(math.ceil((2.296 / error) ** (1 / 0.9723)))), seed=seed)
+
+    @property
+    def rank_error(self) -> float:
+        """
+        Approximate normalized rank error of the sketch (0 while it is still exact).
+        """
+        if self.is_exact:
+            return 0.0
+        return 2.296 / self.k ** 0.9723
+
+    @property
+    def is_exact(self) -> bool:
+        """
+        Whether every value added so far is still retained.
+        """
+        return len(self._levels) == 1
+
+    def update(self, values: Iterable[float]) -> None:
+        """
+        Add a batch of values to the sketch. NaN values are ignored.
+        :param values: Values to add.
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        self.n += values.size
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        self._compress()
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """
+        Merge another sketch into this one.
+        :param other: Sketch built with the same k.
+        :return: This sketch.
+        """
+        if other.k != self.k:
+            raise ValueError(f"Cannot merge sketches with different k ({self.k} and {other.k}).")
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0))
+        for level, values in enumerate(other._levels):
+            self._levels[level] = np.concatenate([self._levels[level], values])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Export the sketch as a JSON-serializable dictionary.
+        :return: Dictionary with the accuracy parameter, item count and retained values per level.
+        """
+        return {'k': self.k, 'n': self.n, 'levels': [level.tolist() for level in self._levels]}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any], seed: Optional[int] = None) -> "KLLSketch":
+        """
+        Rebuild a sketch exported with to_dict.
+        :param state: Dictionary produced by to_dict.
+        :param seed: Optional seed for future compaction coin flips.
+        :return: KLLSketch.
+        """
+        sketch = cls(k=state['k'], seed=seed)
+        sketch.n = state['n']
+        sketch._levels = [np.asarray(level, dtype=float) for level in state['levels']] or [np.empty(0)]
+        return sketch
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate the value at quantile q.
+        :param q: Quantile between 0 and 1.
+        :return: Estimated value, or NaN if the sketch is empty.
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1.")
+        if self.n == 0:
+            return float("nan")
+        if self.is_exact:
+            return float(np.quantile(self._levels[0], q))
+
+        values = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(level.size, 2 ** h, dtype=float) for h, level in enumerate(self._levels)])
+        order = np.argsort(values, kind="stable")
+        cumulative = np.cumsum(weights[order])
+        index = int(np.searchsorted(cumulative, q * cumulative[-1], side="left"))
+        return float(values[order][min(index, values.size - 1)])
+
+    def median(self) -> float:
+        """
+        Estimate the median.
+        :return: Estimated median, or NaN if the sketch is empty.
+        """
+        return self.quantile(0.5)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self) -> None:
+        while sum(level.size for level in self._levels) > sum(self._capacity(h) for h in range(len(self._levels))):
+            for h, values in enumerate(self._levels):
+                if values.size >= self._capacity(h):
+                    break
+            if h + 1 == len(self._levels):
+                self._levels.append(np.empty(0))
+
+            values = np.sort(values)
+            held_back = values[:0]
+            if values.size % 2:
+                held_back, values = values[-1:], values[:-1]
+            promoted = values[self._random.randint(0, 1)::2]
+            self._levels[h] = held_back
+            self._levels[h + 1] = np.concatenate([self._levels[h + 1], promoted])
+
+class HyperLogLog:
+    def __init__(self, precision: int = 14):
+        """
+        Initialize a HyperLogLog distinct-count sketch.
+
+        The sketch keeps 2 ** precision one-byte registers whatever the number of values added, and
+        estimates the number of distinct values with a relative standard error of about
+        1.04 / sqrt(2 ** precision) (0.8% for the default precision). Sketches with the same precision
+        merge exactly.
+        :param precision: Number of index bits, between 4 and 18.
+        """
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18.")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @classmethod
+    def from_error(cls, error: float) -> "HyperLogLog":
+        """
+        Create a sketch sized for a target relative standard error.
+        :param error: Target relative error as a fraction (e.g., 0.01 for 1%).
+        :return: Empty HyperLogLog.
+        """
+        if not 0 < error < 1:
+            raise ValueError("error must be between 0 and 1.")
+        return cls(min(18, max(4, int(math.ceil(math.log2((1.04 / error) ** 2))))))
+
+    @property
+    def relative_error(self) -> float:
+        """
+        Relative standard error of the estimate.
+        """
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def update(self, values: Iterable[Any]) -> None:
+        """
+        Add a batch of values to the sketch. Missing values are ignored.
+        :param values: Values to add (numbers, strings or categories).
+        """
+        values = pd.Series(values).dropna()
+        if values.empty:
+            return
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64)
+        bits = 64 - self.precision
+        index = (hashes >> np.uint64(bits)).astype(np.intp)
+        remainder = hashes & np.uint64((1 << bits) - 1)
+        # Keep the top 53 remaining bits, which convert to float exactly, to get bit lengths from frexp.
+        shift = max(0, bits - 53)
+        remainder = (remainder >> np.uint64(shift)).astype(float)
+        rank = (bits - shift) - np.frexp(remainder)[1] + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """
+        Merge another sketch into this one.
+        :param other: Sketch built with the same precision.
+        :return: This sketch.
+        """
+        if other.precision != self.precision:
+            raise ValueError(f"Cannot merge sketches with different precisions ({self.precision} and "
+                             f"{other.precision}).")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self) -> float:
+        """
+        Estimate the number of distinct values added.
+        :return: Estimated distinct count.
+        """
+        m = len(self.registers)
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        estimate = alpha * m * m / float(np.sum(np.ldexp(1.0, -self.registers.astype(int))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate while many registers are still empty.
+            estimate = m * math.log(m / zeros)
+        return estimate
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Export the sketch as a JSON-serializable dictionary.
+        :return: Dictionary with the precision and registers.
+        """
+        return {'precision': self.precision, 'registers': self.registers.tolist()}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "HyperLogLog":
+        """
+        Rebuild a sketch exported with to_dict.
+        :param state: Dictionary produced by to_dict.
+        :return: HyperLogLog.
+        """
+        sketch = cls(state['precision'])
+        sketch.registers = np.asarray(state['registers'], dtype=np.uint8)
+        return sketch
+
+class SpaceSaving:
+    def __init__(self, capacity: int = 100):
+        """
+        Initialize a weighted Space-Saving heavy-hitters sketch.
+
+        The sketch tracks at most `capacity` keys with an estimated total weight each. Estimates never
+        undercount, and overcount by at most the key's recorded error, itself at most
+        total weight / capacity; every key whose true weight exceeds that bound is tracked.
+        Batches are pre-aggregated and folded in with the mergeable-summaries rule, so updates are
+        vectorized and sketches built over disjoint data merge.
+        :param capacity: Maximum number of tracked keys.
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be a positive integer.")
+        self.capacity = capacity
+        self.total = 0.0
+        self.counts = pd.Series(dtype=float)
+        self.errors = pd.Series(dtype=float)
+
+    @classmethod
+    def from_error(cls, error: float) -> "SpaceSaving":
+        """
+        Create a sketch whose estimates are within a fraction of the total weight.
+        :param error: Maximum overcount as a fraction of the total weight (e.g., 0.01 for 1%).
+        :return: Empty SpaceSaving.
+        """
+        if not 0 < error < 1:
+            raise ValueError("error must be between 0 and 1.")
+        return cls(int(math.ceil(1 / error)))
+
+    def update(self, keys: Iterable[Any], weights: Optional[Iterable[float]] = None) -> None:
+        """
+        Add a batch of weighted keys. Missing keys are ignored.
+        :param keys: Keys to add.
+        :param weights: Weight of each key (default: 1 each, i.e. counting occurrences).
+        """
+        keys = pd.Series(keys)
+        weights = pd.Series(1.0 if weights is None else weights, index=keys.index, dtype=float)
+        batch = weights.groupby(keys.to_numpy(), sort=False).sum()
+        if batch.empty:
+            return
+        exact = SpaceSaving(max(self.capacity, len(batch)))
+        exact.counts, exact.errors, exact.total = batch, pd.Series(0.0, index=batch.index), float(batch.sum())
+        self.merge(exact)
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        """
+        Merge another sketch into this one, keeping this sketch's capacity.
+        :param other: Sketch built over a disjoint part of the data.
+        :return: This sketch.
+        """
+        # A key missing from a full summary may have had up to its smallest count there.
+        floor, other_floor = self._floor(), other._floor()
+        counts, other_counts = self.counts.align(other.counts, join='outer')
+        errors, other_errors = self.errors.align(other.errors, join='outer')
+        counts = counts.fillna(floor) + other_counts.fillna(other_floor)
+        errors = errors.fillna(floor) + other_errors.fillna(other_floor)
+        keep = counts.nlargest(self.capacity).index
+        self.counts, self.errors = counts[keep], errors[keep]
+        self.total += other.total
+        return self
+
+    def top(self, n: int) -> pd.DataFrame:
+        """
+        Heaviest tracked keys.
+        :param n: Number of keys to return.
+        :return: DataFrame indexed by key with 'estimate' (never below the true weight) and 'error'
+                 (maximum overcount) columns, heaviest first.
+        """
+        counts = self.counts.nlargest(n)
+        return pd.DataFrame({'estimate': counts, 'error': self.errors[counts.index]})
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Export the sketch as a JSON-serializable dictionary.
+        :return: Dictionary with the capacity, total weight and tracked keys.
+        """
+        return {'capacity': self.capacity, 'total': self.total, 'keys': self.counts.index.tolist(),
+                'counts': self.counts.tolist(), 'errors': self.errors.tolist()}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "SpaceSaving":
+        """
+        Rebuild a sketch exported with to_dict.
+        :param state: Dictionary produced by to_dict.
+        :return: SpaceSaving.
+        """
+        sketch = cls(state['capacity'])
+        sketch.total = state['total']
+        index = pd.Index(state['keys'])
+        sketch.counts = pd.Series(state['counts'], index=index, dtype=float)
+        sketch.errors = pd.Series(state['errors'], index=index, dtype=float)
+        return sketch
+
+    def _floor(self) -> float:
+        return float(self.counts.min()) if len(self.counts) >= self.capacity else 0.0
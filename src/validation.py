@@ -0,0 +1,157 @@
+import os
+import re
+import numpy as np
+import pandas as pd
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+# Inclusive (lower, upper) bounds; None leaves a side open.
+Bounds = Tuple[Optional[float], Optional[float]]
+DateBounds = Tuple[Optional[str], Optional[str]]
+
+@dataclass
+class ValidationRules:
+    """
+    Row rules checked by DataLoader after cleaning, in addition to the required columns.
+    Every rule is evaluated as a boolean mask over the whole frame or chunk; rows failing any rule
+    are rejected, counted under the first rule they fail, and optionally written to a quarantine file.
+    Missing values are left to the required-column check, so rules only judge present values.
+    :param nullable: Required columns that may hold missing values.
+    :param ranges: Mapping of numeric columns to inclusive (min, max) bounds, e.g. {"amount": (0, None)};
+                   values that are not numbers are rejected as 'invalid_number:<column>'.
+    :param date_bounds: Mapping of date columns to inclusive (first, last) dates in 'YYYY-MM-DD' format.
+    :param patterns: Mapping of columns to regular expressions their values must fully match,
+                     e.g. {"customer_id": r"C\\d+"}.
+    :param quarantine_path: Optional CSV file that rejected rows are appended to, with a 'rejected_by' column.
+    """
+    nullable: List[str] = field(default_factory=list)
+    ranges: Dict[str, Bounds] = field(default_factory=dict)
+    date_bounds: Dict[str, DateBounds] = field(default_factory=dict)
+    patterns: Dict[str, str] = field(default_factory=dict)
+    quarantine_path: Optional[str] = None
+
+    def __post_init__(self):
+        for column, pattern in self.patterns.items():
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                raise ValueError(f"Invalid pattern for column '{column}': {e}")
+
+    @property
+    def columns(self) -> List[str]:
+        """
+        Columns the rules read.
+        """
+        return list(dict.fromkeys([*self.ranges, *self.date_bounds, *self.patterns]))
+
+    def failures(self, data: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        Evaluate every rule on a cleaned DataFrame.
+        :param data: DataFrame to check.
+        :return: Mapping of rule names to boolean arrays marking the rows that fail them.
+        """
+        missing_columns = [col for col in self.columns if col not in data.columns]
+        if missing_columns:
+            raise ValueError(f"Columns {missing_columns} of the validation rules not found in the DataFrame.")
+        masks = {}
+        for column, (low, high) in self.ranges.items():
+            values = data[column]
+            if not pd.api.types.is_numeric_dtype(values):
+                # Text that is not a number cannot be compared with the bounds, so it fails on its own rule.
+                numbers = pd.to_numeric(values, errors='coerce')
+                masks[f"invalid_number:{column}"] = (numbers.isna() & values.notna()).to_numpy()
+                values = numbers
+            masks[f"range:{column}"] = _outside(values, low, high)
+        for column, (first, last) in self.date_bounds.items():
+            values = data[column]
+            if not pd.api.types.is_datetime64_any_dtype(values):
+                values = pd.to_datetime(values, errors='coerce')
+            masks[f"date_bounds:{column}"] = _outside(values, pd.to_datetime(first) if first is not None else None,
+                                                      pd.to_datetime(last) if last is not None else None)
+        for column, pattern in self.patterns.items():
+            masks[f"pattern:{column}"] = _mismatches(data[column], pattern)
+        return masks
+
+@dataclass
+class ValidationReport:
+    """
+    Running counts of the rows checked and rejected by a DataLoader, per rule.
+    Rule names are 'missing:<column>' for missing values in required columns, 'invalid_date:<column>'
+    for dates that could not be parsed, 'invalid_number:<column>' for values of numeric columns that
+    are not numbers, and those of ValidationRules.failures.
+    """
+    rows_checked: int = 0
+    rejected: Counter = field(default_factory=Counter)
+
+    @property
+    def rows_rejected(self) -> int:
+        """
+        Total number of rejected rows.
+        """
+        return sum(self.rejected.values())
+
+    def merge(self, other: "ValidationReport") -> "ValidationReport":
+        """
+        Add the counts of another report, e.g. one filled in a worker process.
+        :param other: Report to add.
+        :return: This report.
+        """
+        self.rows_checked += other.rows_checked
+        self.rejected.update(other.rejected)
+        return self
+
+    def summary(self) -> str:
+        """
+        Describe the rejections in one line.
+        :return: Summary text.
+        """
+        details = ", ".join(f"{rule}: {count}" for rule, count in self.rejected.most_common())
+        return f"Rejected {self.rows_rejected} of {self.rows_checked} rows" + (f" ({details})" if details else "")
+
+def reject(data: pd.DataFrame, failures: Dict[str, np.ndarray], report: ValidationReport,
+           quarantine_path: Optional[str] = None) -> pd.DataFrame:
+    """
+    Drop the rows failing any rule, count them under the first rule they fail, and quarantine them.
+    :param data: DataFrame the masks were evaluated on.
+    :param failures: Mapping of rule names to boolean arrays of failing rows, in priority order.
+    :param report: Report the rejections are added to.
+    :param quarantine_path: Optional CSV file the rejected rows are appended to.
+    :return: DataFrame of the remaining rows (the input itself if none is rejected).
+    """
+    if not failures:
+        return data
+    stacked = np.vstack([np.asarray(mask, dtype=bool) for mask in failures.values()])
+    failed = stacked.any(axis=0)
+    if not failed.any():
+        return data
+    rules = np.asarray(list(failures))
+    first_failed = rules[np.argmax(stacked[:, failed], axis=0)]
+    names, counts = np.unique(first_failed, return_counts=True)
+    report.rejected.update(dict(zip(names.tolist(), counts.tolist())))
+    if quarantine_path:
+        rejected = data.loc[failed].assign(rejected_by=first_failed)
+        header = not os.path.exists(quarantine_path) or os.path.getsize(quarantine_path) == 0
+        rejected.to_csv(quarantine_path, mode='a', header=header, index=False)
+    return data.loc[~failed]
+
+def _outside(values: pd.Series, low: Any, high: Any) -> np.ndarray:
+    outside = np.zeros(len(values), dtype=bool)
+    if low is not None:
+        outside |= (values < low).to_numpy(dtype=bool, na_value=False)
+    if high is not None:
+        outside |= (values > high).to_numpy(dtype=bool, na_value=False)
+    return outside
+
+def _mismatches(values: pd.Series, pattern: str) -> np.ndarray:
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Match each distinct value once and map the result back through the codes.
+        categories = values.cat.categories.astype(str).to_series()
+        if len(categories) == 0:
+            return np.zeros(len(values), dtype=bool)
+        matched = categories.str.fullmatch(pattern).to_numpy(dtype=bool)
+        codes = values.cat.codes.to_numpy()
+        return np.where(codes >= 0, ~matched[codes], False)
+    present = values.notna().to_numpy()
+    matched = values.astype(str).str.fullmatch(pattern).to_numpy(dtype=bool, na_value=False)
+    return present & ~matched
@@ -1,60 +1,126 @@
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
-from typing import Optional
+from matplotlib.axes import Axes
+from matplotlib.figure import Figure
+from typing import Any, List, Optional, Tuple
+from src.correlation import cluster_order, correlation_matrix
+from src.downsampling import lttb, min_max
+from src.profiling import Profiler, profiled
 
 class DataVisualizer:
-    def __init__(self):
+    DOWNSAMPLERS = {"lttb": lttb, "minmax": min_max}
+    # Heatmaps wider than this drop per-cell annotations and are clustered by default.
+    ANNOTATE_MAX_COLUMNS = 30
+
+    def __init__(self, profiler: Optional[Profiler] = None, reuse_figure: bool = False):
         """
         Initialize the DataVisualizer class.
+        :param profiler: Optional profiler recording each chart.
+        :param reuse_figure: Draw every chart on one Figure that is cleared in between, instead of opening
+                             a new pyplot figure per chart. The figure is not registered with pyplot, so it
+                             renders headlessly and memory stays flat over many charts; each returned figure
+                             is only valid until the next chart is drawn.
+        """
+        self.profiler = profiler
+        self.reuse_figure = reuse_figure
+        self._figure: Optional[Figure] = None
+
+    def close(self) -> None:
         """
-        pass
+        Release the reused figure, if any.
+        """
+        if self._figure is not None:
+            self._figure.clear()
+            self._figure = None
+
+    def _subplots(self, figsize: Tuple[float, float]) -> Tuple[Figure, Axes]:
+        if not self.reuse_figure:
+            return plt.subplots(figsize=figsize)
+        if self._figure is None:
+            self._figure = Figure()
+        self._figure.clear()
+        self._figure.set_size_inches(figsize)
+        return self._figure, self._figure.add_subplot()
 
+    @profiled("visualizer.bar_chart")
     def bar_chart(self, data: pd.DataFrame, category_column: str, value_column: str, title: str = "Bar Chart", 
-                  color: str = "blue", save_path: Optional[str] = None):
+                  color: str = "blue", save_path: Optional[str] = None, estimator: str = "mean",
+                  errorbar: Optional[Any] = None):
         """
         Generate a bar chart for spending by category.
+        Values are aggregated per category before plotting, so only one bar per category reaches
+        seaborn, which then draws each value as is; requesting error bars plots the raw rows instead,
+        since they need every value.
         :param data: DataFrame containing the data.
         :param category_column: Column containing categories.
         :param value_column: Column containing values.
         :param title: Title of the chart.
         :param color: Color of the bars.
         :param save_path: Path to save the chart as a file.
+        :param estimator: Aggregation of the values of each category (e.g., 'mean' or 'sum').
+        :param errorbar: Seaborn error bar specification, e.g. ('ci', 95); None draws no error bars.
         :return: Matplotlib figure.
         """
-        fig, ax = plt.subplots(figsize=(10, 6))
-        sns.barplot(x=category_column, y=value_column, data=data, ax=ax, color=color)
+        if errorbar is None:
+            data = data.groupby(category_column, observed=True, sort=False)[value_column].agg(estimator).reset_index()
+            # The mean of the single aggregated row of each category is that row.
+            estimator = "mean"
+        fig, ax = self._subplots((10, 6))
+        sns.barplot(x=category_column, y=value_column, data=data, ax=ax, color=color, estimator=estimator,
+                    errorbar=errorbar)
         ax.set_title(title)
         ax.set_xlabel(category_column)
         ax.set_ylabel(value_column)
-        plt.xticks(rotation=45)
+        ax.tick_params(axis='x', labelrotation=45)
         
         if save_path:
-            plt.savefig(save_path)
+            fig.savefig(save_path)
         return fig
 
+    @profiled("visualizer.line_chart")
     def line_chart(self, data: pd.DataFrame, x_column: str, y_column: str, title: str = "Line Chart", 
-                   color: str = "blue", save_path: Optional[str] = None):
+                   color: str = "blue", save_path: Optional[str] = None, estimator: str = "mean",
+                   freq: Optional[str] = None, max_points: Optional[int] = None, downsample: str = "lttb"):
         """
         Generate a line chart for spending over time.
+        Values are aggregated once, per x value or per period with `freq`, then long series are downsampled
+        to about one point per pixel of the figure, so the plotted size does not grow with the data.
         :param data: DataFrame containing the data.
         :param x_column: Column for the x-axis (e.g., dates).
         :param y_column: Column for the y-axis (e.g., values).
         :param title: Title of the chart.
         :param color: Color of the line.
         :param save_path: Path to save the chart as a file.
+        :param estimator: Aggregation of the y values sharing an x value or period (e.g., 'mean' or 'sum').
+        :param freq: Optional pandas offset alias to resample a datetime x-axis by, e.g. 'D' or 'W'.
+        :param max_points: Maximum number of plotted points (default: the figure width in pixels).
+        :param downsample: Downsampling method: 'lttb' preserves the shape, 'minmax' preserves spikes.
         :return: Matplotlib figure.
         """
-        fig, ax = plt.subplots(figsize=(10, 6))
-        sns.lineplot(x=x_column, y=y_column, data=data, ax=ax, color=color)
+        if downsample not in self.DOWNSAMPLERS:
+            raise ValueError(f"Unknown downsampling method '{downsample}'; expected one of {list(self.DOWNSAMPLERS)}.")
+        key: Any = x_column
+        if freq is not None:
+            if not pd.api.types.is_datetime64_any_dtype(data[x_column]):
+                raise ValueError(f"Column '{x_column}' must contain datetimes to be resampled.")
+            key = pd.Grouper(key=x_column, freq=freq)
+        fig, ax = self._subplots((10, 6))
+        series = data.groupby(key, observed=True)[y_column].agg(estimator).dropna()
+        if max_points is None:
+            max_points = int(fig.get_figwidth() * fig.dpi)
+        if len(series) > max_points:
+            series = series.iloc[self.DOWNSAMPLERS[downsample](series.index, series.to_numpy(), max_points)]
+        sns.lineplot(x=x_column, y=y_column, data=series.reset_index(), ax=ax, color=color, errorbar=None)
         ax.set_title(title)
         ax.set_xlabel(x_column)
         ax.set_ylabel(y_column)
         
         if save_path:
-            plt.savefig(save_path)
+            fig.savefig(save_path)
         return fig
 
+    @profiled("visualizer.pie_chart")
     def pie_chart(self, data: pd.DataFrame, value_column: str, label_column: str, title: str = "Pie Chart", 
                   save_path: Optional[str] = None):
         """
@@ -66,29 +132,44 @@ class DataVisualizer:
         :param save_path: Path to save the chart as a file.
         :return: Matplotlib figure.
         """
-        fig, ax = plt.subplots(figsize=(8, 8))
+        fig, ax = self._subplots((8, 8))
         ax.pie(data[value_column], labels=data[label_column], autopct='%1.1f%%', startangle=90)
         ax.set_title(title)
         
         if save_path:
-            plt.savefig(save_path)
+            fig.savefig(save_path)
         return fig
 
+    @profiled("visualizer.heatmap")
     def heatmap(self, data: pd.DataFrame, title: str = "Heatmap", cmap: str = "coolwarm", 
-                save_path: Optional[str] = None):
+                save_path: Optional[str] = None, columns: Optional[List[str]] = None,
+                sample_rows: Optional[int] = None, cluster: Optional[bool] = None,
+                annotate: Optional[bool] = None):
         """
         Generate a heatmap for correlation between variables.
+        Only numeric columns are correlated, in a few matrix products (see `correlation_matrix`), so
+        wide tables with hundreds of columns stay fast; large tables can be sampled first.
         :param data: DataFrame containing the data.
         :param title: Title of the heatmap.
         :param cmap: Colormap for the heatmap.
         :param save_path: Path to save the heatmap as a file.
+        :param columns: Columns to correlate (default: every numeric column).
+        :param sample_rows: Optional number of rows to sample before correlating.
+        :param cluster: Order columns so that correlated ones are adjacent (default: beyond ANNOTATE_MAX_COLUMNS).
+        :param annotate: Print each correlation in its cell (default: up to ANNOTATE_MAX_COLUMNS columns).
         :return: Matplotlib figure.
         """
-        fig, ax = plt.subplots(figsize=(10, 8))
-        correlation_matrix = data.corr()
-        sns.heatmap(correlation_matrix, annot=True, fmt=".2f", cmap=cmap, ax=ax)
+        correlation = correlation_matrix(data, columns, sample_rows)
+        wide = len(correlation) > self.ANNOTATE_MAX_COLUMNS
+        cluster = wide if cluster is None else cluster
+        annotate = not wide if annotate is None else annotate
+        if cluster:
+            order = cluster_order(correlation)
+            correlation = correlation.loc[order, order]
+        fig, ax = self._subplots((10, 8))
+        sns.heatmap(correlation, annot=annotate, fmt=".2f", cmap=cmap, vmin=-1, vmax=1, center=0, ax=ax)
         ax.set_title(title)
         
         if save_path:
-            plt.savefig(save_path)
-        return fig
\ No newline at end of file
+            fig.savefig(save_path)
+        return fig
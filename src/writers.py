@@ -0,0 +1,85 @@
+import os
+import pandas as pd
+from typing import Callable, Dict, Iterator
+
+DEFAULT_BATCH_ROWS = 100_000
+
+def write_result(data: pd.DataFrame, path: str, batch_rows: int = DEFAULT_BATCH_ROWS) -> str:
+    """
+    Write an analysis result in the format selected by the file extension:
+    '.parquet', '.feather' or '.arrow', '.jsonl' or '.ndjson'; any other path is written as CSV.
+
+    Rows are encoded and written in batches, so large results such as per-customer segmentations
+    never exist as one encoded block in memory. The file is written under a temporary name and
+    renamed when complete, so readers never see a partial result.
+    :param data: Result to write; its index is not written.
+    :param path: Destination path.
+    :param batch_rows: Rows encoded per batch.
+    :return: Path of the written file.
+    """
+    writer = WRITERS.get(os.path.splitext(path)[1].lower(), _write_csv)
+    if batch_rows < 1:
+        raise ValueError("batch_rows must be a positive integer.")
+    data = data.reset_index(drop=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        writer(data, temp_path, batch_rows)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return path
+
+def _batches(data: pd.DataFrame, batch_rows: int) -> Iterator[pd.DataFrame]:
+    for start in range(0, max(len(data), 1), batch_rows):
+        yield data.iloc[start:start + batch_rows]
+
+def _write_csv(data: pd.DataFrame, path: str, batch_rows: int) -> None:
+    data.to_csv(path, index=False, chunksize=batch_rows)
+
+def _write_jsonl(data: pd.DataFrame, path: str, batch_rows: int) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        for batch in _batches(data, batch_rows):
+            if len(batch):
+                # Depending on the pandas version, the last record may or may not end with a newline.
+                text = batch.to_json(orient='records', lines=True, date_format='iso')
+                f.write(text if text.endswith('\n') else text + '\n')
+
+def _arrow_batches(data: pd.DataFrame, batch_rows: int):
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError(f"Parquet and Feather outputs require pyarrow: {e}")
+    # The schema of the first batch would miss categories that only appear in later batches.
+    schema = pa.Schema.from_pandas(data.iloc[:0], preserve_index=False)
+    for index, field in enumerate(schema):
+        if pa.types.is_dictionary(field.type):
+            schema = schema.set(index, field.with_type(pa.dictionary(pa.int32(), field.type.value_type)))
+    return schema, (pa.Table.from_pandas(batch, schema=schema, preserve_index=False)
+                    for batch in _batches(data, batch_rows))
+
+def _write_parquet(data: pd.DataFrame, path: str, batch_rows: int) -> None:
+    schema, tables = _arrow_batches(data, batch_rows)
+    import pyarrow.parquet as pq
+
+    with pq.ParquetWriter(path, schema) as writer:
+        for table in tables:
+            writer.write_table(table, row_group_size=batch_rows)
+
+def _write_feather(data: pd.DataFrame, path: str, batch_rows: int) -> None:
+    schema, tables = _arrow_batches(data, batch_rows)
+    import pyarrow as pa
+
+    # Feather version 2 is the Arrow IPC file format, so batches can be appended to one file.
+    with pa.ipc.new_file(path, schema) as writer:
+        for table in tables:
+            writer.write_table(table)
+
+WRITERS: Dict[str, Callable[[pd.DataFrame, str, int], None]] = {
+    '.csv': _write_csv,
+    '.jsonl': _write_jsonl,
+    '.ndjson': _write_jsonl,
+    '.parquet': _write_parquet,
+    '.feather': _write_feather,
+    '.arrow': _write_feather,
+}
@@ -0,0 +1,103 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.aggregates import AggregateCube, GroupedMoments
+
+class TestGroupedMoments(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up sample data for testing.
+        """
+        rng = np.random.default_rng(0)
+        self.data = pd.DataFrame({
+            "category": rng.choice(["Food", "Transport", "Entertainment", "Rent"], size=500),
+            "amount": rng.gamma(2.0, 50.0, size=500),
+        })
+        self.data.loc[self.data.index[:3], "category"] = "Single"
+
+    def test_from_frame(self):
+        """
+        Test that aggregates of a single frame match pandas.
+        """
+        result = GroupedMoments.from_frame(self.data, "category", "amount").to_frame()
+        expected = self.data.groupby("category")["amount"].agg(["count", "sum", "mean", "std"])
+        pd.testing.assert_frame_equal(result, expected, check_names=False, check_dtype=False)
+
+    def test_merge_matches_full_groupby(self):
+        """
+        Test that merging chunk aggregates reproduces the aggregates of the whole frame.
+        """
+        merged = GroupedMoments()
+        for start in range(0, len(self.data), 70):
+            chunk = self.data.iloc[start:start + 70]
+            merged = merged.merge(GroupedMoments.from_frame(chunk, "category", "amount"))
+
+        result = merged.to_frame()
+        expected = self.data.groupby("category")["amount"].agg(["count", "sum", "mean", "std"])
+        pd.testing.assert_frame_equal(result, expected, check_names=False, check_dtype=False)
+
+    def test_single_value_std_is_nan(self):
+        """
+        Test that keys seen once have an undefined standard deviation.
+        """
+        data = pd.DataFrame({"category": ["A", "B", "B"], "amount": [1.0, 2.0, 4.0]})
+        result = GroupedMoments.from_frame(data, "category", "amount").to_frame()
+        self.assertTrue(np.isnan(result.loc["A", "std"]))
+        self.assertAlmostEqual(result.loc["B", "std"], np.sqrt(2.0))
+
+class TestAggregateCube(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up transactions with several rows per (category, customer, day) for testing.
+        """
+        rng = np.random.default_rng(0)
+        self.data = pd.DataFrame({
+            "date": pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 120 * 86_400, 5_000), unit="s"),
+            "category": pd.Categorical(rng.choice(["Food", "Transport", "Rent"], size=5_000)),
+            "customer_id": rng.choice([f"C{i}" for i in range(40)], size=5_000),
+            "amount": 1e6 + rng.gamma(2.0, 50.0, size=5_000),
+        })
+        self.data.loc[self.data.index[:5], "amount"] = np.nan
+        self.cube = AggregateCube.build(self.data, ["category", "customer_id", "date"], "amount", date_column="date")
+
+    def test_rollups_match_groupby(self):
+        """
+        Test that rollups of the cube match a pandas groupby of the rows, including days coarsened to months.
+        """
+        rows = self.data.dropna(subset=["amount"]).assign(day=self.data["date"].dt.floor("D"))
+        self.assertLess(len(self.cube), len(rows))
+        self.assertEqual(len(self.cube), len(rows.groupby(["category", "customer_id", "day"], observed=True)))
+
+        result = self.cube.rollup(["category"]).set_index("category")
+        expected = rows.groupby("category", observed=True)["amount"].agg(["count", "sum", "mean", "std"])
+        pd.testing.assert_frame_equal(result, expected, check_names=False, check_dtype=False,
+                                      check_index_type=False, check_categorical=False, rtol=1e-9)
+
+        result = self.cube.rollup(["date", "category"], freq="M")
+        months = rows["date"].dt.to_period("M").dt.start_time.rename("date")
+        expected = rows.groupby([months, "category"], observed=True)["amount"].agg(["count", "sum", "mean", "std"])
+        np.testing.assert_allclose(result[["count", "sum", "mean", "std"]], expected, rtol=1e-9)
+        self.assertListEqual(list(result["date"].unique()), list(pd.date_range("2025-01-01", periods=4, freq="MS")))
+
+        total = self.cube.rollup()
+        self.assertEqual(total["count"].iloc[0], len(rows))
+        self.assertAlmostEqual(total["std"].iloc[0], rows["amount"].std(), places=6)
+
+    def test_top_and_errors(self):
+        """
+        Test top-N queries and the errors for unknown dimensions, periods and aggregates.
+        """
+        top = self.cube.top("customer_id", n=3)
+        expected = self.data.groupby("customer_id")["amount"].sum().nlargest(3)
+        self.assertListEqual(top["customer_id"].tolist(), expected.index.tolist())
+        with self.assertRaises(ValueError):
+            self.cube.rollup(["amount"])
+        with self.assertRaises(ValueError):
+            self.cube.rollup(["date"], freq="month")
+        with self.assertRaises(ValueError):
+            self.cube.top("category", by="median")
+        with self.assertRaises(ValueError):
+            AggregateCube.build(self.data, ["category"], "amount", date_column="date")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,9 @@
 import unittest
+import numpy as np
 import pandas as pd
 from io import StringIO
-from src.analyzer import DataAnalyzer
+from unittest import mock
+from src.analyzer import ApproximateAnalyzer, DataAnalyzer, StreamingAnalyzer
 
 class TestDataAnalyzer(unittest.TestCase):
     def setUp(self):
@@ -38,6 +40,36 @@ class TestDataAnalyzer(unittest.TestCase):
         self.assertIn("date", result.columns)
         self.assertIn("amount", result.columns)
 
+    def test_resampled_time_series(self):
+        """
+        Test resampling, rolling windows and per-category breakdowns of the time-series analysis.
+        """
+        data = pd.DataFrame({
+            "date": pd.to_datetime(["2025-04-01", "2025-04-01", "2025-04-03", "2025-05-02"]),
+            "category": ["Food", "Transport", "Food", "Transport"],
+            "amount": [100.0, 50.0, 200.0, 75.0],
+        })
+        analyzer = DataAnalyzer(data)
+
+        daily = analyzer.time_series_analysis("date", "amount", freq="day", window=2)
+        self.assertEqual(len(daily), 32)  # Days without rows are filled with 0
+        self.assertListEqual(list(daily["amount"][:3]), [150.0, 0.0, 200.0])
+        self.assertListEqual(list(daily["amount_rolling_mean"][:3]), [150.0, 75.0, 100.0])
+
+        monthly = analyzer.time_series_analysis("date", "amount", freq="month", by="category")
+        self.assertListEqual(list(monthly.columns), ["date", "category", "amount"])
+        self.assertListEqual(list(monthly["date"].astype(str).unique()), ["2025-04-01", "2025-05-01"])
+        self.assertListEqual(list(monthly["amount"]), [300.0, 50.0, 0.0, 75.0])
+
+        weekly = analyzer.time_series_analysis("date", "amount", freq="week")
+        self.assertTrue((weekly["date"].dt.dayofweek == 0).all())
+        self.assertEqual(weekly["amount"].sum(), 425.0)
+
+        with self.assertRaises(ValueError):
+            analyzer.time_series_analysis("date", "amount", freq="hour")
+        with self.assertRaises(ValueError):
+            analyzer.time_series_analysis("date", "amount", window=0)
+
     def test_spending_distribution(self):
         """
         Test spending distribution analysis.
@@ -66,6 +98,122 @@ class TestDataAnalyzer(unittest.TestCase):
         self.assertIn("Average Spending", result.columns)
         self.assertIn("Transaction Count", result.columns)
 
+    def test_rfm_segmentation(self):
+        """
+        Test RFM values, quantile scores and rule-based and clustered segments.
+        """
+        data = pd.DataFrame({
+            "date": pd.to_datetime(["2025-04-01", "2025-04-30", "2025-04-29", "2025-04-30", "2025-01-05",
+                                    "2025-04-28", "2025-04-30", "2025-02-01"]),
+            "amount": [10.0, 20.0, 30.0, 40.0, 5.0, 300.0, 100.0, 1.0],
+            "customer_id": ["C1", "C1", "C2", "C2", "C3", "C4", "C4", "C5"],
+        })
+        result = DataAnalyzer(data).rfm_segmentation("customer_id", "amount", "date", quantiles=5)
+        result = result.set_index("customer_id")
+        self.assertListEqual(list(result["Recency"]), [0.0, 0.0, 115.0, 0.0, 88.0])
+        self.assertListEqual(list(result["Frequency"]), [2, 2, 1, 2, 1])
+        self.assertListEqual(list(result["Monetary"]), [30.0, 70.0, 5.0, 400.0, 1.0])
+        self.assertListEqual(list(result["R"]), [4, 4, 1, 4, 2])
+        self.assertListEqual(list(result["M"]), [3, 4, 2, 5, 1])
+        self.assertEqual(result.loc["C4", "RFM Score"], result.loc["C4", ["R", "F", "M"]].sum())
+        self.assertEqual(result.loc["C4", "Segment"], "Champions")
+        self.assertEqual(result.loc["C3", "Segment"], "Hibernating")
+
+        clustered = DataAnalyzer(data).rfm_segmentation("customer_id", "amount", "date", clusters=2)
+        self.assertEqual(clustered["Cluster"].nunique(), 2)
+        self.assertEqual(clustered.groupby("Cluster")["Segment"].nunique().max(), 1)
+        with self.assertRaises(ValueError):
+            DataAnalyzer(data).rfm_segmentation("customer_id", "amount", "missing")
+
+    def test_drill_down(self):
+        """
+        Test that drill-down queries are served from one memoized cube and match the analyses on rows.
+        """
+        data = pd.DataFrame({
+            "date": pd.to_datetime(["2025-04-01", "2025-04-01", "2025-04-20", "2025-05-02", "2025-05-03"]),
+            "category": ["Food", "Food", "Transport", "Food", "Transport"],
+            "customer_id": ["C1", "C1", "C2", "C1", "C3"],
+            "amount": [100.0, 20.0, 50.0, 200.0, 75.0],
+        })
+        analyzer = DataAnalyzer(data)
+        totals = analyzer.drill_down(["category"]).set_index("category")["sum"]
+        pd.testing.assert_series_equal(totals, data.groupby("category")["amount"].sum(), check_names=False)
+        monthly = analyzer.drill_down(["date"], freq="month")
+        self.assertListEqual(monthly["sum"].tolist(), [170.0, 275.0])
+        self.assertEqual(len(analyzer.aggregate_cube()), 4)  # (Food, C1, 2025-04-01) holds two rows
+        self.assertIs(analyzer.aggregate_cube(), analyzer.aggregate_cube())
+        with self.assertRaises(ValueError):
+            analyzer.drill_down(["date"], freq="year")
+
+    def test_analyses_read_built_cube(self):
+        """
+        Test that category totals and periodic time series add up the cells of a built cube instead of
+        regrouping the rows, unless the cube left rows out.
+        """
+        rng = np.random.default_rng(3)
+        data = pd.DataFrame({
+            "date": pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 90 * 86400, 500), unit="s"),
+            "category": rng.choice(["Food", "Transport", "Entertainment"], 500),
+            "customer_id": rng.choice([f"C{i}" for i in range(30)], 500),
+            "amount": rng.gamma(2.0, 50.0, 500),
+        })
+        rows = DataAnalyzer(data)
+        expected_top = rows.top_spending_categories("category", "amount", top_n=2)
+        expected_weekly = rows.time_series_analysis("date", "amount", freq="week", window=2, by="category")
+
+        analyzer = DataAnalyzer(data)
+        analyzer.aggregate_cube()
+        with mock.patch.object(pd.DataFrame, "groupby", side_effect=AssertionError), \
+                mock.patch.object(pd.Series, "groupby", side_effect=AssertionError):
+            pd.testing.assert_frame_equal(analyzer.top_spending_categories("category", "amount", top_n=2),
+                                          expected_top)
+            pd.testing.assert_frame_equal(
+                analyzer.time_series_analysis("date", "amount", freq="week", window=2, by="category"),
+                expected_weekly)
+        self.assertIsNone(analyzer.built_cube(["category"], "other"))
+
+        data.loc[0, "customer_id"] = None
+        partial = DataAnalyzer(data)
+        self.assertEqual(partial.aggregate_cube().skipped, 1)
+        self.assertIsNone(partial.built_cube(["category"], "amount"))
+
+    def test_run_analyses(self):
+        """
+        Test running several analyses with shared per-category aggregates.
+        """
+        results = self.analyzer.run_analyses(["summary", "category", "segmentation"], top_n=2)
+        self.assertListEqual(list(results), ["summary", "category", "segmentation"])
+        pd.testing.assert_frame_equal(results["summary"], self.analyzer.summary_statistics("category", "amount"))
+        pd.testing.assert_frame_equal(results["category"],
+                                      self.analyzer.top_spending_categories("category", "amount", top_n=2))
+        self.assertEqual(len(self.analyzer._category_aggregates), 1)  # One shared groupby
+
+        # Alone, the category analysis sums without computing medians and standard deviations.
+        alone = DataAnalyzer(self.data)
+        pd.testing.assert_frame_equal(alone.run_analyses(["category"], top_n=2)["category"], results["category"])
+        self.assertEqual(len(alone._category_aggregates), 0)
+
+        with self.assertRaises(ValueError):
+            self.analyzer.run_analyses(["invalid_analysis"])
+
+    def test_analyses_do_not_modify_data(self):
+        """
+        Test that analyses leave the shared DataFrame untouched, whatever the order they run in.
+        """
+        data = pd.DataFrame({
+            "date": ["2025-04-01", "2025-04-02", "2025-04-02"],
+            "category": ["Food", "Transport", "Food"],
+            "amount": [100.0, 50.0, 200.0],
+        })
+        snapshot = data.copy()
+        analyzer = DataAnalyzer(data)
+        distribution = analyzer.spending_distribution("amount", bins=2)
+        trend = analyzer.time_series_analysis("date", "amount")
+        pd.testing.assert_frame_equal(data, snapshot)
+        self.assertEqual(distribution["Count"].sum(), 3)
+        self.assertListEqual(list(trend["amount"]), [100.0, 250.0])
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(trend["date"]))
+
     def test_invalid_columns(self):
         """
         Test handling of invalid columns.
@@ -90,5 +238,128 @@ class TestDataAnalyzer(unittest.TestCase):
             self.analyzer.customer_segmentation("invalid_column", "amount")
         self.assertIn("Columns 'invalid_column' or 'amount' not found", str(context.exception))
 
+class TestStreamingAnalyzer(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up sample data split into chunks for testing.
+        """
+        rng = np.random.default_rng(0)
+        self.data = pd.DataFrame({
+            "category": rng.choice(["Food", "Transport", "Entertainment"], size=3_000),
+            "amount": rng.gamma(2.0, 50.0, size=3_000).round(2),
+            "customer_id": rng.choice([f"C{i}" for i in range(40)], size=3_000),
+        })
+        self.chunks = [self.data.iloc[start:start + 250] for start in range(0, len(self.data), 250)]
+        self.analyzer = DataAnalyzer(self.data)
+
+    def test_matches_in_memory_results(self):
+        """
+        Test that folded chunk aggregates match the in-memory analyzer.
+        """
+        streaming = StreamingAnalyzer(sketch_k=5_000).consume(self.chunks)
+        pd.testing.assert_frame_equal(streaming.summary_statistics(),
+                                      self.analyzer.summary_statistics("category", "amount"))
+        pd.testing.assert_frame_equal(streaming.top_spending_categories(top_n=2),
+                                      self.analyzer.top_spending_categories("category", "amount", top_n=2))
+        pd.testing.assert_frame_equal(streaming.customer_segmentation(),
+                                      self.analyzer.customer_segmentation("customer_id", "amount"),
+                                      check_dtype=False)
+
+    def test_exact_medians(self):
+        """
+        Test that the second pass turns sketched medians into exact ones.
+        """
+        streaming = StreamingAnalyzer(sketch_k=16).consume(self.chunks)
+        medians = streaming.compute_exact_medians(lambda: iter(self.chunks))
+        expected = self.data.groupby("category")["amount"].median()
+        for category, median in expected.items():
+            self.assertEqual(medians[category], median)
+        self.assertListEqual(list(streaming.summary_statistics()["median"]), list(expected))
+
+    def test_invalid_columns(self):
+        """
+        Test handling of chunks without the configured columns.
+        """
+        with self.assertRaises(ValueError) as context:
+            StreamingAnalyzer(category_column="invalid_column").update(self.data)
+        self.assertIn("not found in the DataFrame", str(context.exception))
+
+class TestApproximateAnalyzer(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up sample data split into chunks for testing.
+        """
+        rng = np.random.default_rng(0)
+        self.data = pd.DataFrame({
+            "category": rng.choice(["Food", "Transport", "Entertainment"], size=3_000),
+            "amount": rng.gamma(2.0, 50.0, size=3_000).round(2),
+            "customer_id": rng.choice([f"C{i}" for i in range(400)], size=3_000),
+        })
+        self.chunks = [self.data.iloc[start:start + 250] for start in range(0, len(self.data), 250)]
+
+    def test_sketched_results(self):
+        """
+        Test that sketched results match exact ones within their error bounds.
+        """
+        analyzer = ApproximateAnalyzer(error=0.01).consume(self.chunks[:6])
+        analyzer.merge(ApproximateAnalyzer(error=0.01).consume(self.chunks[6:]))
+        analyzer = ApproximateAnalyzer.from_dict(analyzer.to_dict())
+        exact = DataAnalyzer(self.data)
+        self.assertEqual(analyzer.rows, len(self.data))
+
+        summary = analyzer.summary_statistics()
+        expected = exact.summary_statistics("category", "amount")
+        np.testing.assert_allclose(summary["mean"], expected["mean"])
+        ranks = [(self.data.loc[self.data["category"] == category, "amount"] < median).mean()
+                 for category, median in zip(summary["category"], summary["median"])]
+        np.testing.assert_allclose(ranks, 0.5, atol=0.02)
+
+        top = analyzer.top_spending_categories(3)
+        expected = exact.top_spending_categories("category", "amount", 3)
+        self.assertListEqual(list(top["category"]), list(expected["category"]))
+        np.testing.assert_allclose(top["amount"], expected["amount"])
+
+        customers = analyzer.customer_segmentation(top_n=5)
+        totals = self.data.groupby("customer_id")["amount"].sum()
+        self.assertListEqual(list(customers.columns), ["customer_id", "Total Spending", "Max Error"])
+        true = totals[customers["customer_id"]].to_numpy()
+        self.assertTrue((customers["Total Spending"].to_numpy() >= true - 1e-6).all())
+        self.assertTrue((customers["Max Error"] <= self.data["amount"].sum() * 0.01 + 1e-6).all())
+
+        self.assertAlmostEqual(analyzer.distinct_customers(), self.data["customer_id"].nunique(), delta=8)
+        median = analyzer.quantiles([0.5])["amount"].iloc[0]
+        rank = (self.data["amount"] < median).mean()
+        self.assertLess(abs(rank - 0.5), 0.02)
+
+    def test_invalid_columns(self):
+        """
+        Test handling of invalid columns and mismatched configurations.
+        """
+        with self.assertRaises(ValueError):
+            ApproximateAnalyzer(customer_column="missing").update(self.data)
+        with self.assertRaises(ValueError):
+            ApproximateAnalyzer(error=0.01).merge(ApproximateAnalyzer(error=0.05))
+        with self.assertRaises(ValueError):
+            ApproximateAnalyzer(customer_column=None).customer_segmentation()
+
+    def test_medians_of_heavy_categories(self):
+        """
+        Test that with more categories than 1 / error, median sketches are kept for the heavy hitters only.
+        """
+        rng = np.random.default_rng(1)
+        categories = np.concatenate([rng.choice(["Food", "Rent"], size=4_000), [f"K{i}" for i in range(1_000)]])
+        data = pd.DataFrame({"category": categories, "amount": rng.gamma(2.0, 50.0, size=5_000)}).sample(
+            frac=1, random_state=0)
+        analyzer = ApproximateAnalyzer(customer_column=None, error=0.05)
+        analyzer.consume([data.iloc[start:start + 500] for start in range(0, len(data), 500)])
+        self.assertLessEqual(len(analyzer.median_sketches), 20)
+        summary = analyzer.categories.summary_statistics().set_index("category")
+        self.assertEqual(len(summary), 1_002)
+        summary = analyzer.summary_statistics().set_index("category")
+        for category in ("Food", "Rent"):
+            amounts = data.loc[data["category"] == category, "amount"]
+            self.assertLess(abs((amounts < summary.loc[category, "median"]).mean() - 0.5), 0.05)
+        self.assertEqual(summary["median"].notna().sum(), len(analyzer.median_sketches))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
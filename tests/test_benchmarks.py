@@ -0,0 +1,77 @@
+import json
+import os
+import tempfile
+import unittest
+import pandas as pd
+from benchmarks.compare import compare
+from benchmarks.generator import generate_transactions, write_csv
+from benchmarks.run import run_benchmarks
+from benchmarks.startup import forbidden_imports, parse_importtime, profile_startup
+
+class TestBenchmarks(unittest.TestCase):
+    def test_generator_is_deterministic(self):
+        """
+        Test that the generator gives the same rows for the same arguments and honours cardinalities.
+        """
+        first = generate_transactions(5_000, n_categories=7, n_customers=50, seed=3)
+        pd.testing.assert_frame_equal(first, generate_transactions(5_000, n_categories=7, n_customers=50, seed=3))
+        self.assertFalse(first.equals(generate_transactions(5_000, n_categories=7, n_customers=50, seed=4)))
+        self.assertEqual(first["category"].nunique(), 7)
+        self.assertLessEqual(first["customer_id"].nunique(), 50)
+        self.assertTrue(first["date"].is_monotonic_increasing)
+
+    def test_write_csv_in_parts(self):
+        """
+        Test writing a dataset in several parts.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = write_csv(os.path.join(tmp_dir, "data.csv"), 2_500, chunk_rows=1_000, n_categories=3)
+            data = pd.read_csv(path)
+            self.assertEqual(len(data), 2_500)
+            self.assertListEqual(list(data.columns), ["date", "category", "amount", "customer_id"])
+
+    def test_run_and_compare(self):
+        """
+        Test that a benchmark run produces comparable JSON records.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            results = run_benchmarks(1_000, 5, 100, tmp_dir, repeat=1, plot_max_rows=0)
+            names = [record["benchmark"] for record in results]
+            self.assertIn("loader.load_csv+clean_data", names)
+            self.assertIn("analyzer.customer_segmentation", names)
+            self.assertIn("analyzer.rfm_segmentation[clusters]", names)
+            self.assertFalse([record for record in results if "error" in record])
+            self.assertTrue(all(record["seconds"] >= 0 and record["peak_bytes"] > 0 for record in results))
+
+            path = os.path.join(tmp_dir, "results.json")
+            with open(path, "w") as f:
+                json.dump({"environment": {}, "results": results}, f)
+            ratios = compare(path, path)
+            self.assertEqual(len(ratios), len(results))
+            self.assertTrue(all(row["memory_ratio"] == 1.0 for row in ratios))
+
+class TestStartup(unittest.TestCase):
+    def test_parse_importtime(self):
+        """
+        Test parsing of the -X importtime report.
+        """
+        modules = parse_importtime("import time: self [us] | cumulative | imported package\n"
+                                   "import time:       120 |        120 |   matplotlib._version\n"
+                                   "import time:       300 |        420 | matplotlib\n")
+        self.assertEqual(modules["matplotlib"], {"self_us": 300, "cumulative_us": 420, "depth": 0})
+        self.assertEqual(modules["matplotlib._version"]["depth"], 1)
+        self.assertListEqual(forbidden_imports(modules), ["matplotlib", "matplotlib._version"])
+        self.assertListEqual(forbidden_imports(modules, ["seaborn"]), [])
+
+    def test_analysis_path_skips_plotting_libraries(self):
+        """
+        Test that running an analysis without a plot never imports matplotlib or seaborn.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = write_csv(os.path.join(tmp_dir, "data.csv"), 200, n_categories=3, n_customers=20)
+            result = profile_startup([path, "--analysis", "summary", "category", "--no-cache"], repeat=1)
+        self.assertIn("src.analyzer", result["modules"])
+        self.assertListEqual(forbidden_imports(result["modules"]), [])
+
+if __name__ == "__main__":
+    unittest.main()
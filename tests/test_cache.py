@@ -0,0 +1,205 @@
+import os
+import tempfile
+import time
+import unittest
+import pandas as pd
+from unittest import mock
+from src.analyzer import DataAnalyzer
+from src.cache import ColumnarCache, ResultCache, file_fingerprint, frame_fingerprint
+from src.data_loader import DataLoader
+
+class TestColumnarCache(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up a temporary source file and cache directory for testing.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp_dir.name, "data.csv")
+        pd.DataFrame({
+            "date": ["2025-04-01", "2025-04-02", "2025-04-03"],
+            "category": ["Food", "Transport", "Food"],
+            "amount": [100.0, 50.0, 200.0],
+        }).to_csv(self.csv_path, index=False)
+        self.cache = ColumnarCache(os.path.join(self.tmp_dir.name, "cache"))
+
+    def tearDown(self):
+        """
+        Clean up the temporary files.
+        """
+        self.tmp_dir.cleanup()
+
+    def test_fingerprint(self):
+        """
+        Test that the fingerprint changes with the file contents and extra key parts.
+        """
+        key = file_fingerprint(self.csv_path, ["date"])
+        self.assertEqual(key, file_fingerprint(self.csv_path, ["date"]))
+        self.assertNotEqual(key, file_fingerprint(self.csv_path, ["date", "amount"]))
+
+        with open(self.csv_path, "a") as f:
+            f.write("2025-04-04,Food,10.0\n")
+        self.assertNotEqual(key, file_fingerprint(self.csv_path, ["date"]))
+
+    def test_round_trip(self):
+        """
+        Test that cached frames keep their values and dtypes.
+        """
+        data = pd.DataFrame({
+            "date": pd.to_datetime(["2025-04-01", "2025-04-02"]),
+            "category": pd.Categorical(["Food", "Transport"]),
+            "amount": [1.5, 2.5],
+        })
+        self.assertIsNone(self.cache.get("key"))
+        self.cache.put("key", data)
+        pd.testing.assert_frame_equal(self.cache.get("key"), data)
+
+    def test_eviction(self):
+        """
+        Test that the least recently used entries are evicted beyond the size budget.
+        """
+        data = pd.DataFrame({"amount": range(1000)})
+        self.cache.put("old", data)
+        size = os.path.getsize(self.cache.path_for("old"))
+        self.cache.max_bytes = int(size * 2.5)
+        past = time.time() - 60
+        os.utime(self.cache.path_for("old"), (past, past))
+
+        self.cache.put("new", data)
+        self.cache.put("newest", data)
+        self.assertFalse(os.path.exists(self.cache.path_for("old")))
+        self.assertTrue(os.path.exists(self.cache.path_for("new")))
+        self.assertTrue(os.path.exists(self.cache.path_for("newest")))
+
+    def test_sidecars_follow_their_entry(self):
+        """
+        Test that sidecar files are dropped when their entry is rewritten or cleared.
+        """
+        self.cache.put("key", pd.DataFrame({"amount": [1.0]}))
+        sidecar = self.cache.sidecar_path("key", "index.npz")
+        with open(sidecar, "wb") as f:
+            f.write(b"index")
+
+        self.cache.put("key", pd.DataFrame({"amount": [2.0]}))
+        self.assertFalse(os.path.exists(sidecar))
+
+        with open(sidecar, "wb") as f:
+            f.write(b"index")
+        self.cache.clear()
+        self.assertFalse(os.path.exists(sidecar))
+
+    def test_loader_uses_cache(self):
+        """
+        Test that DataLoader.load_clean skips parsing when a cached copy exists.
+        """
+        loader = DataLoader(required_columns=["date", "category", "amount"], cache=self.cache)
+        first = loader.load_clean(self.csv_path)
+        with mock.patch.object(loader, "load_csv", side_effect=AssertionError("CSV parsed again")):
+            pd.testing.assert_frame_equal(loader.load_clean(self.csv_path), first)
+
+        with mock.patch.object(loader, "load_csv", wraps=loader.load_csv) as load_csv:
+            loader.load_clean(self.csv_path, rebuild_cache=True)
+            load_csv.assert_called_once()
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up a source file, its analyzer and a result cache for testing.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp_dir.name, "data.csv")
+        pd.DataFrame({
+            "date": ["2025-04-01", "2025-04-02", "2025-04-03"],
+            "category": ["Food", "Transport", "Food"],
+            "amount": [100.0, 50.0, 200.0],
+            "customer_id": ["C1", "C2", "C1"],
+        }).to_csv(self.csv_path, index=False)
+        self.loader = DataLoader(required_columns=["date", "category", "amount", "customer_id"])
+        self.results = ResultCache(cache_dir=os.path.join(self.tmp_dir.name, "results"))
+
+    def tearDown(self):
+        """
+        Clean up the temporary files.
+        """
+        self.tmp_dir.cleanup()
+
+    def analyzer(self, results: ResultCache) -> DataAnalyzer:
+        return DataAnalyzer(self.loader.load_clean(self.csv_path), result_cache=results,
+                            fingerprint=file_fingerprint(self.csv_path, self.loader.required_columns))
+
+    def test_repeated_calls_hit(self):
+        """
+        Test that repeated calls with the same arguments are served from the cache, and different ones are not.
+        """
+        analyzer = self.analyzer(self.results)
+        first = analyzer.top_spending_categories("category", "amount", top_n=1)
+        with mock.patch.object(pd.DataFrame, "groupby", side_effect=AssertionError("recomputed")):
+            pd.testing.assert_frame_equal(analyzer.top_spending_categories("category", "amount", 1), first)
+        analyzer.top_spending_categories("category", "amount", top_n=2)
+        self.assertEqual((self.results.hits, self.results.misses), (1, 2))
+
+        first.loc[0, "amount"] = -1.0
+        self.assertEqual(analyzer.top_spending_categories("category", "amount", top_n=1).loc[0, "amount"], 300.0)
+
+    def test_disk_store_survives_process_and_invalidates(self):
+        """
+        Test that a new cache over the same directory serves results from disk until the source file changes.
+        """
+        expected = self.analyzer(self.results).customer_segmentation("customer_id", "amount")
+        restarted = ResultCache(cache_dir=self.results.disk.cache_dir)
+        pd.testing.assert_frame_equal(self.analyzer(restarted).customer_segmentation("customer_id", "amount"),
+                                      expected)
+        self.assertEqual(restarted.stats()['disk_hits'], 1)
+
+        with open(self.csv_path, "a") as f:
+            f.write("2025-04-04,Food,10.0,C3\n")
+        self.assertEqual(len(self.analyzer(restarted).customer_segmentation("customer_id", "amount")), 3)
+        self.assertEqual(restarted.misses, 1)
+
+    def test_refresh_recomputes_and_stores(self):
+        """
+        Test that a refreshing cache recomputes results and overwrites the stored ones.
+        """
+        analyzer = self.analyzer(self.results)
+        analyzer.customer_segmentation("customer_id", "amount")
+        key = next(iter(self.results._entries))
+        self.results.put(key, pd.DataFrame({"stale": [1]}))
+
+        refreshed = ResultCache(cache_dir=self.results.disk.cache_dir, refresh=True)
+        result = self.analyzer(refreshed).customer_segmentation("customer_id", "amount")
+        self.assertNotIn("stale", result.columns)
+        self.assertEqual((refreshed.hits, refreshed.misses), (0, 1))
+        restarted = ResultCache(cache_dir=self.results.disk.cache_dir)
+        pd.testing.assert_frame_equal(self.analyzer(restarted).customer_segmentation("customer_id", "amount"), result)
+        self.assertEqual(restarted.stats()['disk_hits'], 1)
+
+    def test_memory_budget(self):
+        """
+        Test that least recently used results are evicted beyond the size budget.
+        """
+        result = pd.DataFrame({"amount": range(100)})
+        size = int(result.memory_usage(index=True, deep=True).sum())
+        results = ResultCache(max_bytes=int(size * 2.5))
+        for key in ("a", "b", "c"):
+            results.put(key, result)
+        self.assertIsNone(results.get("a"))
+        self.assertIsNotNone(results.get("c"))
+        self.assertLessEqual(results.stats()['bytes'], results.max_bytes)
+
+    def test_content_fingerprint(self):
+        """
+        Test that analyzers without a fingerprint are keyed by the contents of their data.
+        """
+        data = self.loader.load_clean(self.csv_path)
+        self.assertEqual(frame_fingerprint(data), frame_fingerprint(data.copy()))
+        changed = data.copy()
+        changed.loc[0, "amount"] = 1.0
+        self.assertNotEqual(frame_fingerprint(data), frame_fingerprint(changed))
+
+        analyzer = DataAnalyzer(data, result_cache=self.results)
+        analyzer.summary_statistics("category", "amount")
+        analyzer.data = changed
+        self.assertEqual(analyzer.summary_statistics("category", "amount").loc[0, "mean"], 100.5)
+        self.assertEqual(self.results.misses, 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+import numpy as np
+from src.clustering import minibatch_kmeans, nearest_centers
+
+class TestClustering(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up three well-separated blobs for testing.
+        """
+        rng = np.random.default_rng(0)
+        self.means = np.array([[0.0, 0.0], [10.0, 0.0], [0.0, 10.0]])
+        self.labels = rng.integers(0, 3, 30_000)
+        self.points = self.means[self.labels] + rng.normal(0, 0.5, (30_000, 2))
+
+    def test_minibatch_kmeans_recovers_blobs(self):
+        """
+        Test that mini-batch k-means finds the blob centers and assigns every point to its blob.
+        """
+        centers = minibatch_kmeans(self.points, 3, batch_size=512, iterations=50)
+        matched, _ = nearest_centers(self.means, centers)
+        self.assertEqual(len(set(matched)), 3)
+        np.testing.assert_allclose(centers[matched], self.means, atol=0.1)
+
+        labels, distances = nearest_centers(self.points, centers, chunk_rows=1_000)
+        np.testing.assert_array_equal(labels, matched[self.labels])
+        self.assertTrue(np.all(distances >= 0))
+
+    def test_invalid_k(self):
+        """
+        Test that invalid cluster counts are rejected.
+        """
+        with self.assertRaises(ValueError):
+            minibatch_kmeans(self.points, 0)
+        with self.assertRaises(ValueError):
+            minibatch_kmeans(self.points[:2], 3)
+
+if __name__ == "__main__":
+    unittest.main()
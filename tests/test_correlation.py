@@ -0,0 +1,58 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.correlation import cluster_order, correlation_matrix, numeric_columns
+
+class TestCorrelation(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up a table mixing numeric and non-numeric columns for testing.
+        """
+        rng = np.random.default_rng(0)
+        base = rng.normal(size=(500, 2))
+        self.data = pd.DataFrame({
+            "category": rng.choice(["Food", "Transport"], size=500),
+            "a": base[:, 0],
+            "b": base[:, 1],
+            "a_like": base[:, 0] + rng.normal(0, 0.1, 500),
+            "b_like": -base[:, 1] + rng.normal(0, 0.1, 500),
+            "count": rng.integers(0, 10, 500),
+            "flag": rng.random(500) < 0.5,
+        })
+
+    def test_matches_pandas(self):
+        """
+        Test that the matrix-product correlation matches DataFrame.corr on numeric columns, with and without gaps.
+        """
+        self.assertListEqual(numeric_columns(self.data), ["a", "b", "a_like", "b_like", "count", "flag"])
+        expected = self.data[numeric_columns(self.data)].astype(float).corr()
+        pd.testing.assert_frame_equal(correlation_matrix(self.data), expected, atol=1e-12)
+
+        gappy = self.data.copy()
+        gappy.loc[::7, "a"] = np.nan
+        gappy.loc[::5, "b_like"] = np.nan
+        expected = gappy[numeric_columns(gappy)].astype(float).corr()
+        pd.testing.assert_frame_equal(correlation_matrix(gappy), expected, atol=1e-12)
+
+    def test_sampling_and_constant_columns(self):
+        """
+        Test row sampling, NaN correlations of constant columns, and the error without numeric columns.
+        """
+        sampled = correlation_matrix(self.data, ["a", "a_like"], sample_rows=100)
+        self.assertGreater(sampled.loc["a", "a_like"], 0.9)
+        constant = correlation_matrix(self.data.assign(constant=1.0), ["a", "constant"])
+        self.assertTrue(np.isnan(constant.loc["a", "constant"]))
+        with self.assertRaises(ValueError):
+            correlation_matrix(self.data[["category"]])
+
+    def test_cluster_order(self):
+        """
+        Test that clustering places correlated columns next to each other.
+        """
+        order = cluster_order(correlation_matrix(self.data, ["a", "b", "count", "a_like", "b_like"]))
+        self.assertEqual(abs(order.index("a") - order.index("a_like")), 1)
+        self.assertEqual(abs(order.index("b") - order.index("b_like")), 1)
+        self.assertCountEqual(order, ["a", "b", "count", "a_like", "b_like"])
+
+if __name__ == "__main__":
+    unittest.main()
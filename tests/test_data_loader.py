@@ -1,7 +1,11 @@
+import os
+import tempfile
 import unittest
 import pandas as pd
 from io import StringIO
-from src.data_loader import DataLoader
+from src.cache import ColumnarCache, file_fingerprint
+from src.data_loader import CsvSchema, DataLoader
+from src.validation import ValidationRules
 
 class TestDataLoader(unittest.TestCase):
     def setUp(self):
@@ -52,6 +56,81 @@ class TestDataLoader(unittest.TestCase):
         self.assertEqual(len(cleaned_data), 4)  # Invalid rows should be dropped
         self.assertTrue(pd.api.types.is_datetime64_any_dtype(cleaned_data["date"]))
 
+    def test_clean_data_does_not_modify_input(self):
+        """
+        Test that cleaning returns a new DataFrame and leaves its input untouched.
+        """
+        data = pd.DataFrame({"date": ["2025-04-01", "invalid_date"], "category": ["Food", "Transport"]})
+        snapshot = data.copy()
+        cleaned = self.loader.clean_data(data)
+        pd.testing.assert_frame_equal(data, snapshot)
+        self.assertEqual(len(cleaned), 1)
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(cleaned["date"]))
+
+    def test_validation_rules(self):
+        """
+        Test that only required columns must be complete, that rule violations are counted and quarantined,
+        and that text columns are only converted when every value is numeric.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "data.csv")
+            pd.DataFrame({
+                "date": ["2025-04-01", "2025-04-02", "invalid_date", "2025-04-04", "2025-04-05", "2025-04-06"],
+                "category": ["Food", None, "Food", "Transport", "Food", "Food"],
+                "value": ["100", "50", "200", "-1", "75", "20"],
+                "customer_id": ["C1", "C2", "C3", "C4", "X5", "C6"],
+                "note": [None, "early", None, None, None, "late"],
+            }).to_csv(path, index=False)
+            quarantine = os.path.join(tmp_dir, "rejected.csv")
+            rules = ValidationRules(ranges={"value": (0, None)}, patterns={"customer_id": r"C\d+"},
+                                    quarantine_path=quarantine)
+            loader = DataLoader(required_columns=["date", "category", "value", "customer_id"], rules=rules)
+
+            data = loader.load_clean(path)
+            self.assertListEqual(list(data["value"]), [100, 20])
+            self.assertTrue(pd.api.types.is_numeric_dtype(data["value"]))
+            self.assertFalse(pd.api.types.is_numeric_dtype(data["note"]))
+            self.assertEqual(loader.report.rows_checked, 6)
+            self.assertDictEqual(dict(loader.report.rejected), {"missing:category": 1, "invalid_date:date": 1,
+                                                                "range:value": 1, "pattern:customer_id": 1})
+            self.assertListEqual(list(pd.read_csv(quarantine)["customer_id"]), ["C2", "C3", "C4", "X5"])
+
+            nullable = DataLoader(required_columns=["date", "category", "value"],
+                                  rules=ValidationRules(nullable=["category"]))
+            self.assertEqual(len(nullable.load_clean(path)), 5)
+            self.assertNotEqual(nullable.fingerprint(path), loader.fingerprint(path))
+            self.assertEqual(loader.fingerprint(path), DataLoader(
+                required_columns=loader.required_columns,
+                rules=ValidationRules(ranges=rules.ranges, patterns=rules.patterns)).fingerprint(path))
+
+    def test_invalid_numbers(self):
+        """
+        Test that values of numeric columns that are not numbers reject their row instead of failing the load,
+        with a declared schema and with a range rule on inferred types.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "data.csv")
+            pd.DataFrame({
+                "date": ["2025-04-01", "2025-04-02", "2025-04-03"],
+                "category": ["Food", "Transport", "Food"],
+                "value": ["100", "abc", "200"],
+            }).to_csv(path, index=False)
+            quarantine = os.path.join(tmp_dir, "rejected.csv")
+            schema = CsvSchema(dtypes={"value": "float64"}, date_columns=["date"])
+            loaders = [
+                DataLoader(required_columns=["date", "category", "value"], schema=schema,
+                           rules=ValidationRules(quarantine_path=quarantine)),
+                DataLoader(required_columns=["date", "category", "value"],
+                           rules=ValidationRules(ranges={"value": (0, None)}, quarantine_path=quarantine)),
+            ]
+            for loader in loaders:
+                data = loader.load_clean(path)
+                self.assertListEqual(list(data["value"]), [100, 200])
+                self.assertTrue(pd.api.types.is_numeric_dtype(data["value"]))
+                self.assertDictEqual(dict(loader.report.rejected), {"invalid_number:value": 1})
+            self.assertEqual(loaders[0].load_clean(path)["value"].dtype, "float64")
+            self.assertListEqual(list(pd.read_csv(quarantine)["value"]), ["abc", "abc", "abc"])
+
     def test_filter_by_date_range(self):
         """
         Test filtering by date range.
@@ -74,5 +153,140 @@ class TestDataLoader(unittest.TestCase):
             self.loader.filter_by_categories(self.data, "nonexistent_column", ["Food"])
         self.assertIn("The DataFrame does not contain the column", str(context.exception))
 
+    def test_load_clean_chunks(self):
+        """
+        Test streaming a CSV file in validated and cleaned chunks.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "data.csv")
+            pd.DataFrame({
+                "date": ["2025-04-01", "2025-04-02", "invalid_date", "2025-04-04", "2025-04-05"],
+                "category": ["Food", "Transport", "Food", "Entertainment", "Food"],
+                "value": [100, 50, 200, 150, 75],
+            }).to_csv(path, index=False)
+
+            chunks = list(self.loader.load_clean_chunks(path, chunksize=2))
+            self.assertListEqual([len(chunk) for chunk in chunks], [2, 1, 1])
+            self.assertTrue(all(pd.api.types.is_datetime64_any_dtype(chunk["date"]) for chunk in chunks))
+
+            with self.assertRaises(ValueError):
+                list(self.loader.load_csv_chunks(path, chunksize=0))
+
+    def test_date_range_pushdown(self):
+        """
+        Test that date ranges are applied by binary search on sorted data and while streaming.
+        """
+        loader = DataLoader()
+        data = loader.clean_data(self.data.iloc[[0, 1, 2, 3]].assign(date=[
+            "2025-04-01", "2025-04-02", "2025-04-03", "2025-04-04"]))
+        self.assertListEqual(list(loader.filter_by_date_range(data, "2025-04-02", "2025-04-03").index), [1, 2])
+        self.assertListEqual(list(loader.filter_by_date_range(data, start_date="2025-04-03").index), [2, 3])
+        unsorted = data.iloc[[3, 0, 2, 1]]
+        self.assertListEqual(list(loader.filter_by_date_range(unsorted, end_date="2025-04-02").index), [0, 1])
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "data.csv")
+            pd.DataFrame({
+                "date": pd.date_range("2025-04-01", periods=10).strftime("%Y-%m-%d"),
+                "category": ["Food", "Transport"] * 5,
+                "value": range(10),
+            }).to_csv(path, index=False)
+
+            chunks = list(loader.load_clean_chunks(path, chunksize=3, start_date="2025-04-03",
+                                                   end_date="2025-04-05"))
+            self.assertListEqual([list(chunk["value"]) for chunk in chunks], [[2], [3, 4]])
+
+            # With sorted dates, reading stops at the first chunk that ends past the range.
+            sorted_loader = DataLoader(sorted_by_date=True)
+            read = []
+            sorted_loader.load_csv_chunks = lambda *args: (read.append(chunk) or chunk
+                                                           for chunk in DataLoader.load_csv_chunks(loader, *args))
+            chunks = list(sorted_loader.load_clean_chunks(path, 3, start_date="2025-04-03", end_date="2025-04-05"))
+            self.assertListEqual([list(chunk["value"]) for chunk in chunks], [[2], [3, 4]])
+            self.assertEqual(len(read), 2)
+
+            data = loader.load_clean(path, start_date="2025-04-09")
+            self.assertListEqual(list(data["value"]), [8, 9])
+
+            # Chunks holding different categories concatenate to the dtype of a whole-file load.
+            schema = CsvSchema(categorical_columns=["category"])
+            chunked = DataLoader(schema=schema)
+            chunked.DATE_RANGE_CHUNKSIZE = 3
+            data = chunked.load_clean(path, start_date="2025-04-03")
+            self.assertIsInstance(data["category"].dtype, pd.CategoricalDtype)
+            self.assertListEqual(list(data["category"].cat.categories), ["Food", "Transport"])
+            self.assertListEqual(list(data["category"]), ["Food", "Transport"] * 4)
+            empty = loader.load_clean(path, start_date="2026-01-01")
+            self.assertListEqual(list(empty.columns), ["date", "category", "value"])
+            self.assertEqual(len(empty), 0)
+
+    def test_filters_use_persisted_index(self):
+        """
+        Test that filters on cached data go through a row index stored next to the cache entry.
+        """
+        try:
+            ColumnarCache(".")
+        except ImportError:
+            self.skipTest("pyarrow is not installed")
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "data.csv")
+            pd.DataFrame({
+                "date": ["2025-04-03", "2025-04-01", "2025-04-02", "2025-04-04"],
+                "category": ["Food", "Transport", "Food", "Entertainment"],
+                "value": [100, 50, 200, 150],
+            }).to_csv(path, index=False)
+            filters = {"category": ["Food", "Entertainment"]}
+            expected = DataLoader().load_clean(path, start_date="2025-04-02", filters=filters)
+            self.assertListEqual(list(expected["value"]), [100, 200, 150])
+
+            loader = DataLoader(cache=ColumnarCache(os.path.join(tmp_dir, "cache")))
+            data = loader.load_clean(path, start_date="2025-04-02", filters=filters)
+            self.assertListEqual(list(data["value"]), [100, 200, 150])
+            index_path = loader.cache.sidecar_path(file_fingerprint(path, None, None), DataLoader.INDEX_SUFFIX)
+            self.assertTrue(os.path.exists(index_path))
+
+            full = loader.load_clean(path)
+            index = loader.load_index(path, full, ["category"])
+            self.assertListEqual(sorted(index.columns), ["category", "date"])
+            self.assertListEqual(list(loader.filter_by_categories(full, "category", ["Transport"], index)["value"]),
+                                 [50])
+            self.assertListEqual(list(loader.filter_by_date_range(full, "2025-04-03", None, index)["value"]),
+                                 [100, 150])
+
+    def test_load_csv_with_schema(self):
+        """
+        Test that a declared schema is applied while parsing.
+        """
+        schema = CsvSchema(dtypes={"value": "float64"}, date_columns=["date"], date_format="%Y-%m-%d",
+                           categorical_columns=["category"])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "data.csv")
+            pd.DataFrame({
+                "date": ["2025-04-01", "2025-04-02", "2025-04-03"],
+                "category": ["Food", "Transport", "Food"],
+                "value": [100, 50, 200],
+                "note": ["a", "b", "c"],
+            }).to_csv(path, index=False)
+
+            for engine in (None, "pyarrow"):
+                if engine == "pyarrow":
+                    try:
+                        import pyarrow  # noqa: F401
+                    except ImportError:
+                        continue
+                schema.engine = engine
+                loader = DataLoader(required_columns=["date", "category", "value"], schema=schema)
+                data = loader.clean_data(loader.validate_data(loader.load_csv(path)))
+                self.assertListEqual(list(data.columns), ["date", "category", "value"])
+                self.assertTrue(pd.api.types.is_datetime64_any_dtype(data["date"]))
+                self.assertIsInstance(data["category"].dtype, pd.CategoricalDtype)
+                self.assertEqual(data["value"].dtype, "float64")
+
+            loader = DataLoader(required_columns=["date", "missing"], schema=schema)
+            with self.assertRaises(ValueError) as context:
+                loader.validate_data(loader.load_csv(path))
+            self.assertIn("Missing required columns", str(context.exception))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,41 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.downsampling import lttb, min_max
+
+class TestDownsampling(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up a long series with a spike for testing.
+        """
+        rng = np.random.default_rng(0)
+        self.x = pd.date_range("2025-01-01", periods=10_000, freq="min")
+        self.y = np.sin(np.linspace(0, 20, 10_000)) + rng.normal(0, 0.01, 10_000)
+        self.y[4_321] = 10.0
+
+    def test_lttb(self):
+        """
+        Test that LTTB keeps the requested number of points, the end points and the spike.
+        """
+        kept = lttb(self.x, self.y, 500)
+        self.assertEqual(len(kept), 500)
+        self.assertTrue(np.all(np.diff(kept) > 0))
+        self.assertEqual(kept[0], 0)
+        self.assertEqual(kept[-1], 9_999)
+        self.assertIn(4_321, kept)
+        np.testing.assert_array_equal(lttb(self.x[:10], self.y[:10], 500), np.arange(10))
+
+    def test_min_max(self):
+        """
+        Test that min-max decimation keeps each bucket's extremes.
+        """
+        kept = min_max(self.x, self.y, 500)
+        self.assertLessEqual(len(kept), 500)
+        self.assertTrue(np.all(np.diff(kept) > 0))
+        self.assertIn(4_321, kept)
+        self.assertIn(int(np.argmin(self.y)), kept)
+        with self.assertRaises(ValueError):
+            min_max(self.x, self.y, 1)
+
+if __name__ == "__main__":
+    unittest.main()
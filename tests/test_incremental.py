@@ -0,0 +1,126 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from unittest import mock
+from src.analyzer import DataAnalyzer
+from src.data_loader import DataLoader
+from src.incremental import IncrementalState, update_incremental
+
+class TestIncrementalState(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up an append-only CSV file for testing.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp_dir.name, "data.csv")
+        self.state_path = os.path.join(self.tmp_dir.name, "data.state.json")
+        self.loader = DataLoader(required_columns=["date", "category", "amount", "customer_id"])
+        self.lines = [
+            "2025-04-01,Food,100.0,C1\n",
+            "2025-04-02,Transport,50.0,C2\n",
+            "2025-04-03,Food,200.0,C1\n",
+            "2025-04-04,Entertainment,150.0,C3\n",
+            "2025-04-05,Transport,75.0,C2\n",
+        ]
+        with open(self.csv_path, "w") as f:
+            f.write("date,category,amount,customer_id\n")
+            f.writelines(self.lines[:3])
+
+    def tearDown(self):
+        """
+        Clean up the temporary files.
+        """
+        self.tmp_dir.cleanup()
+
+    def expected(self, lines):
+        rows = [line.strip().split(",") for line in lines]
+        data = pd.DataFrame(rows, columns=["date", "category", "amount", "customer_id"])
+        return DataAnalyzer(data.astype({"amount": float}))
+
+    def test_update_reads_only_appended_rows(self):
+        """
+        Test that a rerun folds in only the rows appended since the last run.
+        """
+        state = update_incremental(self.state_path, self.csv_path, self.loader)
+        self.assertEqual(state.analyzer.rows, 3)
+
+        with open(self.csv_path, "a") as f:
+            f.writelines(self.lines[3:])
+            f.write("2025-04-06,Fo")  # A line still being written
+
+        with mock.patch.object(self.loader, "load_clean_chunks", wraps=self.loader.load_clean_chunks) as load:
+            state = update_incremental(self.state_path, self.csv_path, self.loader)
+            start, end = load.call_args.kwargs["byte_range"]
+        self.assertEqual(end - start, sum(len(line) for line in self.lines[3:]))
+        self.assertEqual(state.analyzer.rows, 5)
+
+        expected = self.expected(self.lines)
+        pd.testing.assert_frame_equal(state.analyzer.summary_statistics(),
+                                      expected.summary_statistics("category", "amount"))
+        pd.testing.assert_frame_equal(state.analyzer.customer_segmentation(),
+                                      expected.customer_segmentation("customer_id", "amount"), check_dtype=False)
+
+        with open(self.csv_path, "a") as f:
+            f.write("od,10.0,C4\n")
+        state = update_incremental(self.state_path, self.csv_path, self.loader)
+        self.assertEqual(state.analyzer.rows, 6)
+        self.assertEqual(state.offset, os.path.getsize(self.csv_path))
+
+    def test_unterminated_last_line(self):
+        """
+        Test that a last line without a newline is consumed once it has every field, that the state is rebuilt
+        if that line grows, and that an incomplete last line is reported as pending.
+        """
+        with open(self.csv_path, "a") as f:
+            f.write(self.lines[3].rstrip("\n"))
+        state = update_incremental(self.state_path, self.csv_path, self.loader)
+        self.assertEqual(state.analyzer.rows, 4)
+        self.assertEqual((state.offset, state.pending_bytes), (os.path.getsize(self.csv_path), 0))
+
+        with open(self.csv_path, "a") as f:
+            f.write("\n" + self.lines[4] + "2025-04-06,Fo")
+        state = update_incremental(self.state_path, self.csv_path, self.loader)
+        self.assertEqual(state.analyzer.rows, 5)
+        self.assertEqual(state.pending_bytes, len("2025-04-06,Fo"))
+        pd.testing.assert_frame_equal(state.analyzer.summary_statistics(),
+                                      self.expected(self.lines).summary_statistics("category", "amount"))
+
+        with open(self.csv_path, "w") as f:
+            f.write("date,category,amount,customer_id\n")
+            f.writelines(self.lines[:2])
+            f.write("2025-04-03,Food,200.0,C")
+        self.assertEqual(update_incremental(self.state_path, self.csv_path, self.loader).analyzer.rows, 3)
+        with open(self.csv_path, "a") as f:
+            f.write("1\n")  # The consumed line was still being written
+        state = update_incremental(self.state_path, self.csv_path, self.loader)
+        self.assertEqual(state.analyzer.rows, 3)
+        pd.testing.assert_frame_equal(state.analyzer.customer_segmentation(),
+                                      self.expected(self.lines[:3]).customer_segmentation("customer_id", "amount"),
+                                      check_dtype=False)
+
+    def test_rewritten_file_rebuilds_state(self):
+        """
+        Test that a file whose consumed part changed is aggregated from scratch.
+        """
+        update_incremental(self.state_path, self.csv_path, self.loader)
+        with open(self.csv_path, "w") as f:
+            f.write("date,category,amount,customer_id\n")
+            f.writelines(self.lines[3:])
+
+        state = update_incremental(self.state_path, self.csv_path, self.loader)
+        self.assertEqual(state.analyzer.rows, 2)
+        pd.testing.assert_frame_equal(state.analyzer.top_spending_categories(),
+                                      self.expected(self.lines[3:]).top_spending_categories("category", "amount"))
+
+    def test_save_and_load(self):
+        """
+        Test that a saved state loads back with the same aggregates.
+        """
+        state = update_incremental(self.state_path, self.csv_path, self.loader)
+        loaded = IncrementalState.load(self.state_path)
+        self.assertEqual(loaded.offset, state.offset)
+        pd.testing.assert_frame_equal(loaded.analyzer.summary_statistics(), state.analyzer.summary_statistics())
+
+if __name__ == "__main__":
+    unittest.main()
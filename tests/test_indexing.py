@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from src.indexing import ColumnIndex, DatasetIndex
+
+class TestColumnIndex(unittest.TestCase):
+    def test_lookup(self):
+        """
+        Test that key lookups return the matching rows in their original order.
+        """
+        index = ColumnIndex.build(pd.Series(["b", "a", None, "c", "a", "b"]))
+        self.assertListEqual(list(index.keys), ["a", "b", "c"])
+        self.assertListEqual(list(index.lookup(["a"])), [1, 4])
+        self.assertListEqual(list(index.lookup(["c", "a", "missing"])), [1, 3, 4])
+        self.assertEqual(len(index.lookup(["missing"])), 0)
+
+    def test_sorted_column(self):
+        """
+        Test that a sorted column resolves key ranges to contiguous row ranges.
+        """
+        dates = pd.Series(pd.to_datetime(["2025-04-01", "2025-04-01", "2025-04-02", "2025-04-05"]))
+        index = ColumnIndex.build(dates)
+        self.assertIsNone(index.order)
+        self.assertEqual(index.range(pd.Timestamp("2025-04-02"), pd.Timestamp("2025-04-05")), slice(2, 4))
+        self.assertEqual(index.range(end=pd.Timestamp("2025-04-01")), slice(0, 2))
+        self.assertEqual(index.range(pd.Timestamp("2025-05-01")), slice(4, 4))
+
+class TestDatasetIndex(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up sample data for testing.
+        """
+        self.data = pd.DataFrame({
+            "date": pd.to_datetime(["2025-04-03", "2025-04-01", "2025-04-02", "2025-04-02", "2025-04-05"]),
+            "category": pd.Categorical(["Food", "Transport", "Food", "Entertainment", "Food"]),
+            "customer_id": ["C1", "C2", "C1", "C3", "C2"],
+            "amount": [100.0, 50.0, 200.0, 150.0, 75.0],
+        })
+        self.index = DatasetIndex.build(self.data, ["date", "category", "customer_id"])
+
+    def test_filter_matches_scan(self):
+        """
+        Test that indexed filters select the same rows as comparing every row.
+        """
+        result = self.index.filter(self.data, {"category": ["Food"], "customer_id": ["C1", "C2"]},
+                                   start_date="2025-04-02", end_date="2025-04-04")
+        mask = (self.data["category"].isin(["Food"]) & self.data["customer_id"].isin(["C1", "C2"])
+                & self.data["date"].between("2025-04-02", "2025-04-04"))
+        pd.testing.assert_frame_equal(result, self.data[mask])
+        self.assertEqual(len(self.index.filter(self.data, {"category": ["Travel"]})), 0)
+
+        with self.assertRaises(ValueError):
+            self.index.filter(self.data, {"amount": [100.0]})
+        with self.assertRaises(ValueError):
+            self.index.filter(self.data.iloc[:2], {"category": ["Food"]})
+
+    def test_save_and_load(self):
+        """
+        Test that a saved index gives the same results after loading.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "index.npz")
+            self.index.save(path)
+            loaded = DatasetIndex.load(path)
+        self.assertListEqual(list(loaded.columns), ["date", "category", "customer_id"])
+        for column in loaded.columns:
+            np.testing.assert_array_equal(loaded.columns[column].keys, self.index.columns[column].keys)
+        pd.testing.assert_frame_equal(loaded.filter(self.data, {"customer_id": ["C2"]}, start_date="2025-04-02"),
+                                      self.data.iloc[[4]])
+
+    def test_extend(self):
+        """
+        Test adding columns to an existing index.
+        """
+        index = DatasetIndex.build(self.data, ["category"])
+        self.assertListEqual(index.extend(self.data, ["category", "customer_id"]), ["customer_id"])
+        self.assertListEqual(index.extend(self.data, ["customer_id"]), [])
+        self.assertIn("customer_id", index.columns)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import io
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from contextlib import redirect_stdout
+from unittest import mock
+import main
+from src.analyzer import DataAnalyzer
+from src.data_loader import DataLoader
+from src.parallel import analyze_partitions, resolve_input_paths
+from src.profiling import Profiler
+
+class TestParallel(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up several partition files for testing.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        self.parts = []
+        for index in range(3):
+            part = pd.DataFrame({
+                "date": pd.date_range("2025-04-01", periods=200).strftime("%Y-%m-%d"),
+                "category": rng.choice(["Food", "Transport", "Entertainment"], size=200),
+                "amount": rng.gamma(2.0, 50.0, size=200).round(2),
+                "customer_id": rng.choice([f"C{i}" for i in range(30)], size=200),
+            })
+            part.to_csv(os.path.join(self.tmp_dir.name, f"store_{index}.csv"), index=False)
+            self.parts.append(part)
+        self.loader = DataLoader(required_columns=["date", "category", "amount", "customer_id"])
+        self.analyzer = DataAnalyzer(pd.concat(self.parts, ignore_index=True))
+
+    def tearDown(self):
+        """
+        Clean up the partition files.
+        """
+        self.tmp_dir.cleanup()
+
+    def test_resolve_input_paths(self):
+        """
+        Test expanding files, directories and glob patterns.
+        """
+        expected = [os.path.join(self.tmp_dir.name, f"store_{index}.csv") for index in range(3)]
+        self.assertListEqual(resolve_input_paths(self.tmp_dir.name), expected)
+        self.assertListEqual(resolve_input_paths(os.path.join(self.tmp_dir.name, "store_*.csv")), expected)
+        self.assertListEqual(resolve_input_paths(expected[0]), expected[:1])
+        with self.assertRaises(ValueError):
+            resolve_input_paths(os.path.join(self.tmp_dir.name, "missing_*.csv"))
+
+    def test_merged_results_match_single_pass(self):
+        """
+        Test that merging per-partition aggregates from a process pool matches analyzing all rows at once.
+        """
+        paths = resolve_input_paths(self.tmp_dir.name)
+        for workers in (1, 2):
+            profiler = Profiler(trace_memory=False)
+            merged = analyze_partitions(paths, self.loader, workers=workers, chunksize=150, sketch_k=1_000,
+                                        profiler=profiler)
+            # Updates in worker processes are not recorded; in-process ones are.
+            self.assertEqual("streaming.update" in profiler.summary()["stage"].tolist(), workers == 1)
+            self.assertEqual(merged.rows, 600)
+            pd.testing.assert_frame_equal(merged.summary_statistics(),
+                                          self.analyzer.summary_statistics("category", "amount"))
+            pd.testing.assert_frame_equal(merged.top_spending_categories(top_n=2),
+                                          self.analyzer.top_spending_categories("category", "amount", top_n=2))
+            pd.testing.assert_frame_equal(merged.customer_segmentation(),
+                                          self.analyzer.customer_segmentation("customer_id", "amount"),
+                                          check_dtype=False)
+
+    def test_rejections_from_workers_are_reported(self):
+        """
+        Test that rows rejected in worker processes are counted in the caller's loader.
+        """
+        with open(os.path.join(self.tmp_dir.name, "store_1.csv"), "a") as f:
+            f.write("not a date,Food,10.0,C1\n")
+        with open(os.path.join(self.tmp_dir.name, "store_2.csv"), "a") as f:
+            f.write("2025-04-01,Food,,C1\n")
+        for workers in (1, 2):
+            loader = DataLoader(required_columns=self.loader.required_columns)
+            merged = analyze_partitions(resolve_input_paths(self.tmp_dir.name), loader, workers=workers)
+            self.assertEqual(merged.rows, 600)
+            self.assertEqual(loader.report.rows_checked, 602)
+            self.assertDictEqual(dict(loader.report.rejected), {"invalid_date:date": 1, "missing:amount": 1})
+
+    def test_cli_single_match(self):
+        """
+        Test that a directory or glob resolving to one file is analyzed in memory like the file itself.
+        """
+        single_dir = os.path.join(self.tmp_dir.name, "single")
+        os.mkdir(single_dir)
+        self.parts[0].to_csv(os.path.join(single_dir, "store.csv"), index=False)
+        outputs = []
+        for source in (os.path.join(single_dir, "store.csv"), single_dir, os.path.join(single_dir, "*.csv")):
+            stdout = io.StringIO()
+            with mock.patch("sys.argv", ["main.py", source, "--analysis", "category", "--no-cache"]), \
+                    redirect_stdout(stdout):
+                main.main()
+            self.assertNotIn("Error", stdout.getvalue())
+            outputs.append(stdout.getvalue())
+        self.assertEqual(outputs[1], outputs[0])
+        self.assertEqual(outputs[2], outputs[0])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import json
+import os
+import tempfile
+import unittest
+import pandas as pd
+from src.analyzer import DataAnalyzer
+from src.data_loader import DataLoader
+from src.profiling import Profiler
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up sample data for testing.
+        """
+        self.data = pd.DataFrame({
+            "category": ["Food", "Transport", "Food", "Entertainment", None],
+            "amount": [100.0, 50.0, 200.0, 150.0, 75.0],
+        })
+        self.profiler = Profiler()
+
+    def tearDown(self):
+        """
+        Stop memory tracing started by the profiler.
+        """
+        self.profiler.close()
+
+    def test_stage(self):
+        """
+        Test that stages record times, memory and row counts, including nested stages.
+        """
+        records = []
+        self.profiler.callback = records.append
+        with self.profiler.stage("outer", rows_in=10) as outer:
+            with self.profiler.stage("inner"):
+                buffer = bytearray(4 * 2 ** 20)
+            del buffer
+            outer.rows_out = 5
+
+        self.assertListEqual([record.stage for record in records], ["inner", "outer"])
+        inner, outer = records
+        self.assertGreaterEqual(inner.traced_peak_bytes, 4 * 2 ** 20)
+        self.assertGreaterEqual(outer.traced_peak_bytes, inner.traced_peak_bytes)
+        self.assertGreaterEqual(outer.wall_seconds, inner.wall_seconds)
+        self.assertEqual((outer.rows_in, outer.rows_out), (10, 5))
+
+    def test_profiled_methods(self):
+        """
+        Test that loader and analyzer methods are recorded when a profiler is attached.
+        """
+        loader = DataLoader(profiler=self.profiler)
+        analyzer = DataAnalyzer(loader.validate_data(self.data), profiler=self.profiler)
+        analyzer.summary_statistics("category", "amount")
+        analyzer.summary_statistics("category", "amount")
+
+        summary = self.profiler.summary().set_index("stage")
+        self.assertEqual(summary.loc["loader.validate_data", "rows_in"], 5)
+        self.assertEqual(summary.loc["loader.validate_data", "rows_out"], 4)
+        self.assertEqual(summary.loc["analyzer.summary_statistics", "calls"], 2)
+        self.assertIn("analyzer.summary_statistics", self.profiler.report())
+
+        # Without a profiler, methods run unwrapped.
+        DataAnalyzer(self.data).summary_statistics("category", "amount")
+        self.assertEqual(len(self.profiler.records), 3)
+
+    def test_profiled_chunk_reads(self):
+        """
+        Test that reading each chunk of a streamed file is recorded as a stage.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "data.csv")
+            self.data.to_csv(path, index=False)
+            loader = DataLoader(profiler=self.profiler)
+            self.assertEqual(sum(len(chunk) for chunk in loader.load_clean_chunks(path, 2)), 4)
+
+        summary = self.profiler.summary().set_index("stage")
+        self.assertEqual(summary.loc["loader.load_csv_chunks", "rows_out"], 5)
+        self.assertEqual(summary.loc["loader.load_csv_chunks", "calls"], 4)  # 3 chunks, then the end of the file
+        self.assertEqual(summary.loc["loader.validate_data", "calls"], 3)
+
+    def test_to_json(self):
+        """
+        Test dumping the profile as JSON.
+        """
+        with self.profiler.stage("stage"):
+            pass
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "profile.json")
+            self.profiler.to_json(path)
+            with open(path) as f:
+                profile = json.load(f)
+        self.assertEqual(profile["records"][0]["stage"], "stage")
+        self.assertEqual(profile["summary"][0]["calls"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
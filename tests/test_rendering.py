@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from src.rendering import ChartSpec, render_charts, savefig_kwargs
+
+class TestRenderCharts(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up sample data and an output directory for testing.
+        """
+        rng = np.random.default_rng(0)
+        self.data = pd.DataFrame({
+            "date": pd.date_range("2025-04-01", periods=60, freq="D"),
+            "category": rng.choice(["Food", "Transport", "Entertainment"], size=60),
+            "amount": rng.gamma(2.0, 50.0, size=60),
+        })
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """
+        Clean up the generated files.
+        """
+        self.tmp_dir.cleanup()
+
+    def specs(self, count: int, extension: str = "png"):
+        kinds = [
+            ("bar", {"category_column": "category", "value_column": "amount"}),
+            ("line", {"x_column": "date", "y_column": "amount"}),
+        ]
+        return [ChartSpec(kinds[i % 2][0], self.data, os.path.join(self.tmp_dir.name, f"chart_{i}.{extension}"),
+                          kinds[i % 2][1], dpi=40, fast=True) for i in range(count)]
+
+    def test_batch_leaves_no_open_figures(self):
+        """
+        Test that a batch renders every chart without leaving pyplot figures open.
+        """
+        open_figures = plt.get_fignums()
+        specs = self.specs(20) + self.specs(2, "rgba")
+        paths = render_charts(specs)
+        self.assertListEqual(paths, [spec.save_path for spec in specs])
+        self.assertTrue(all(os.path.getsize(path) > 0 for path in paths))
+        self.assertListEqual(plt.get_fignums(), open_figures)
+        self.assertEqual(savefig_kwargs(specs[0]), {"dpi": 40, "pil_kwargs": {"compress_level": 1}})
+
+        with self.assertRaises(ValueError):
+            render_charts([ChartSpec("scatter", self.data, os.path.join(self.tmp_dir.name, "scatter.png"))])
+
+    def test_process_pool(self):
+        """
+        Test rendering in worker processes.
+        """
+        specs = self.specs(4)
+        self.assertListEqual(render_charts(specs, workers=2), [spec.save_path for spec in specs])
+        self.assertTrue(all(os.path.exists(spec.save_path) for spec in specs))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+from src.data_loader import DataLoader
+from src.server import AnalysisServer, DatasetCache
+
+class TestAnalysisServer(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up a CSV file and a server for testing.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        self.path = os.path.join(self.tmp_dir.name, "sales.csv")
+        pd.DataFrame({
+            "date": pd.date_range("2025-04-01", periods=120).strftime("%Y-%m-%d"),
+            "category": rng.choice(["Food", "Transport", "Entertainment"], size=120),
+            "amount": rng.gamma(2.0, 50.0, size=120).round(2),
+            "customer_id": rng.choice([f"C{i}" for i in range(20)], size=120),
+        }).to_csv(self.path, index=False)
+        self.loader = DataLoader(required_columns=["date", "category", "amount", "customer_id"])
+        self.server = AnalysisServer(self.loader, max_datasets=2, workers=2)
+
+    def tearDown(self):
+        """
+        Stop the worker threads and clean up the CSV file.
+        """
+        self.server.executor.shutdown()
+        self.tmp_dir.cleanup()
+
+    def request(self, method: str, path: str, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else b''
+        status, content_type, body = asyncio.run(self.server.dispatch(method, path, body))
+        return status, content_type, json.loads(body) if content_type == 'application/json' else body
+
+    def test_datasets_stay_warm(self):
+        """
+        Test that a dataset is loaded once, reloaded when the file changes, and evicted least recently used first.
+        """
+        datasets = DatasetCache(self.loader, max_datasets=1)
+        first = datasets.get(self.path)
+        self.assertIs(datasets.get(self.path), first)
+        self.assertEqual((datasets.hits, datasets.misses), (1, 1))
+
+        with open(self.path, "a") as f:
+            f.write("2025-09-01,Food,10.0,C1\n")
+        self.assertEqual(len(datasets.get(self.path).data), len(first.data) + 1)
+
+        other = os.path.join(self.tmp_dir.name, "other.csv")
+        first.data.to_csv(other, index=False)
+        datasets.get(other)
+        self.assertEqual(datasets.stats()['datasets'], 1)
+        with self.assertRaises(ValueError):
+            DatasetCache(self.loader, max_datasets=0)
+
+    def test_analyze_matches_data_analyzer(self):
+        """
+        Test that /analyze returns the same results as running the analyses directly, with filters applied.
+        """
+        status, _, result = self.request('POST', '/analyze', {"path": self.path, "analyses": ["category"], "top_n": 2})
+        self.assertEqual(status, 200)
+        data = self.loader.load_clean(self.path)
+        expected = data.groupby("category", observed=True)["amount"].sum().nlargest(2)
+        self.assertListEqual([row["category"] for row in result["category"]], list(expected.index))
+
+        status, _, result = self.request('POST', '/analyze', {
+            "path": self.path, "analyses": "summary", "filters": {"category": ["Food"]},
+            "start_date": "2025-05-01", "end_date": "2025-05-31"})
+        self.assertEqual(status, 200)
+        self.assertListEqual([row["category"] for row in result["summary"]], ["Food"])
+
+    def test_filters_use_row_index(self):
+        """
+        Test that filtered requests select rows through the dataset's row index instead of scanning the frame.
+        """
+        datasets = DatasetCache(self.loader)
+        analyzer, data = datasets.filter(self.path, {"category": ["Food"]}, "2025-05-01", "2025-05-31")
+        whole = analyzer.data
+        in_may = (whole["date"] >= "2025-05-01") & (whole["date"] <= "2025-05-31")
+        expected = whole[(whole["category"] == "Food") & in_may]
+        pd.testing.assert_frame_equal(data, expected)
+        self.assertIn("category", datasets._entries[analyzer.fingerprint][1].columns)
+
+        _, data = datasets.filter(self.path, {"amount": [whole["amount"].iloc[0]]})
+        self.assertTrue((data["amount"] == whole["amount"].iloc[0]).all())
+        with self.assertRaises(ValueError):
+            datasets.filter(self.path, {"missing": ["x"]})
+
+        with mock.patch.object(self.loader, "filter_by_categories") as by_categories, \
+                mock.patch.object(self.loader, "filter_by_date_range") as by_date_range:
+            status, _, _ = self.request('POST', '/analyze', {
+                "path": self.path, "analyses": "summary", "filters": {"category": ["Food"]},
+                "start_date": "2025-05-01"})
+        self.assertEqual(status, 200)
+        by_categories.assert_not_called()
+        by_date_range.assert_not_called()
+
+    def test_drill_down(self):
+        """
+        Test that /drill_down aggregates the warm dataset and leaves its cube for later analyses.
+        """
+        status, _, result = self.request('POST', '/drill_down', {"path": self.path, "dimensions": ["category"]})
+        self.assertEqual(status, 200)
+        data = self.loader.load_clean(self.path)
+        expected = data.groupby("category", observed=True)["amount"].sum()
+        self.assertListEqual([row["category"] for row in result["drill-down"]], list(expected.index))
+        np.testing.assert_allclose([row["sum"] for row in result["drill-down"]], expected.to_numpy())
+        self.assertIsNotNone(self.server.datasets.get(self.path).built_cube(["category"], "amount"))
+
+        status, _, result = self.request('POST', '/drill_down', {
+            "path": self.path, "dimensions": "date", "freq": "month", "filters": {"category": ["Food"]}})
+        self.assertEqual(status, 200)
+        self.assertEqual(len(result["drill-down"]), 4)
+        self.assertEqual(self.request('POST', '/drill_down', {"path": self.path, "dimensions": ["unknown"]})[0], 400)
+
+    def test_chart_returns_image(self):
+        """
+        Test that /chart renders an image in the requested format.
+        """
+        status, content_type, body = self.request('POST', '/chart', {
+            "path": self.path, "kind": "bar", "options": {"category_column": "category", "value_column": "amount"}})
+        self.assertEqual((status, content_type), (200, 'image/png'))
+        self.assertTrue(body.startswith(b'\x89PNG'))
+
+    def test_errors(self):
+        """
+        Test the status codes of invalid requests.
+        """
+        self.assertEqual(self.request('POST', '/analyze', {"analyses": ["summary"]})[0], 400)
+        self.assertEqual(self.request('POST', '/analyze', {"path": self.path, "analyses": ["unknown"]})[0], 400)
+        self.assertEqual(self.request('POST', '/analyze', {"path": os.path.join(self.tmp_dir.name, "no.csv")})[0], 404)
+        self.assertEqual(self.request('POST', '/chart', {"path": self.path, "kind": "radar"})[0], 400)
+        self.assertEqual(self.request('GET', '/analyze')[0], 405)
+        self.assertEqual(self.request('GET', '/missing')[0], 404)
+        status, _, _ = asyncio.run(self.server.dispatch('POST', '/analyze', b'{not json'))
+        self.assertEqual(status, 400)
+
+    def test_identical_requests_are_coalesced(self):
+        """
+        Test that concurrent identical requests share one computation.
+        """
+        body = json.dumps({"path": self.path, "analyses": ["segmentation"]}).encode()
+
+        async def concurrent():
+            return await asyncio.gather(*(self.server.dispatch('POST', '/analyze', body) for _ in range(3)))
+
+        responses = asyncio.run(concurrent())
+        self.assertEqual(len({response[2] for response in responses}), 1)
+        self.assertEqual(self.server.coalesced, 2)
+        self.assertEqual(self.server.datasets.misses, 1)
+
+    def test_http_round_trip(self):
+        """
+        Test a request over a TCP connection.
+        """
+        async def round_trip():
+            server = await self.server.start(port=0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                body = json.dumps({"path": self.path, "analyses": ["summary"]}).encode()
+                writer.write(b"POST /analyze HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                             + f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+                await writer.drain()
+                response = await reader.read()
+                writer.close()
+            return response
+
+        head, _, body = asyncio.run(round_trip()).partition(b"\r\n\r\n")
+        self.assertTrue(head.startswith(b"HTTP/1.1 200 OK"))
+        self.assertIn("summary", json.loads(body))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.sketches import HyperLogLog, KLLSketch, SpaceSaving
+
+class TestKLLSketch(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up sample data for testing.
+        """
+        self.values = np.random.default_rng(0).normal(100.0, 25.0, size=50_000)
+
+    def test_exact_below_capacity(self):
+        """
+        Test that small inputs give exact quantiles.
+        """
+        sketch = KLLSketch(k=200, seed=1)
+        sketch.update(self.values[:101])
+        self.assertTrue(sketch.is_exact)
+        self.assertEqual(sketch.median(), np.median(self.values[:101]))
+
+    def test_rank_error(self):
+        """
+        Test that estimated quantiles stay within the rank error bound on large inputs.
+        """
+        sketch = KLLSketch(k=200, seed=1)
+        for start in range(0, len(self.values), 7_000):
+            sketch.update(self.values[start:start + 7_000])
+        self.assertFalse(sketch.is_exact)
+        self.assertEqual(sketch.n, len(self.values))
+
+        ordered = np.sort(self.values)
+        for q in (0.1, 0.5, 0.9):
+            rank = np.searchsorted(ordered, sketch.quantile(q)) / len(ordered)
+            self.assertLess(abs(rank - q), 2 * sketch.rank_error)
+
+    def test_merge(self):
+        """
+        Test that merged sketches summarize the union of their inputs.
+        """
+        left, right = KLLSketch(k=100, seed=1), KLLSketch(k=100, seed=2)
+        left.update(self.values[:25_000])
+        right.update(self.values[25_000:])
+        merged = left.merge(right)
+        self.assertEqual(merged.n, len(self.values))
+        rank = np.searchsorted(np.sort(self.values), merged.median()) / len(self.values)
+        self.assertLess(abs(rank - 0.5), 2 * merged.rank_error)
+
+        with self.assertRaises(ValueError):
+            merged.merge(KLLSketch(k=200))
+
+class TestHyperLogLog(unittest.TestCase):
+    def test_estimate(self):
+        """
+        Test that distinct counts are estimated within a few standard errors, ignoring duplicates.
+        """
+        sketch = HyperLogLog.from_error(0.01)
+        self.assertEqual(sketch.precision, 14)
+        self.assertEqual(sketch.estimate(), 0.0)
+        values = np.array([f"C{i}" for i in range(100_000)])
+        sketch.update(values)
+        sketch.update(values[:50_000])
+        sketch.update([None, np.nan])
+        self.assertLess(abs(sketch.estimate() / 100_000 - 1), 3 * sketch.relative_error)
+
+        small = HyperLogLog()
+        small.update(["a", "b", "a", "c"])
+        self.assertAlmostEqual(small.estimate(), 3, delta=0.01)
+
+    def test_merge(self):
+        """
+        Test that merging gives the same registers as one sketch over all values.
+        """
+        left, right, whole = HyperLogLog(10), HyperLogLog(10), HyperLogLog(10)
+        left.update(range(0, 6_000))
+        right.update(range(4_000, 10_000))
+        whole.update(range(0, 10_000))
+        np.testing.assert_array_equal(left.merge(right).registers, whole.registers)
+        np.testing.assert_array_equal(HyperLogLog.from_dict(whole.to_dict()).registers, whole.registers)
+
+        with self.assertRaises(ValueError):
+            left.merge(HyperLogLog(12))
+
+class TestSpaceSaving(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up skewed weighted keys for testing.
+        """
+        rng = np.random.default_rng(0)
+        self.keys = rng.zipf(1.3, size=40_000) % 5_000
+        self.weights = rng.exponential(10.0, size=40_000)
+        self.totals = pd.Series(self.weights).groupby(self.keys).sum()
+
+    def test_error_bounds(self):
+        """
+        Test that estimates never undercount and overcount by at most their error, itself bounded.
+        """
+        sketch = SpaceSaving(capacity=50)
+        for start in range(0, len(self.keys), 4_000):
+            sketch.update(self.keys[start:start + 4_000], self.weights[start:start + 4_000])
+        self.assertAlmostEqual(sketch.total, self.weights.sum())
+
+        top = sketch.top(10)
+        true = self.totals[top.index]
+        self.assertTrue((top["estimate"] >= true - 1e-6).all())
+        self.assertTrue((top["estimate"] - top["error"] <= true + 1e-6).all())
+        self.assertTrue((top["error"] <= sketch.total / sketch.capacity).all())
+        self.assertListEqual(list(top.index[:3]), list(self.totals.nlargest(3).index))
+
+    def test_merge(self):
+        """
+        Test that sketches over disjoint parts merge, and that counting works without weights.
+        """
+        left, right = SpaceSaving(capacity=100), SpaceSaving(capacity=100)
+        left.update(self.keys[:20_000])
+        right.update(self.keys[20_000:])
+        merged = SpaceSaving.from_dict(left.merge(right).to_dict())
+        counts = pd.Series(self.keys).value_counts()
+        self.assertEqual(merged.total, len(self.keys))
+        self.assertEqual(merged.top(1).index[0], counts.index[0])
+
+        with self.assertRaises(ValueError):
+            SpaceSaving.from_error(0)
+
+if __name__ == "__main__":
+    unittest.main()
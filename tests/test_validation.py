@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from src.validation import ValidationReport, ValidationRules, reject
+
+class TestValidationRules(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up cleaned rows breaking different rules for testing.
+        """
+        self.data = pd.DataFrame({
+            "date": pd.to_datetime(["2025-01-01", "2025-01-02", "2030-01-01", "2025-01-04", "2025-01-05"]),
+            "amount": [10.0, -5.0, 8.0, np.nan, 7.0],
+            "customer_id": pd.Categorical(["C1", "C2", "C3", "C4", "X9"]),
+        })
+        self.rules = ValidationRules(ranges={"amount": (0, None)}, date_bounds={"date": (None, "2025-12-31")},
+                                     patterns={"customer_id": r"C\d+"})
+
+    def test_failures(self):
+        """
+        Test that each rule marks the rows it rejects, leaving missing values to the required-column check.
+        """
+        failures = self.rules.failures(self.data)
+        self.assertListEqual(list(failures), ["range:amount", "date_bounds:date", "pattern:customer_id"])
+        self.assertListEqual(failures["range:amount"].tolist(), [False, True, False, False, False])
+        self.assertListEqual(failures["date_bounds:date"].tolist(), [False, False, True, False, False])
+        self.assertListEqual(failures["pattern:customer_id"].tolist(), [False, False, False, False, True])
+        text_ids = self.data.assign(customer_id=self.data["customer_id"].astype(object))
+        np.testing.assert_array_equal(self.rules.failures(text_ids)["pattern:customer_id"],
+                                      failures["pattern:customer_id"])
+
+        text_amounts = self.data.assign(amount=["10", "-5", "abc", None, "7"])
+        failures = self.rules.failures(text_amounts)
+        self.assertListEqual(failures["invalid_number:amount"].tolist(), [False, False, True, False, False])
+        self.assertListEqual(failures["range:amount"].tolist(), [False, True, False, False, False])
+
+        with self.assertRaises(ValueError):
+            self.rules.failures(self.data.drop(columns="amount"))
+        with self.assertRaises(ValueError):
+            ValidationRules(patterns={"customer_id": "C("})
+
+    def test_reject_counts_and_quarantines(self):
+        """
+        Test that rejected rows are counted under the first rule they fail and appended to the quarantine file.
+        """
+        report = ValidationReport(rows_checked=5)
+        failures = self.rules.failures(self.data)
+        failures["date_bounds:date"][1] = True  # Also fails the range rule, which comes first.
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "rejected.csv")
+            kept = reject(self.data, failures, report, path)
+            reject(self.data, {"range:amount": failures["range:amount"]}, report, path)
+            quarantined = pd.read_csv(path)
+        self.assertListEqual(list(kept.index), [0, 3])
+        self.assertDictEqual(dict(report.rejected), {"range:amount": 2, "date_bounds:date": 1,
+                                                     "pattern:customer_id": 1})
+        self.assertListEqual(list(quarantined["rejected_by"]), ["range:amount", "date_bounds:date",
+                                                                "pattern:customer_id", "range:amount"])
+        self.assertEqual(report.summary(), "Rejected 4 of 5 rows (range:amount: 2, date_bounds:date: 1, "
+                                           "pattern:customer_id: 1)")
+        self.assertIs(reject(self.data, {}, report), self.data)
+
+if __name__ == "__main__":
+    unittest.main()
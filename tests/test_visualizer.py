@@ -1,5 +1,7 @@
 import unittest
+import numpy as np
 import pandas as pd
+import matplotlib.pyplot as plt
 from io import StringIO
 from src.visualizer import DataVisualizer
 import os
@@ -60,5 +62,59 @@ class TestDataVisualizer(unittest.TestCase):
         self.assertTrue(os.path.exists(self.test_output_path))  # Check if the file was saved
         self.assertIsNotNone(fig)  # Ensure the figure is generated
 
+    def test_charts_plot_reduced_data(self):
+        """
+        Test that charts aggregate and downsample large inputs before plotting.
+        """
+        rng = np.random.default_rng(0)
+        data = pd.DataFrame({
+            "date": pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 90 * 86_400, 20_000), unit="s"),
+            "category": rng.choice(["Food", "Transport", "Entertainment"], size=20_000),
+            "amount": rng.gamma(2.0, 50.0, size=20_000),
+        })
+        fig = self.visualizer.bar_chart(data, "category", "amount")
+        heights = sorted(patch.get_height() for patch in fig.axes[0].patches)
+        np.testing.assert_allclose(heights, sorted(data.groupby("category")["amount"].mean()))
+        self.assertEqual(len(fig.axes[0].lines), 0)  # No error bars by default
+        plt.close(fig)
+
+        fig = self.visualizer.line_chart(data, "date", "amount", max_points=300)
+        self.assertLessEqual(len(fig.axes[0].lines[0].get_xdata()), 300)
+        plt.close(fig)
+
+        fig = self.visualizer.line_chart(data, "date", "amount", estimator="sum", freq="D", downsample="minmax")
+        self.assertEqual(len(fig.axes[0].lines[0].get_xdata()), 90)
+        plt.close(fig)
+
+        fig = self.visualizer.line_chart(data, "date", "amount", freq="W")
+        expected = data.set_index("date")["amount"].resample("W").mean()
+        np.testing.assert_allclose(fig.axes[0].lines[0].get_ydata(), expected)
+        plt.close(fig)
+
+        for estimator in ("count", "std"):
+            fig = self.visualizer.bar_chart(data.iloc[:100], "category", "amount", estimator=estimator)
+            heights = sorted(patch.get_height() for patch in fig.axes[0].patches)
+            np.testing.assert_allclose(heights, sorted(data.iloc[:100].groupby("category")["amount"].agg(estimator)))
+            plt.close(fig)
+
+        with self.assertRaises(ValueError):
+            self.visualizer.line_chart(data, "date", "amount", downsample="random")
+
+    def test_heatmap_scales_to_wide_tables(self):
+        """
+        Test that heatmaps skip non-numeric columns and drop cell annotations on wide tables.
+        """
+        rng = np.random.default_rng(0)
+        narrow = pd.DataFrame(rng.normal(size=(200, 3)), columns=["a", "b", "c"]).assign(category="Food")
+        fig = self.visualizer.heatmap(narrow)
+        self.assertEqual(len(fig.axes[0].texts), 9)
+        plt.close(fig)
+
+        wide = pd.DataFrame(rng.normal(size=(200, 40)), columns=[f"x{i}" for i in range(40)])
+        fig = self.visualizer.heatmap(wide.assign(category="Food"), sample_rows=100)
+        self.assertEqual(len(fig.axes[0].texts), 0)
+        self.assertEqual(fig.axes[0].collections[0].get_array().size, 40 * 40)
+        plt.close(fig)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
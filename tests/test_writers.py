@@ -0,0 +1,78 @@
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from unittest import mock
+from src.writers import WRITERS, write_result
+
+class TestWriters(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up a per-customer result and an output directory for testing.
+        """
+        rng = np.random.default_rng(0)
+        self.result = pd.DataFrame({
+            "customer_id": pd.Categorical([f"C{i}" for i in range(1_000)]),
+            "date": pd.date_range("2025-01-01", periods=1_000, freq="h"),
+            "Total Spending": rng.gamma(2.0, 50.0, size=1_000),
+            "Transaction Count": rng.integers(1, 20, size=1_000).astype(np.int32),
+        })
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """
+        Clean up the written files.
+        """
+        self.tmp_dir.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.tmp_dir.name, name)
+
+    def test_binary_formats_round_trip(self):
+        """
+        Test that Parquet and Feather outputs written in batches keep values and dtypes.
+        """
+        pd.testing.assert_frame_equal(pd.read_parquet(write_result(self.result, self.path("r.parquet"), 128)),
+                                      self.result)
+        pd.testing.assert_frame_equal(pd.read_feather(write_result(self.result, self.path("r.feather"), 128)),
+                                      self.result)
+
+    def test_text_formats(self):
+        """
+        Test JSON-lines and CSV outputs, with CSV as the fallback for other extensions.
+        """
+        with open(write_result(self.result, self.path("r.jsonl"), 128), encoding="utf-8") as f:
+            records = [json.loads(line) for line in f.read().split("\n")[:-1]]
+        self.assertEqual(len(records), 1_000)
+        lines = pd.read_json(self.path("r.jsonl"), lines=True)
+        self.assertEqual(len(lines), 1_000)
+        self.assertListEqual(list(lines.columns), list(self.result.columns))
+        for name in ("r.csv", "r.txt"):
+            written = pd.read_csv(write_result(self.result, self.path(name), 128))
+            np.testing.assert_allclose(written["Total Spending"], self.result["Total Spending"])
+        self.assertEqual(len(pd.read_csv(write_result(self.result.iloc[:0], self.path("empty.csv")))), 0)
+
+    def test_writes_in_batches_and_atomically(self):
+        """
+        Test that rows are encoded batch by batch and that a failed write leaves no partial file.
+        """
+        with mock.patch.object(pd.DataFrame, "to_json", autospec=True, side_effect=pd.DataFrame.to_json) as to_json:
+            write_result(self.result, self.path("r.jsonl"), batch_rows=300)
+        self.assertEqual(to_json.call_count, 4)
+
+        def fail_midway(data, path, batch_rows):
+            with open(path, "w") as f:
+                f.write("customer_id\n")
+            raise OSError("disk full")
+
+        with mock.patch.dict(WRITERS, {".csv": fail_midway}):
+            with self.assertRaises(OSError):
+                write_result(self.result, self.path("failed.csv"))
+        self.assertListEqual(sorted(os.listdir(self.tmp_dir.name)), ["r.jsonl"])
+        with self.assertRaises(ValueError):
+            write_result(self.result, self.path("r.csv"), batch_rows=0)
+
+if __name__ == "__main__":
+    unittest.main()